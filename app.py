@@ -6,14 +6,25 @@ capabilities using OU Law branding.
 """
 
 import streamlit as st
-import os
 from typing import Dict, Any, Optional
 from eleven_backend import (
     list_voices, 
     get_voice_settings, 
     synthesize, 
-    list_models
+    synthesize_with_timestamps,
+    list_models,
+    get_shared_cache,
+    invalidate_voice_catalog,
+    start_health_monitor
 )
+from eleven_prefetch import AudioCache, SpeculativePrefetcher
+from eleven_presets import DEFAULT_VOICE_SETTINGS, get_preset_store, make_preset
+from eleven_tracing import span
+from eleven_policy import FASTEST, QUALITY, SelectionPolicy
+from eleven_history import ARCHIVE_FORMATS, AudioHistory
+from eleven_audio import can_encode
+from eleven_executor import warm_process_pool
+from eleven_memory import get_memory_manager
 
 # Page configuration
 st.set_page_config(
@@ -56,6 +67,54 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Number of recently used voices to speculate on after each generation
+RECENT_VOICE_LIMIT = 3
+
+
+@st.cache_data(ttl=600)
+def get_cached_voice_settings(voice_id: str) -> dict:
+    """Default settings of a voice, cached like the voice list."""
+    return get_voice_settings(voice_id)
+
+
+@st.cache_resource
+def get_prefetcher():
+    """Shared speculative prefetcher, created once per server process."""
+    # Audio is also written to the cross-replica cache when one is configured
+    cache = AudioCache(shared=get_shared_cache())
+    # Speculate with each voice's own defaults, which is what the sliders show after a switch
+    return SpeculativePrefetcher(
+        synthesize, cache=cache, max_workers=2, credit_budget=20000, voice_settings_fn=get_cached_voice_settings
+    )
+
+
+@st.cache_resource
+def get_health_monitor():
+    """Background API health monitor, started once per server process."""
+    # The first probe also warms the client's connection pool
+    return start_health_monitor(wait=3.0)
+
+
+@st.cache_resource
+def get_audio_pool():
+    """Audio process pool, warmed once post-processing is first enabled rather than on the first long clip."""
+    return warm_process_pool()
+
+
+def get_history() -> AudioHistory:
+    """This session's generated clips (older clips are kept on disk)."""
+    if "history" not in st.session_state:
+        st.session_state.history = AudioHistory()
+    return st.session_state.history
+
+
+def remember_voice(voice_id: str) -> list:
+    """Move voice_id to the front of this session's recent voices and return the others."""
+    recent = [v for v in st.session_state.get("recent_voices", []) if v != voice_id]
+    st.session_state.recent_voices = [voice_id] + recent[:RECENT_VOICE_LIMIT - 1]
+    return st.session_state.recent_voices[1:]
+
+
 def main():
     """Main application function."""
     
@@ -67,34 +126,48 @@ def main():
     with st.sidebar:
         st.header("🎛️ Controls")
         
-        # API Status
-        st.write("🔍 Debug: Testing API connection...")
-        st.write(f"🔍 Debug: Environment ELEVENLABS_API_KEY: {os.getenv('ELEVENLABS_API_KEY', 'NOT_SET')[:10] if os.getenv('ELEVENLABS_API_KEY') else 'NOT_SET'}...")
-        st.write(f"🔍 Debug: Streamlit secrets ELEVENLABS_API_KEY: {st.secrets.get('ELEVENLABS_API_KEY', 'NOT_SET')[:10] if st.secrets.get('ELEVENLABS_API_KEY') else 'NOT_SET'}...")
-        try:
-            # Try to get a voice to test API connectivity
-            st.write("🔍 Debug: Calling list_voices...")
-            voices = list_voices(page_size=1)
-            st.write(f"🔍 Debug: Got {len(voices) if voices else 0} voices")
-            if voices:
-                st.success("✅ API connected - voices available")
-            else:
-                st.warning("⚠️ API connected but no voices found")
-        except Exception as e:
+        # API Status (cached by the background health monitor, never blocks the rerun)
+        health = get_health_monitor().status()
+        if health.state == "healthy":
+            st.success(f"✅ API connected ({health.probe_latency_ms or health.synthesis_p50_ms or 0:.0f} ms)")
+        elif health.state == "degraded":
+            st.warning("⚠️ API degraded - requests are slow or failing")
+            if health.last_error:
+                st.code(health.last_error)
+        elif health.state == "down":
             st.error("❌ API connection failed")
             st.info("Check ELEVENLABS_API_KEY in .streamlit/secrets.toml or .env file")
-            st.code(str(e))
-            st.write(f"🔍 Debug: Exception type: {type(e).__name__}")
-            st.write(f"🔍 Debug: Exception details: {e}")
+            if health.last_error:
+                st.code(health.last_error)
+        else:
+            st.info("⏳ Checking API connection...")
+        if health.probe_p50_ms is not None:
+            st.caption(
+                f"Probe p50 {health.probe_p50_ms:.0f} ms, p95 {health.probe_p95_ms:.0f} ms"
+                + (f" · synthesis p50 {health.synthesis_p50_ms:.0f} ms" if health.synthesis_p50_ms is not None else "")
+                + (f" · {health.synthesis_error_rate:.0%} recent errors" if health.synthesis_error_rate else "")
+            )
+        
+        # Presets
+        st.subheader("Preset")
+        preset_store = get_preset_store()
+        selected_preset_name = st.selectbox(
+            "Load Preset",
+            options=["(none)"] + preset_store.names(),
+            help="Saved voice, model and settings combinations"
+        )
+        active_preset = preset_store.get(selected_preset_name) if selected_preset_name != "(none)" else None
         
         # Model Selection
         st.subheader("Model")
         models = list_models()
         model_options = {model["name"]: model["model_id"] for model in models}
+        model_ids = list(model_options.values())
         selected_model_name = st.selectbox(
             "Select TTS Model",
             options=list(model_options.keys()),
-            index=1,  # Default to Turbo v2.5
+            # Default to Turbo v2.5 unless a preset picks the model
+            index=model_ids.index(active_preset.model_id) if active_preset and active_preset.model_id in model_ids else 1,
             help="Choose the TTS model based on your needs"
         )
         selected_model_id = model_options[selected_model_name]
@@ -112,11 +185,35 @@ def main():
             help="Audio quality and file size trade-offs"
         )
         
+        # Automatic model/format selection from observed latency
+        selection_modes = {"Manual": None, "Fastest (preview)": FASTEST, "Quality (final render)": QUALITY}
+        selection_mode = selection_modes[st.selectbox(
+            "Model & Format Selection",
+            options=list(selection_modes.keys()),
+            index=0,
+            help="Let the app pick model and format from text length and recently observed latency"
+        )]
+        latency_target = None
+        if selection_mode is not None:
+            latency_target = st.number_input(
+                "Latency Target (seconds)",
+                min_value=0.0,
+                value=0.0,
+                step=0.5,
+                help="Longest acceptable generation time; 0 for no target"
+            ) or None
+        
         # Voice List Controls
         st.subheader("Voices")
         if st.button("🔄 Refresh Voices", help="Reload available voices from ElevenLabs"):
             st.cache_data.clear()
-            st.rerun()
+            try:
+                # Also drop the copy shared between replicas, or it would be served until it expires
+                invalidate_voice_catalog()
+            except Exception as e:
+                st.error(f"Failed to refresh the shared voice cache: {e}")
+            else:
+                st.rerun()
         
         # Get voices with caching
         @st.cache_data(ttl=600)  # Cache for 10 minutes
@@ -131,9 +228,11 @@ def main():
         
         if voices:
             voice_options = {voice["name"]: voice["voice_id"] for voice in voices}
+            voice_ids = list(voice_options.values())
             selected_voice_name = st.selectbox(
                 "Select Voice",
                 options=list(voice_options.keys()),
+                index=voice_ids.index(active_preset.voice_id) if active_preset and active_preset.voice_id in voice_ids else 0,
                 help="Choose from available ElevenLabs voices"
             )
             selected_voice_id = voice_options[selected_voice_name]
@@ -144,17 +243,15 @@ def main():
         # Voice Settings
         st.subheader("Voice Settings")
         
-        # Get default settings for selected voice
-        try:
-            default_settings = get_voice_settings(selected_voice_id)
-        except Exception as e:
-            st.error(f"Failed to get voice settings: {e}")
-            default_settings = {
-                "stability": 0.5,
-                "similarity_boost": 0.75,
-                "style": 0.0,
-                "use_speaker_boost": True
-            }
+        # Get default settings from the preset, or for the selected voice
+        if active_preset:
+            default_settings = active_preset.voice_settings
+        else:
+            try:
+                default_settings = get_cached_voice_settings(selected_voice_id)
+            except Exception as e:
+                st.error(f"Failed to get voice settings: {e}")
+                default_settings = dict(DEFAULT_VOICE_SETTINGS)
         
         stability = st.slider(
             "Stability",
@@ -187,7 +284,7 @@ def main():
             "Speed",
             min_value=0.5,
             max_value=1.5,
-            value=1.0,
+            value=active_preset.speed if active_preset and active_preset.speed is not None else 1.0,
             step=0.1,
             help="Speech rate multiplier"
         )
@@ -210,9 +307,67 @@ def main():
             
             language_code = st.text_input(
                 "Language Code",
-                value="",
+                value=(active_preset.language_code or "") if active_preset else "",
                 help="Optional: Force specific language (e.g., 'en', 'es')"
             )
+            
+            post_process_enabled = st.checkbox(
+                "Clean up audio",
+                value=False,
+                disabled=not can_encode(output_format),
+                help="Normalize loudness, trim leading/trailing silence and add short fades (MP3 output needs the lameenc package)"
+            )
+            if post_process_enabled:
+                get_audio_pool()
+            
+            captions_enabled = st.checkbox(
+                "Generate captions",
+                value=False,
+                help="Request character timestamps and offer SRT/WebVTT caption downloads (audio clean-up is skipped so timings stay exact)"
+            )
+            
+            hedge_enabled = st.checkbox(
+                "Hedge slow requests",
+                value=False,
+                help="Send a backup request if the first audio byte is slower than usual; may spend a small number of extra characters"
+            )
+            
+            prefetch_enabled = st.checkbox(
+                "Speculative prefetch",
+                value=False,
+                help="After each generation, pre-synthesize the same text for recently used voices so switching back is instant"
+            )
+        
+        # Validated once per distinct combination of values (memoized)
+        try:
+            current_preset = make_preset(
+                name=active_preset.name if active_preset else "current",
+                voice_id=selected_voice_id,
+                model_id=selected_model_id,
+                stability=stability,
+                similarity_boost=similarity_boost,
+                style=style,
+                use_speaker_boost=use_speaker_boost,
+                speed=speed,
+                language_code=language_code.strip() or None
+            )
+        except ValueError as e:
+            st.error(f"Invalid settings: {e}")
+            return
+        
+        # Save Preset
+        with st.expander("Save as Preset"):
+            new_preset_name = st.text_input(
+                "Preset Name",
+                value=active_preset.name if active_preset else "",
+                help="Saving under an existing name adds a new version"
+            )
+            if st.button("💾 Save Preset", use_container_width=True):
+                if new_preset_name.strip():
+                    saved = preset_store.save(current_preset._replace(name=new_preset_name.strip()))
+                    st.success(f"Saved preset '{saved.name}' (version {saved.version})")
+                else:
+                    st.warning("Enter a preset name")
     
     # Main Content Area
     col1, col2 = st.columns([2, 1])
@@ -241,33 +396,62 @@ def main():
                 return
             
             try:
-                with st.spinner("Generating speech..."):
-                    # Prepare voice settings
-                    voice_settings = {
-                        "stability": stability,
-                        "similarity_boost": similarity_boost,
-                        "style": style,
-                        "use_speaker_boost": use_speaker_boost
-                    }
-                    
-                    # Generate audio
-                    audio_bytes, mime_type = synthesize(
+                with st.spinner("Generating speech..."), span(
+                    "generate_speech", text_length=len(text_input), captions=captions_enabled, prefetch=prefetch_enabled
+                ):
+                    synthesis_params = dict(
+                        current_preset.synthesis_kwargs(),
                         text=text_input,
-                        voice_id=selected_voice_id,
-                        model_id=selected_model_id,
                         output_format=output_format,
-                        voice_settings=voice_settings,
                         seed=seed if seed is not None else None,
-                        language_code=language_code if language_code.strip() else None,
-                        speed=speed
+                        post_processing={} if post_process_enabled else None,
+                        hedge=hedge_enabled
                     )
                     
+                    if selection_mode is not None:
+                        choice = SelectionPolicy().choose(len(text_input), selection_mode, latency_target=latency_target)
+                        synthesis_params.update(model_id=choice.model_id, output_format=choice.output_format)
+                        st.caption(
+                            f"Selected {choice.model_id} / {choice.output_format} "
+                            f"(predicted {choice.predicted_latency:.1f}s, {choice.predicted_bytes / 1024:.0f} KB)"
+                            + ("" if choice.meets_targets else " - no option meets the latency target")
+                        )
+                    
+                    # Checked before the request so no characters are spent on audio that can't be re-encoded
+                    if synthesis_params["post_processing"] is not None and not can_encode(synthesis_params["output_format"]):
+                        synthesis_params["post_processing"] = None
+                        st.caption(f"Audio clean-up skipped: {synthesis_params['output_format']} needs the lameenc package")
+                    
+                    # Generate audio
+                    captions = None
+                    if captions_enabled:
+                        timestamp_params = {
+                            k: v for k, v in synthesis_params.items()
+                            if k not in ("post_processing", "hedge")
+                        }
+                        audio_bytes, mime_type, alignment = synthesize_with_timestamps(**timestamp_params)
+                        captions = {"srt": alignment.to_srt(), "vtt": alignment.to_webvtt()}
+                    elif prefetch_enabled or get_shared_cache() is not None:
+                        prefetcher = get_prefetcher()
+                        audio_bytes, mime_type = prefetcher.get_or_synthesize(**synthesis_params)
+                        if prefetch_enabled:
+                            prefetcher.prefetch(synthesis_params, remember_voice(selected_voice_id))
+                    else:
+                        audio_bytes, mime_type = synthesize(**synthesis_params)
+                    
                     st.success("✅ Speech generated successfully!")
                     
-                    # Store in session state for download
-                    st.session_state.audio_bytes = audio_bytes
-                    st.session_state.mime_type = mime_type
-                    st.session_state.output_format = output_format
+                    # Keep the audio in the session history (memory-bounded, may spill to disk)
+                    # and only a reference to it in session state
+                    clip = get_history().add(
+                        audio_bytes,
+                        mime_type,
+                        text_input,
+                        **{k: v for k, v in synthesis_params.items() if k not in ("text", "hedge")}
+                    )
+                    st.session_state.current_clip_id = clip.clip_id
+                    st.session_state.output_format = synthesis_params["output_format"]
+                    st.session_state.captions = captions
                     
             except Exception as e:
                 st.error(f"Failed to generate speech: {e}")
@@ -276,29 +460,85 @@ def main():
     with col2:
         st.header("🎵 Playback")
         
-        # Audio player
-        if hasattr(st.session_state, 'audio_bytes') and st.session_state.audio_bytes:
-            st.audio(
-                st.session_state.audio_bytes,
-                format=st.session_state.mime_type
-            )
-            
-            # Download button
-            file_extension = "mp3" if output_format.startswith("mp3") else "wav"
-            filename = f"ou_law_tts_output.{file_extension}"
-            
-            st.download_button(
-                label="💾 Download Audio",
-                data=st.session_state.audio_bytes,
-                file_name=filename,
-                mime=st.session_state.mime_type,
-                use_container_width=True
-            )
-            
-            # Audio info
-            st.info(f"Format: {output_format}\nSize: {len(st.session_state.audio_bytes):,} bytes")
+        # Audio player; the clip is read from memory or its spill file
+        try:
+            current_clip = get_history().get(st.session_state.get("current_clip_id"))
+        except KeyError:
+            current_clip = None
+        
+        if current_clip is not None:
+            with span("render_playback", bytes=current_clip.size):
+                current_audio = current_clip.read()
+                st.audio(
+                    current_audio,
+                    format=current_clip.mime_type
+                )
+                
+                # Download button
+                file_extension = "mp3" if st.session_state.output_format.startswith("mp3") else "wav"
+                filename = f"ou_law_tts_output.{file_extension}"
+                
+                st.download_button(
+                    label="💾 Download Audio",
+                    data=current_audio,
+                    file_name=filename,
+                    mime=current_clip.mime_type,
+                    use_container_width=True
+                )
+                
+                # Caption downloads
+                captions = st.session_state.get("captions")
+                if captions:
+                    st.download_button(
+                        label="💬 Download Captions (SRT)",
+                        data=captions["srt"],
+                        file_name="ou_law_tts_output.srt",
+                        mime="application/x-subrip",
+                        use_container_width=True
+                    )
+                    st.download_button(
+                        label="💬 Download Captions (WebVTT)",
+                        data=captions["vtt"],
+                        file_name="ou_law_tts_output.vtt",
+                        mime="text/vtt",
+                        use_container_width=True
+                    )
+                
+                # Audio info
+                st.info(f"Format: {st.session_state.output_format}\nSize: {current_clip.size:,} bytes")
         else:
             st.info("Generate speech to see the audio player here")
+        
+        # Session history and bulk export
+        history = get_history()
+        if len(history):
+            with st.expander("🗂️ Session History"):
+                st.caption(f"{len(history)} clips, {history.memory_bytes / 1024:.0f} KB in memory")
+                memory_stats = get_memory_manager().stats()
+                st.caption(
+                    f"Server audio memory: {memory_stats['memory_bytes'] / 1048576:.1f} of "
+                    f"{memory_stats['budget_bytes'] / 1048576:.0f} MB, {memory_stats['spills']} clips spilled to disk"
+                )
+                for clip in reversed(history.clips()):
+                    st.caption(
+                        f"{clip.params.get('voice_id')} · {clip.params.get('model_id')} · "
+                        f"{len(clip.text)} chars · {clip.size / 1024:.0f} KB"
+                        + ("" if clip.in_memory else " · on disk")
+                    )
+                archive_format = st.radio("Archive Format", options=list(ARCHIVE_FORMATS), horizontal=True)
+                if st.button("📦 Prepare Archive", use_container_width=True):
+                    # Written to disk clip by clip; only the finished file is handed to the browser
+                    st.session_state.archive_path = str(history.export_to_file(archive_format))
+                archive_path = st.session_state.get("archive_path")
+                if archive_path and archive_path.endswith(archive_format):
+                    with open(archive_path, "rb") as archive:
+                        st.download_button(
+                            label="💾 Download All Clips",
+                            data=archive,
+                            file_name=f"ou_law_tts_clips.{archive_format}",
+                            mime="application/zip" if archive_format == "zip" else "application/gzip",
+                            use_container_width=True
+                        )
     
     # Footer
     st.markdown("---")
@@ -308,4 +548,6 @@ def main():
     )
 
 if __name__ == "__main__":
-    main()
+    # One trace per rerun, so generation and rendering time show up together
+    with span("streamlit_rerun"):
+        main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for audio post-processing.
+
+Reports audio-seconds processed per CPU-second for a synthetic speech-like
+clip (tone bursts with leading/trailing silence).
+
+With --pool, also submits one clip per core to the audio process pool and
+reports wall-clock throughput, which should scale with core count.
+
+Usage:
+    python3 benchmarks/bench_post_process.py [--seconds 300] [--rate 44100] [--pool]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eleven_audio import post_process
+from eleven_executor import get_process_pool, pool_workers, shutdown_process_pool, submit_audio_task
+
+
+def make_clip(seconds: float, sample_rate: int) -> bytes:
+    """Build a 16-bit PCM clip with 1 s of silence at each end."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    speech = 0.2 * np.sin(2 * np.pi * 220 * t) * (np.sin(2 * np.pi * 3 * t) > 0)
+    speech += 0.01 * rng.standard_normal(len(t))
+    silence = np.zeros(sample_rate)
+    clip = np.concatenate([silence, speech, silence])
+    return (clip * 32767).astype("<i2").tobytes()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=300.0, help="Clip length in seconds")
+    parser.add_argument("--rate", type=int, default=44100, help="Sample rate in Hz")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed runs")
+    parser.add_argument("--pool", action="store_true", help="Also measure process-pool scaling")
+    args = parser.parse_args()
+
+    pcm = make_clip(args.seconds, args.rate)
+    audio_seconds = len(pcm) / 2 / args.rate
+    input_format = f"pcm_{args.rate}"
+
+    for output_format in (input_format, f"wav_{args.rate}"):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.process_time()
+            post_process(pcm, input_format, output_format)
+            best = min(best, time.process_time() - start)
+        print(
+            f"{output_format:12} {audio_seconds:8.1f} audio-s  "
+            f"{best * 1000:8.1f} ms CPU  {audio_seconds / best:10.0f} audio-s/CPU-s"
+        )
+
+    if args.pool:
+        cores = pool_workers()
+        output_format = f"wav_{args.rate}"
+        get_process_pool()
+        # Warm the workers so spawn time isn't measured
+        for future in [submit_audio_task(post_process, pcm, input_format, output_format) for _ in range(cores)]:
+            future.result()
+        start = time.perf_counter()
+        futures = [submit_audio_task(post_process, pcm, input_format, output_format) for _ in range(cores)]
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - start
+        print(
+            f"pool x{cores:<3}    {audio_seconds * cores:8.1f} audio-s  "
+            f"{elapsed * 1000:8.1f} ms wall {audio_seconds * cores / elapsed:10.0f} audio-s/wall-s"
+        )
+        shutdown_process_pool()
+
+
+if __name__ == "__main__":
+    main()
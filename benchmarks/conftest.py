@@ -0,0 +1,131 @@
+"""
+Pytest integration for the benchmark suite.
+
+Options:
+    --bench-save PATH       Write this run's results (e.g. to refresh benchmarks/baseline.json)
+    --bench-compare PATH    Fail the run if any metric regressed against the baseline at PATH
+    --bench-threshold X     Allowed relative regression for --bench-compare (default 0.25)
+"""
+
+import logging
+import os
+import sys
+
+import pytest
+
+# Add parent and this directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import eleven_backend
+import eleven_memory
+import eleven_policy
+import eleven_presets
+import eleven_usage
+from fake_api import FakeElevenLabs
+from harness import DEFAULT_THRESHOLD, compare_results, format_results, load_results, peak_bytes_per_call, reference_workload, save_results, time_relative_to
+
+_results = {}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption("--bench-save", metavar="PATH", help="Write benchmark results to PATH")
+    group.addoption("--bench-compare", metavar="PATH", help="Fail on regressions against the baseline at PATH")
+    group.addoption("--bench-threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed relative regression")
+
+
+class Benchmark:
+    """Record metrics for the running benchmark under its name."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __call__(self, func, timing: bool = True, memory: bool = True, rounds: int = 5, reference=None):
+        """
+        Measure func (called with no arguments) and record the results.
+
+        Rounds of func alternate with rounds of reference (by default
+        harness.reference_workload), and func's time relative to it is
+        recorded as well; comparisons gate on that ratio.
+
+        Returns:
+            dict: The recorded metrics
+        """
+        metrics = {}
+        if timing:
+            metrics["seconds_per_call"], metrics["relative_to_reference"] = time_relative_to(
+                func, reference or reference_workload, rounds=rounds
+            )
+        if memory:
+            metrics["peak_bytes_per_call"] = peak_bytes_per_call(func, warmup=not timing)
+        _results[self.name] = metrics
+        return metrics
+
+
+@pytest.fixture
+def benchmark(request):
+    """Measure a callable; results are keyed by the test name (with parameters)."""
+    return Benchmark(request.node.name)
+
+
+@pytest.fixture(autouse=True)
+def isolated_backend(tmp_path, monkeypatch):
+    """Fresh client cache and process-wide state, with INFO logging off so log I/O isn't measured."""
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "benchmark-key")
+    monkeypatch.setattr(eleven_backend, "_clients", {})
+    monkeypatch.setattr(eleven_backend, "_health_monitor", None)
+    monkeypatch.setattr(eleven_backend, "_shared_cache", None)
+    monkeypatch.setattr(eleven_usage, "_ledger", eleven_usage.UsageLedger(path=tmp_path / "usage.json", budget=None))
+    monkeypatch.setattr(eleven_presets, "_store", eleven_presets.PresetStore(path=tmp_path / "presets.json"))
+    monkeypatch.setattr(eleven_policy, "_metrics", eleven_policy.ModelMetrics())
+    monkeypatch.setattr(eleven_memory, "_manager", eleven_memory.AudioMemoryManager())
+    logging.disable(logging.INFO)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    """
+    Route the backend to an in-process fake API.
+
+    Call with keyword arguments for FakeElevenLabs (voices, audio_bytes,
+    chunk_size); returns the transport.
+    """
+    def install(**kwargs):
+        transport = FakeElevenLabs(**kwargs)
+        monkeypatch.setattr(eleven_backend, "_transport", transport)
+        monkeypatch.setattr(eleven_backend, "_clients", {})
+        return transport
+    return install
+
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    if not _results:
+        return
+    save_path = config.getoption("--bench-save")
+    if save_path:
+        save_results(save_path, _results)
+    baseline_path = config.getoption("--bench-compare")
+    if baseline_path:
+        regressions = compare_results(load_results(baseline_path), _results, config.getoption("--bench-threshold"))
+        config._bench_regressions = regressions
+        if regressions:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if not _results:
+        return
+    terminalreporter.section("benchmark results")
+    for line in format_results(_results):
+        terminalreporter.write_line(line)
+    regressions = getattr(config, "_bench_regressions", None)
+    if regressions is not None:
+        terminalreporter.section("benchmark regressions")
+        for regression in regressions:
+            terminalreporter.write_line(f"REGRESSION {regression}", red=True)
+        if not regressions:
+            terminalreporter.write_line(f"No regressions beyond {config.getoption('--bench-threshold'):.0%}", green=True)
@@ -0,0 +1,75 @@
+"""
+In-process fake of the ElevenLabs HTTP API for benchmarks.
+
+FakeElevenLabs is an httpx transport, installed with
+eleven_backend.set_transport(), so benchmarks exercise the real SDK
+request/response path (serialization, pydantic parsing, streaming) with
+no network and no latency. Response bodies are built once up front so
+the fake itself adds as little as possible to what is measured.
+"""
+
+import json
+import re
+
+import httpx
+
+_TTS_PATH = re.compile(r"^/v1/text-to-speech/[^/]+(/stream)?$")
+
+
+class _ChunkedBody(httpx.SyncByteStream):
+    """Response body served in fixed-size chunks, like a streamed synthesis."""
+
+    def __init__(self, body: bytes, chunk_size: int):
+        self._body = body
+        self._chunk_size = chunk_size
+
+    def __iter__(self):
+        view = memoryview(self._body)
+        for start in range(0, len(view), self._chunk_size):
+            yield bytes(view[start:start + self._chunk_size])
+
+
+def make_voice(index: int) -> dict:
+    """Return one catalog entry shaped like GET /v1/voices."""
+    return {
+        "voice_id": f"voice{index:06d}",
+        "name": f"Voice {index}",
+        "category": "premade",
+        "labels": {"accent": "british", "gender": "female" if index % 2 else "male"},
+        "settings": {"stability": 0.5, "similarity_boost": 0.75, "style": 0.0, "use_speaker_boost": True, "speed": 1.0}
+    }
+
+
+class FakeElevenLabs(httpx.BaseTransport):
+    """
+    Serve the voice catalog, text-to-speech and subscription endpoints.
+
+    Every synthesis returns the same audio_bytes of audio, streamed in
+    chunk_size pieces; requests counts calls by path.
+    """
+
+    def __init__(self, voices: int = 20, audio_bytes: int = 32 * 1024, chunk_size: int = 4096):
+        self.voice_ids = [f"voice{index:06d}" for index in range(voices)]
+        self._voices_body = json.dumps({"voices": [make_voice(index) for index in range(voices)]}).encode("utf-8")
+        self._audio = bytes(range(256)) * (audio_bytes // 256) + bytes(audio_bytes % 256)
+        self._subscription_body = json.dumps({
+            "tier": "creator", "character_count": 0, "character_limit": 10 ** 9, "status": "active"
+        }).encode("utf-8")
+        self.chunk_size = chunk_size
+        self.requests = {}
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.requests[path] = self.requests.get(path, 0) + 1
+        if request.method == "GET" and path == "/v1/voices":
+            return httpx.Response(200, headers={"content-type": "application/json"}, content=self._voices_body)
+        if request.method == "POST" and _TTS_PATH.match(path):
+            request.read()
+            return httpx.Response(
+                200,
+                headers={"content-type": "audio/mpeg"},
+                stream=_ChunkedBody(self._audio, self.chunk_size)
+            )
+        if request.method == "GET" and path == "/v1/user/subscription":
+            return httpx.Response(200, headers={"content-type": "application/json"}, content=self._subscription_body)
+        return httpx.Response(404, json={"detail": f"Fake API has no route for {request.method} {path}"})
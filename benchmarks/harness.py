@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Measurement, baseline storage and regression checks for the benchmark suite.
+
+Every benchmark records named metrics where lower is better:
+- seconds_per_call: median-of-rounds wall time of one call
+- relative_to_reference: median ratio of one call's time to that of a
+  reference call timed in alternating rounds (the same lookup on a small
+  catalog, or reference_workload()), which holds steady across machines
+  and load far better than wall time
+- peak_bytes_per_call: tracemalloc high-water mark of one call above the
+  memory already held (transient allocations, including streamed audio)
+
+Results files are JSON: {"environment": {...}, "results": {name: {metric: value}}}.
+Regression checks gate on relative_to_reference wherever it was recorded
+and ignore that benchmark's seconds_per_call, which only compares
+meaningfully on the machine that recorded the baseline.
+
+Usage:
+    python3 benchmarks/harness.py compare benchmarks/baseline.json results.json [--threshold 0.25]
+"""
+
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+DEFAULT_THRESHOLD = 0.25
+
+# Differences below these floors are noise, whatever the relative change
+ABSOLUTE_FLOORS = {"seconds_per_call": 2e-6, "peak_bytes_per_call": 4096, "relative_to_reference": 0.002}
+
+# Parsed by reference_workload(): a voice catalog page, like much of the backend's own work
+_REFERENCE_PAYLOAD = json.dumps([
+    {"voice_id": f"voice{index:06d}", "name": f"Voice {index}", "settings": {"stability": 0.5, "similarity_boost": 0.75}}
+    for index in range(20)
+])
+
+
+def reference_workload() -> None:
+    """Fixed pure-Python work timed alongside a benchmark to factor out the machine's speed."""
+    json.loads(_REFERENCE_PAYLOAD)
+
+
+def _calibrate(func: Callable[[], Any], min_round_seconds: float) -> Tuple[int, float]:
+    """Return how many calls of func fill min_round_seconds, and the per-call time of that round."""
+    func()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_round_seconds or number >= 1 << 20:
+            return number, elapsed / number
+        number = min(1 << 20, max(number * 2, int(number * min_round_seconds / max(elapsed, 1e-9)) + 1))
+
+
+def _time_round(func: Callable[[], Any], number: int) -> float:
+    """Return the per-call wall time of one round of number calls."""
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return (time.perf_counter() - start) / number
+
+
+def time_per_call(func: Callable[[], Any], rounds: int = 5, min_round_seconds: float = 0.05) -> float:
+    """
+    Return the median per-call wall time of func over several rounds.
+
+    The number of calls per round is calibrated so each round lasts at
+    least min_round_seconds; garbage collection is paused while timing,
+    as in timeit. The median, unlike the best round, does not reward a
+    single lucky round on slow calls that only fit once per round.
+    """
+    number, first = _calibrate(func, min_round_seconds)
+    samples = [first]
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds - 1):
+            samples.append(_time_round(func, number))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return statistics.median(samples)
+
+
+def time_relative_to(
+    func: Callable[[], Any],
+    reference: Callable[[], Any],
+    rounds: int = 5,
+    min_round_seconds: float = 0.05
+) -> Tuple[float, float]:
+    """
+    Return func's median per-call time and its median ratio to reference's.
+
+    Rounds of func and reference alternate, so a machine-wide slowdown
+    during the measurement affects both sides of each ratio alike.
+    """
+    number, _ = _calibrate(func, min_round_seconds)
+    reference_number, _ = _calibrate(reference, min_round_seconds)
+    samples = []
+    ratios = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            reference_seconds = _time_round(reference, reference_number)
+            samples.append(_time_round(func, number))
+            ratios.append(samples[-1] / reference_seconds)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return statistics.median(samples), statistics.median(ratios)
+
+
+def peak_bytes_per_call(func: Callable[[], Any], warmup: bool = True) -> int:
+    """Return the tracemalloc high-water mark of one call of func, above its starting point."""
+    if warmup:
+        func()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - baseline
+
+
+def environment() -> Dict[str, str]:
+    """Describe the machine and interpreter that produced a results file."""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "processor": platform.processor()
+    }
+
+
+def save_results(path: Path, results: Dict[str, Dict[str, float]]) -> None:
+    """Write results with their environment to path."""
+    Path(path).write_text(json.dumps({"environment": environment(), "results": results}, indent=2, sort_keys=True) + "\n")
+
+
+def load_results(path: Path) -> Dict[str, Dict[str, float]]:
+    """Read the results mapping from a file written by save_results()."""
+    return json.loads(Path(path).read_text())["results"]
+
+
+class Regression(NamedTuple):
+    """A metric that got worse than the baseline by more than the threshold."""
+
+    benchmark: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1 if self.baseline else float("inf")
+
+    def __str__(self) -> str:
+        return f"{self.benchmark} {self.metric}: {self.baseline:.4g} -> {self.current:.4g} (+{self.change:.0%})"
+
+
+def compare_results(
+    baseline: Dict[str, Dict[str, float]],
+    current: Dict[str, Dict[str, float]],
+    threshold: float = DEFAULT_THRESHOLD
+) -> List[Regression]:
+    """
+    Find metrics in current that regressed against baseline.
+
+    A metric regresses when it exceeds the baseline by more than threshold
+    (relative) and by more than its absolute noise floor. Benchmarks or
+    metrics missing from either side are ignored, and so is the absolute
+    time of a benchmark measured against a reference: its
+    relative_to_reference is compared instead.
+
+    Returns:
+        List[Regression]: Regressions, in benchmark order
+    """
+    regressions = []
+    for name, metrics in current.items():
+        for metric, value in metrics.items():
+            reference = baseline.get(name, {}).get(metric)
+            if reference is None:
+                continue
+            if metric == "seconds_per_call" and "relative_to_reference" in metrics:
+                continue
+            if value > reference * (1 + threshold) and value - reference > ABSOLUTE_FLOORS.get(metric, 0):
+                regressions.append(Regression(name, metric, reference, value))
+    return regressions
+
+
+def format_results(results: Dict[str, Dict[str, float]]) -> List[str]:
+    """Return one aligned line per benchmark for terminal output."""
+    lines = []
+    for name in sorted(results):
+        metrics = results[name]
+        parts = []
+        if "seconds_per_call" in metrics:
+            parts.append(f"{metrics['seconds_per_call'] * 1e6:12.1f} us/call")
+        if "relative_to_reference" in metrics:
+            parts.append(f"{metrics['relative_to_reference']:8.1f}x reference")
+        if "peak_bytes_per_call" in metrics:
+            parts.append(f"{metrics['peak_bytes_per_call'] / 1024:12.1f} KiB peak/call")
+        lines.append(f"{name:48} " + "  ".join(parts))
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    compare = subcommands.add_parser("compare", help="Flag regressions of a results file against a baseline")
+    compare.add_argument("baseline", type=Path, help="Baseline results file")
+    compare.add_argument("current", type=Path, help="New results file (pytest benchmarks --bench-save)")
+    compare.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed relative slowdown (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    regressions = compare_results(load_results(args.baseline), load_results(args.current), args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Microbenchmarks for backend hot paths against the in-process fake API.
+
+Run with:
+    python3 -m pytest benchmarks -q                                   # measure and print
+    python3 -m pytest benchmarks -q --bench-compare benchmarks/baseline.json
+    python3 -m pytest benchmarks -q --bench-save benchmarks/baseline.json
+"""
+
+import pytest
+
+import eleven_backend
+from eleven_backend import get_client, get_voice_settings, synthesize, synthesize_stream
+
+
+class TestPerCallOverhead:
+    """Backend cost of one call when the API answers instantly."""
+
+    def test_get_client_cached(self, benchmark, fake_api):
+        fake_api()
+        get_client()
+
+        benchmark(get_client)
+
+    def test_synthesize_small(self, benchmark, fake_api):
+        api = fake_api(audio_bytes=16 * 1024)
+
+        metrics = benchmark(lambda: synthesize("Hello from the benchmark suite.", api.voice_ids[0]))
+
+        assert metrics["seconds_per_call"] > 0
+
+    def test_get_voice_settings(self, benchmark, fake_api):
+        api = fake_api(voices=20)
+
+        benchmark(lambda: get_voice_settings(api.voice_ids[-1]))
+
+
+class TestCatalogScaling:
+    """
+    Voice lookup cost as the account's catalog grows.
+
+    Each size is timed alongside a 10-voice catalog; the gate is on the
+    ratio between them, which holds steady when the machine as a whole
+    runs faster or slower between the baseline and the comparison.
+    """
+
+    @staticmethod
+    def lookup_last_voice(fake_api, voices):
+        """Return a callable looking up the last voice of its own fake catalog."""
+        api = fake_api(voices=voices)
+        clients = eleven_backend._clients
+
+        def lookup():
+            eleven_backend._transport = api
+            eleven_backend._clients = clients
+            get_voice_settings(api.voice_ids[-1])
+        return lookup
+
+    @pytest.mark.parametrize("voices", [1000, 3000])
+    def test_get_voice_settings_catalog(self, benchmark, fake_api, voices):
+        reference = self.lookup_last_voice(fake_api, 10)
+        lookup = self.lookup_last_voice(fake_api, voices)
+
+        # A lookup fits only once per round, so take more rounds for a stable median
+        metrics = benchmark(lookup, reference=reference, rounds=9)
+
+        assert metrics["relative_to_reference"] > 1
+
+
+class TestStreamingMemory:
+    """Memory high-water marks while receiving long audio."""
+
+    AUDIO_BYTES = 4 * 1024 * 1024
+
+    def test_synthesize_buffers_whole_clip(self, benchmark, fake_api):
+        api = fake_api(audio_bytes=self.AUDIO_BYTES, chunk_size=64 * 1024)
+
+        metrics = benchmark(lambda: synthesize("Long text", api.voice_ids[0]), timing=False)
+
+        # The whole clip is returned, so the peak is at least its size
+        assert metrics["peak_bytes_per_call"] >= self.AUDIO_BYTES
+
+    def test_synthesize_stream_consumed_incrementally(self, benchmark, fake_api):
+        api = fake_api(audio_bytes=self.AUDIO_BYTES, chunk_size=64 * 1024)
+
+        def consume():
+            for _ in synthesize_stream("Long text", api.voice_ids[0]):
+                pass
+
+        metrics = benchmark(consume, timing=False)
+
+        assert metrics["peak_bytes_per_call"] < self.AUDIO_BYTES / 4
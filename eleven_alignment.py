@@ -0,0 +1,239 @@
+"""
+Character Alignment and Captions
+
+This module handles the character-level timestamps returned with synthesized audio:
+- A compact Alignment structure (one string plus two float32 arrays)
+- Shifting and joining alignments for audio stitched from several fragments
+- Word extraction and SRT/WebVTT caption rendering
+- Splitting long text into fragments at sentence boundaries
+"""
+
+import re
+import logging
+from typing import Any, Iterable, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"\S+")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?…])\s+")
+
+
+class Alignment:
+	"""
+	Character timestamps stored as a string and two parallel float32 arrays.
+
+	A 10,000 character alignment takes about 80 KB instead of the
+	several megabytes needed for the equivalent lists of floats and dicts.
+	"""
+
+	__slots__ = ("text", "starts", "ends")
+
+	def __init__(self, text: str, starts: np.ndarray, ends: np.ndarray):
+		if not len(text) == len(starts) == len(ends):
+			raise ValueError("Alignment text and timestamp arrays must have equal length")
+		self.text = text
+		self.starts = np.asarray(starts, dtype=np.float32)
+		self.ends = np.asarray(ends, dtype=np.float32)
+
+	@classmethod
+	def from_response(cls, alignment: Any) -> "Alignment":
+		"""
+		Build from an API alignment object (characters and start/end second lists).
+
+		Multi-codepoint characters have their timing repeated for each codepoint
+		so that text indices and array indices always line up.
+
+		Args:
+			alignment: Object with characters, character_start_times_seconds and character_end_times_seconds
+
+		Returns:
+			Alignment: Compact alignment
+		"""
+		characters = alignment.characters
+		starts = np.asarray(alignment.character_start_times_seconds, dtype=np.float32)
+		ends = np.asarray(alignment.character_end_times_seconds, dtype=np.float32)
+		lengths = np.fromiter((len(c) for c in characters), dtype=np.intp, count=len(characters))
+		if (lengths != 1).any():
+			starts, ends = np.repeat(starts, lengths), np.repeat(ends, lengths)
+		return cls("".join(characters), starts, ends)
+
+	@classmethod
+	def empty(cls) -> "Alignment":
+		return cls("", np.empty(0, np.float32), np.empty(0, np.float32))
+
+	def __len__(self) -> int:
+		return len(self.text)
+
+	@property
+	def duration(self) -> float:
+		"""End time of the last character in seconds."""
+		return float(self.ends[-1]) if len(self.ends) else 0.0
+
+	@property
+	def nbytes(self) -> int:
+		"""Approximate memory used by the timestamp arrays."""
+		return self.starts.nbytes + self.ends.nbytes
+
+	def shifted(self, offset: float) -> "Alignment":
+		"""
+		Return a copy with every timestamp moved by offset seconds.
+		"""
+		return Alignment(self.text, self.starts + np.float32(offset), self.ends + np.float32(offset))
+
+	@classmethod
+	def concat(cls, parts: Iterable[Tuple["Alignment", float]], separator: str = " ") -> "Alignment":
+		"""
+		Join fragment alignments, shifting each by its offset in the stitched audio.
+
+		Args:
+			parts (Iterable[Tuple[Alignment, float]]): (alignment, start offset in seconds) per fragment
+			separator (str): Text inserted between fragments, timed at the previous fragment's end
+
+		Returns:
+			Alignment: Alignment of the stitched audio
+		"""
+		texts: List[str] = []
+		starts: List[np.ndarray] = []
+		ends: List[np.ndarray] = []
+		for alignment, offset in parts:
+			if texts and separator:
+				gap = np.full(len(separator), ends[-1][-1] if len(ends[-1]) else offset, dtype=np.float32)
+				texts.append(separator)
+				starts.append(gap)
+				ends.append(gap)
+			texts.append(alignment.text)
+			starts.append(alignment.starts + np.float32(offset))
+			ends.append(alignment.ends + np.float32(offset))
+		if not texts:
+			return cls.empty()
+		return cls("".join(texts), np.concatenate(starts), np.concatenate(ends))
+
+	def words(self) -> List[Tuple[str, float, float]]:
+		"""
+		Return whitespace-separated words with their start and end times.
+
+		Returns:
+			List[Tuple[str, float, float]]: (word, start seconds, end seconds)
+		"""
+		spans = [(m.start(), m.end()) for m in _WORD_RE.finditer(self.text)]
+		if not spans:
+			return []
+		first = np.fromiter((s for s, _ in spans), dtype=np.intp, count=len(spans))
+		last = np.fromiter((e - 1 for _, e in spans), dtype=np.intp, count=len(spans))
+		word_starts = self.starts[first].tolist()
+		word_ends = self.ends[last].tolist()
+		return [(self.text[s:e], word_starts[i], word_ends[i]) for i, (s, e) in enumerate(spans)]
+
+	def cues(self, max_chars: int = 42, max_duration: float = 6.0) -> List[Tuple[float, float, str]]:
+		"""
+		Group words into caption cues.
+
+		A cue ends when adding the next word would exceed max_chars or
+		max_duration, or after a word that ends a sentence.
+
+		Args:
+			max_chars (int): Maximum characters per cue
+			max_duration (float): Maximum cue length in seconds
+
+		Returns:
+			List[Tuple[float, float, str]]: (start, end, text) per cue
+		"""
+		cues: List[Tuple[float, float, str]] = []
+		current: List[str] = []
+		cue_start = cue_end = 0.0
+		length = 0
+		for word, start, end in self.words():
+			if current and (length + 1 + len(word) > max_chars or end - cue_start > max_duration):
+				cues.append((cue_start, cue_end, " ".join(current)))
+				current = []
+			if not current:
+				cue_start, length = start, -1
+			current.append(word)
+			length += 1 + len(word)
+			cue_end = end
+			if word[-1] in ".!?…":
+				cues.append((cue_start, cue_end, " ".join(current)))
+				current = []
+		if current:
+			cues.append((cue_start, cue_end, " ".join(current)))
+		return cues
+
+	def to_srt(self, **cue_options: Any) -> str:
+		"""
+		Render word-level captions as SubRip (SRT).
+
+		Args:
+			**cue_options: cues() keyword arguments
+
+		Returns:
+			str: SRT document
+		"""
+		blocks = [
+			f"{i}\n{_timestamp(start, ',')} --> {_timestamp(end, ',')}\n{text}\n"
+			for i, (start, end, text) in enumerate(self.cues(**cue_options), 1)
+		]
+		return "\n".join(blocks)
+
+	def to_webvtt(self, **cue_options: Any) -> str:
+		"""
+		Render word-level captions as WebVTT.
+
+		Args:
+			**cue_options: cues() keyword arguments
+
+		Returns:
+			str: WebVTT document
+		"""
+		blocks = [
+			f"{_timestamp(start, '.')} --> {_timestamp(end, '.')}\n{text}\n"
+			for start, end, text in self.cues(**cue_options)
+		]
+		return "\n".join(["WEBVTT\n"] + blocks)
+
+
+def _timestamp(seconds: float, decimal: str) -> str:
+	"""Format seconds as HH:MM:SS<decimal>mmm."""
+	millis = max(int(round(seconds * 1000)), 0)
+	hours, millis = divmod(millis, 3_600_000)
+	minutes, millis = divmod(millis, 60_000)
+	secs, millis = divmod(millis, 1000)
+	return f"{hours:02d}:{minutes:02d}:{secs:02d}{decimal}{millis:03d}"
+
+
+def chunk_text(text: str, max_chars: int = 2500) -> List[str]:
+	"""
+	Split long text into fragments of at most max_chars, preferring sentence boundaries.
+
+	Sentences longer than max_chars are split at word boundaries, and
+	single words longer than max_chars are split hard.
+
+	Args:
+		text (str): Text to split
+		max_chars (int): Maximum fragment length
+
+	Returns:
+		List[str]: Fragments with surrounding whitespace stripped
+	"""
+	fragments: List[str] = []
+	current = ""
+	for sentence in _SENTENCE_END_RE.split(text.strip()):
+		pieces = [sentence] if len(sentence) <= max_chars else _WORD_RE.findall(sentence)
+		for piece in pieces:
+			while len(piece) > max_chars:
+				if current:
+					fragments.append(current)
+					current = ""
+				fragments.append(piece[:max_chars])
+				piece = piece[max_chars:]
+			if not piece:
+				continue
+			if current and len(current) + 1 + len(piece) > max_chars:
+				fragments.append(current)
+				current = piece
+			else:
+				current = f"{current} {piece}" if current else piece
+	if current:
+		fragments.append(current)
+	return fragments
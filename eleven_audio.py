@@ -0,0 +1,369 @@
+"""
+Audio Post-Processing
+
+This module cleans up synthesized audio before it is returned:
+- Decoding raw PCM and WAV output to 16-bit samples
+- Gated RMS loudness normalization with a peak ceiling
+- Leading/trailing silence trimming and short fades
+- Re-encoding to PCM, WAV or (with lameenc installed) MP3
+
+All processing is NumPy-vectorized and works on fixed-size chunks, so
+the float working set stays bounded regardless of clip length.
+"""
+
+import io
+import wave
+import struct
+import logging
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Optional MP3 encoder
+try:
+	import lameenc
+	LAMEENC_AVAILABLE = True
+except ImportError:
+	LAMEENC_AVAILABLE = False
+
+FULL_SCALE = 32768.0
+
+
+def format_sample_rate(output_format: str) -> int:
+	"""
+	Return the sample rate encoded in an ElevenLabs output format name.
+
+	Args:
+		output_format (str): Format such as "mp3_44100_128", "wav_44100" or "pcm_22050"
+
+	Returns:
+		int: Sample rate in Hz
+
+	Raises:
+		ValueError: If the format has no sample rate component
+	"""
+	parts = output_format.split("_")
+	if len(parts) < 2 or not parts[1].isdigit():
+		raise ValueError(f"Cannot determine sample rate from output format {output_format}")
+	return int(parts[1])
+
+
+def pcm_format_for(output_format: str) -> str:
+	"""
+	Return the raw PCM format to request when post-processing into output_format.
+
+	Args:
+		output_format (str): Final output format
+
+	Returns:
+		str: Matching "pcm_<rate>" format
+	"""
+	return f"pcm_{format_sample_rate(output_format)}"
+
+
+def _wav_samples(audio_bytes: bytes) -> Tuple[np.ndarray, int]:
+	"""Locate the data chunk of a 16-bit mono WAV and view it without copying."""
+	if audio_bytes[:4] != b"RIFF" or audio_bytes[8:12] != b"WAVE":
+		raise ValueError("Audio is not a RIFF/WAVE file")
+
+	sample_rate = None
+	offset = 12
+	while offset + 8 <= len(audio_bytes):
+		chunk_id = audio_bytes[offset:offset + 4]
+		(chunk_size,) = struct.unpack("<I", audio_bytes[offset + 4:offset + 8])
+		body = offset + 8
+		if chunk_id == b"fmt ":
+			_, channels, sample_rate, _, _, bits = struct.unpack("<HHIIHH", audio_bytes[body:body + 16])
+			if channels != 1 or bits != 16:
+				raise ValueError(f"Only 16-bit mono WAV is supported (got {channels} channels, {bits} bits)")
+		elif chunk_id == b"data":
+			if sample_rate is None:
+				raise ValueError("WAV data chunk precedes fmt chunk")
+			size = min(chunk_size, len(audio_bytes) - body) // 2 * 2
+			return np.frombuffer(audio_bytes, dtype="<i2", count=size // 2, offset=body), sample_rate
+		offset = body + chunk_size + (chunk_size & 1)
+
+	raise ValueError("WAV file has no data chunk")
+
+
+def decode_pcm(audio_bytes: bytes, audio_format: str) -> Tuple[np.ndarray, int]:
+	"""
+	Decode synthesized audio to 16-bit mono samples.
+
+	Args:
+		audio_bytes (bytes): Encoded audio
+		audio_format (str): ElevenLabs format the bytes are in ("pcm_*" or "wav_*")
+
+	Returns:
+		Tuple[np.ndarray, int]: Read-only int16 samples (a view of audio_bytes) and sample rate
+
+	Raises:
+		ValueError: If the format cannot be decoded
+	"""
+	if audio_format.startswith("pcm_"):
+		usable = len(audio_bytes) // 2 * 2
+		return np.frombuffer(audio_bytes, dtype="<i2", count=usable // 2), format_sample_rate(audio_format)
+	if audio_format.startswith("wav_"):
+		return _wav_samples(audio_bytes)
+	raise ValueError(f"Cannot decode {audio_format}; request a pcm_* format for post-processing")
+
+
+def can_encode(output_format: str) -> bool:
+	"""
+	Return whether post-processed audio can be re-encoded to output_format.
+
+	Check this before requesting audio for post-processing, so a missing
+	encoder fails before any characters are spent.
+
+	Args:
+		output_format (str): Target ElevenLabs format
+
+	Returns:
+		bool: True for pcm_* and wav_*, and for mp3_* when lameenc is installed
+	"""
+	if output_format.startswith(("pcm_", "wav_")):
+		return True
+	return output_format.startswith("mp3_") and LAMEENC_AVAILABLE
+
+
+def can_stitch(audio_format: str) -> bool:
+	"""
+	Return whether fragments in audio_format can be measured and stitched.
+
+	Check this before requesting a text in several fragments, so an
+	unsupported format fails before any characters are spent.
+
+	Args:
+		audio_format (str): ElevenLabs format of the fragments
+
+	Returns:
+		bool: True for mp3_*, pcm_* and wav_* (see audio_duration() and concat_audio())
+	"""
+	return audio_format.startswith(("mp3_", "pcm_", "wav_"))
+
+
+def encode_audio(chunks: Iterator[np.ndarray], sample_rate: int, output_format: str) -> bytes:
+	"""
+	Encode a stream of int16 sample chunks.
+
+	Args:
+		chunks (Iterator[np.ndarray]): int16 mono sample chunks
+		sample_rate (int): Sample rate in Hz
+		output_format (str): Target ElevenLabs format ("pcm_*", "wav_*" or "mp3_*")
+
+	Returns:
+		bytes: Encoded audio
+
+	Raises:
+		ValueError: If the format is unsupported or needs a missing encoder
+	"""
+	if output_format.startswith("pcm_"):
+		return b"".join(chunk.tobytes() for chunk in chunks)
+
+	if output_format.startswith("wav_"):
+		buffer = io.BytesIO()
+		with wave.open(buffer, "wb") as writer:
+			writer.setnchannels(1)
+			writer.setsampwidth(2)
+			writer.setframerate(sample_rate)
+			for chunk in chunks:
+				writer.writeframes(chunk.tobytes())
+		return buffer.getvalue()
+
+	if output_format.startswith("mp3_"):
+		if not LAMEENC_AVAILABLE:
+			raise ValueError("MP3 re-encoding requires the optional 'lameenc' package")
+		parts = output_format.split("_")
+		encoder = lameenc.Encoder()
+		encoder.set_bit_rate(int(parts[2]) if len(parts) > 2 else 128)
+		encoder.set_in_sample_rate(sample_rate)
+		encoder.set_channels(1)
+		encoder.set_quality(2)
+		encoded = bytearray()
+		for chunk in chunks:
+			encoded += encoder.encode(chunk.tobytes())
+		encoded += encoder.flush()
+		return bytes(encoded)
+
+	raise ValueError(f"Unsupported output format {output_format}")
+
+
+def _analyze(
+	samples: np.ndarray,
+	frame: int,
+	chunk: int,
+	silence_threshold: float
+) -> Tuple[int, int, float, int, float]:
+	"""
+	Scan samples chunk by chunk.
+
+	Returns:
+		Tuple: (first loud sample, end of last loud frame, sum of squares over
+		loud frames, number of loud samples, absolute peak)
+	"""
+	first, last = -1, -1
+	loud_sumsq, loud_count, peak = 0.0, 0, 0.0
+	threshold_sq = silence_threshold * silence_threshold
+
+	for start in range(0, len(samples), chunk):
+		block = samples[start:start + chunk].astype(np.float32)
+		squares = block * block
+		starts = np.arange(0, len(block), frame)
+		sizes = np.diff(np.append(starts, len(block)))
+		frame_sums = np.add.reduceat(squares, starts)
+		loud = np.flatnonzero(frame_sums >= threshold_sq * sizes)
+
+		peak = max(peak, float(np.abs(block).max(initial=0.0)))
+		if loud.size:
+			if first < 0:
+				first = start + int(starts[loud[0]])
+			last = start + int(starts[loud[-1]] + sizes[loud[-1]])
+			loud_sumsq += float(frame_sums[loud].sum(dtype=np.float64))
+			loud_count += int(sizes[loud].sum())
+
+	return first, last, loud_sumsq, loud_count, peak
+
+
+def process_samples(
+	samples: np.ndarray,
+	sample_rate: int,
+	normalize: bool = True,
+	target_dbfs: float = -20.0,
+	peak_dbfs: float = -1.0,
+	trim: bool = True,
+	silence_dbfs: float = -50.0,
+	fade_ms: float = 10.0,
+	chunk_seconds: float = 5.0
+) -> Iterator[np.ndarray]:
+	"""
+	Normalize, trim and fade int16 samples, yielding processed chunks.
+
+	Loudness is measured as RMS over non-silent 10 ms frames, so pauses do
+	not drag the estimate down. Gain is capped so the peak stays under
+	peak_dbfs.
+
+	Args:
+		samples (np.ndarray): int16 mono samples
+		sample_rate (int): Sample rate in Hz
+		normalize (bool): Apply loudness normalization
+		target_dbfs (float): Target gated RMS level in dBFS
+		peak_dbfs (float): Peak ceiling in dBFS
+		trim (bool): Remove leading and trailing silence
+		silence_dbfs (float): Frames quieter than this count as silence
+		fade_ms (float): Fade-in/out length in milliseconds (0 disables)
+		chunk_seconds (float): Processing chunk length in seconds
+
+	Yields:
+		np.ndarray: Processed int16 chunks
+	"""
+	frame = max(sample_rate // 100, 1)
+	chunk = frame * max(int(chunk_seconds * 100), 1)
+	silence_threshold = FULL_SCALE * 10 ** (silence_dbfs / 20)
+
+	first, last, loud_sumsq, loud_count, peak = _analyze(samples, frame, chunk, silence_threshold)
+
+	begin, end = 0, len(samples)
+	if trim:
+		if first < 0:
+			return
+		begin, end = first, last
+
+	gain = 1.0
+	if normalize and loud_count and peak > 0:
+		rms_dbfs = 20 * np.log10(np.sqrt(loud_sumsq / loud_count) / FULL_SCALE)
+		peak_limit_db = peak_dbfs - 20 * np.log10(peak / FULL_SCALE)
+		gain = float(10 ** (min(target_dbfs - rms_dbfs, peak_limit_db) / 20))
+
+	length = end - begin
+	fade_samples = min(int(sample_rate * fade_ms / 1000), length // 2)
+
+	for start in range(begin, end, chunk):
+		stop = min(start + chunk, end)
+		block = samples[start:stop].astype(np.float32)
+		if gain != 1.0:
+			block *= gain
+		if fade_samples > 0:
+			position = np.arange(start - begin, stop - begin, dtype=np.float32)
+			envelope = np.minimum(position, length - 1 - position) / fade_samples
+			np.clip(envelope, 0.0, 1.0, out=envelope)
+			block *= envelope
+		np.clip(block, -FULL_SCALE, FULL_SCALE - 1, out=block)
+		yield block.astype("<i2")
+
+
+def post_process(audio_bytes: bytes, input_format: str, output_format: str, **options) -> bytes:
+	"""
+	Decode, clean up and re-encode synthesized audio.
+
+	Args:
+		audio_bytes (bytes): Audio as returned by the API
+		input_format (str): Format of audio_bytes ("pcm_*" or "wav_*")
+		output_format (str): Format to encode to
+		**options: process_samples() keyword arguments
+
+	Returns:
+		bytes: Processed audio in output_format
+
+	Raises:
+		ValueError: If either format is unsupported
+	"""
+	samples, sample_rate = decode_pcm(audio_bytes, input_format)
+	processed = encode_audio(process_samples(samples, sample_rate, **options), sample_rate, output_format)
+	logger.info(
+		f"Post-processed {len(samples) / sample_rate:.2f}s of audio "
+		f"({len(audio_bytes):,} -> {len(processed):,} bytes)"
+	)
+	return processed
+
+
+def audio_duration(audio_bytes: bytes, audio_format: str) -> float:
+	"""
+	Return the playback length of encoded audio in seconds.
+
+	PCM and WAV durations are exact. MP3 durations assume constant bitrate,
+	which is what the API produces.
+
+	Args:
+		audio_bytes (bytes): Encoded audio
+		audio_format (str): ElevenLabs format of audio_bytes
+
+	Returns:
+		float: Duration in seconds
+
+	Raises:
+		ValueError: If the format is unsupported
+	"""
+	if audio_format.startswith("mp3_"):
+		parts = audio_format.split("_")
+		bitrate = int(parts[2]) if len(parts) > 2 else 128
+		return len(audio_bytes) * 8 / (bitrate * 1000)
+	samples, sample_rate = decode_pcm(audio_bytes, audio_format)
+	return len(samples) / sample_rate
+
+
+def concat_audio(fragments: List[bytes], audio_format: str) -> bytes:
+	"""
+	Stitch encoded audio fragments into one clip.
+
+	MP3 frames and raw PCM concatenate directly; WAV fragments are decoded
+	and written under a single header.
+
+	Args:
+		fragments (List[bytes]): Encoded fragments in playback order
+		audio_format (str): ElevenLabs format shared by all fragments
+
+	Returns:
+		bytes: Stitched audio
+
+	Raises:
+		ValueError: If the format is unsupported
+	"""
+	if audio_format.startswith(("mp3_", "pcm_")):
+		return b"".join(fragments)
+	if audio_format.startswith("wav_"):
+		decoded = [decode_pcm(fragment, audio_format) for fragment in fragments]
+		sample_rate = decoded[0][1] if decoded else format_sample_rate(audio_format)
+		return encode_audio((samples for samples, _ in decoded), sample_rate, audio_format)
+	raise ValueError(f"Cannot stitch {audio_format} audio")
@@ -8,9 +8,25 @@ This module provides a clean interface to the ElevenLabs API for:
 """
 
 import os
+import time
+import base64
 import logging
-from typing import Dict, List, Tuple, Optional, Any
+import threading
+import httpx
+from typing import Dict, List, Tuple, Optional, Any, Iterator, Union
 from elevenlabs.client import ElevenLabs
+from elevenlabs.core.api_error import ApiError
+from eleven_usage import get_ledger, key_fingerprint
+from eleven_audio import post_process, pcm_format_for, audio_duration, concat_audio, can_encode, can_stitch
+from eleven_alignment import Alignment, chunk_text
+from eleven_executor import run_audio_task
+from eleven_hedging import CancellableTransport, get_hedger
+from eleven_cassette import ReplayTransport, transport_from_env
+from eleven_presets import DEFAULT_VOICE_SETTINGS, VoicePreset, resolve_preset
+from eleven_cache import SharedCache, cache_from_env, encode_json_entry, decode_json_entry
+from eleven_tracing import span
+from eleven_policy import SelectionPolicy, get_model_metrics
+from eleven_health import HealthMonitor
 
 # Load environment variables from .env file (relative to this file)
 try:
@@ -32,6 +48,58 @@ try:
 except ImportError:
 	STREAMLIT_AVAILABLE = False
 
+# Fingerprint of the API key most recently resolved by get_client(), used for usage accounting
+_active_key_id = "unknown"
+
+# Optional httpx transport for the client (e.g. cassette record/replay), see set_transport()
+_transport: Optional[httpx.BaseTransport] = transport_from_env()
+
+
+def set_transport(transport: Optional[httpx.BaseTransport]) -> None:
+	"""
+	Route all subsequent API calls through a custom httpx transport.
+	
+	Args:
+		transport (httpx.BaseTransport, optional): Transport to use, or None for the default network transport
+	"""
+	global _transport
+	_transport = transport
+	with _clients_lock:
+		_clients.clear()
+
+
+# Clients by API key, reused so their HTTP connection pools stay warm
+_clients: Dict[str, ElevenLabs] = {}
+_clients_lock = threading.Lock()
+
+
+# Optional cache shared between app replicas, see set_shared_cache()
+_shared_cache: Optional[SharedCache] = cache_from_env()
+
+# Lifetime of the shared voice catalog entry in seconds
+VOICE_CATALOG_TTL = 600
+
+
+def set_shared_cache(cache: Optional[SharedCache]) -> None:
+	"""
+	Share the voice catalog (and audio, via get_shared_cache()) through cache.
+	
+	Args:
+		cache (SharedCache, optional): Cache to use, or None to disable sharing
+	"""
+	global _shared_cache
+	_shared_cache = cache
+
+
+def get_shared_cache() -> Optional[SharedCache]:
+	"""
+	Return the configured shared cache, if any.
+	
+	Returns:
+		Optional[SharedCache]: Cache from set_shared_cache() or ELEVENLABS_CACHE_URL
+	"""
+	return _shared_cache
+
 
 def get_client() -> ElevenLabs:
 	"""
@@ -43,39 +111,103 @@ def get_client() -> ElevenLabs:
 	Raises:
 		ValueError: If API key is not found
 	"""
-	# Try to get API key from environment first (highest priority)
-	api_key = os.getenv("ELEVENLABS_API_KEY")
-	if api_key and api_key != "your-api-key-here":
-		logger.info(f"Got API key from environment: {api_key[:10]}...")
-	else:
-		api_key = None
-	
-	# If no valid key from environment, try Streamlit secrets
-	if not api_key and STREAMLIT_AVAILABLE:
-		try:
-			secrets_key = st.secrets.get("ELEVENLABS_API_KEY")
-			if secrets_key and secrets_key != "your-api-key-here":
-				api_key = secrets_key
-				logger.info("Got API key from Streamlit secrets")
+	with span("get_client"):
+		with span("resolve_key") as key_span:
+			# Try to get API key from environment first (highest priority)
+			api_key = os.getenv("ELEVENLABS_API_KEY")
+			key_source = "environment"
+			if api_key and api_key != "your-api-key-here":
+				logger.info("Got API key from environment")
 			else:
-				logger.info("Streamlit secrets has placeholder value")
-		except (AttributeError, FileNotFoundError, KeyError):
-			logger.info("No Streamlit secrets available")
-			pass  # Not running in Streamlit or secrets not available
-	
-	if not api_key:
-		logger.error("No valid API key found in environment or secrets")
-		raise ValueError("ELEVENLABS_API_KEY not found in environment or secrets")
+				api_key = None
+			
+			# If no valid key from environment, try Streamlit secrets
+			if not api_key and STREAMLIT_AVAILABLE:
+				try:
+					secrets_key = st.secrets.get("ELEVENLABS_API_KEY")
+					if secrets_key and secrets_key != "your-api-key-here":
+						api_key = secrets_key
+						key_source = "secrets"
+						logger.info("Got API key from Streamlit secrets")
+					else:
+						logger.info("Streamlit secrets has placeholder value")
+				except (AttributeError, FileNotFoundError, KeyError):
+					logger.info("No Streamlit secrets available")
+					pass  # Not running in Streamlit or secrets not available
+			
+			# Replayed cassettes never reach the API, so no real key is needed
+			if not api_key and isinstance(_transport, ReplayTransport):
+				api_key = "replay"
+				key_source = "replay"
+			
+			if not api_key:
+				logger.error("No valid API key found in environment or secrets")
+				raise ValueError("ELEVENLABS_API_KEY not found in environment or secrets")
+			
+			key_span.set_attribute("source", key_source)
+		
+		global _active_key_id
+		_active_key_id = key_fingerprint(api_key)
+		# Log the fingerprint, never part of the key itself
+		logger.info(f"Using API key {_active_key_id} from {key_source}")
+		
+		try:
+			with _clients_lock:
+				client = _clients.get(api_key)
+				if client is None:
+					with span("construct_client", custom_transport=_transport is not None):
+						# Hedged requests are cancelled through the transport
+						transport = CancellableTransport(_transport)
+						client = ElevenLabs(
+							api_key=api_key,
+							httpx_client=httpx.Client(transport=transport, timeout=240, follow_redirects=True)
+						)
+					_clients[api_key] = client
+					logger.info("ElevenLabs client initialized successfully")
+			return client
+		except Exception as e:
+			logger.error(f"Failed to initialize ElevenLabs client: {e}")
+			raise
+
+
+def _probe_api() -> None:
+	"""Cheapest authenticated call: fetch the subscription summary."""
+	get_client().user.subscription.get(request_options={"timeout_in_seconds": 10, "max_retries": 0})
+
+
+_health_monitor: Optional[HealthMonitor] = None
+_health_lock = threading.Lock()
+
+
+def get_health_monitor() -> HealthMonitor:
+	"""
+	Return the process-wide API health monitor, creating it on first use.
 	
-	logger.info(f"Using API key: {api_key[:10]}...")
+	Returns:
+		HealthMonitor: Shared monitor (not started until start_health_monitor())
+	"""
+	global _health_monitor
+	with _health_lock:
+		if _health_monitor is None:
+			_health_monitor = HealthMonitor(_probe_api)
+		return _health_monitor
+
+
+def start_health_monitor(wait: float = 0.0) -> HealthMonitor:
+	"""
+	Warm up the client and start periodic background health probes.
 	
-	try:
-		client = ElevenLabs(api_key=api_key)
-		logger.info("ElevenLabs client initialized successfully")
-		return client
-	except Exception as e:
-		logger.error(f"Failed to initialize ElevenLabs client: {e}")
-		raise
+	Args:
+		wait (float): Seconds to wait for the first probe before returning
+		
+	Returns:
+		HealthMonitor: The running monitor; read .status() for the cached result
+	"""
+	monitor = get_health_monitor()
+	monitor.start()
+	if wait > 0:
+		monitor.wait_until_checked(wait)
+	return monitor
 
 
 def list_voices(page_size: int = 50) -> List[Dict[str, str]]:
@@ -93,14 +225,14 @@ def list_voices(page_size: int = 50) -> List[Dict[str, str]]:
 	"""
 	try:
 		elevenlabs_client = get_client()
-		voice_list = elevenlabs_client.voices.get_all()
+		catalog = _get_voice_catalog(elevenlabs_client)
 		
 		# Convert to expected format
 		voices_data = []
-		for voice in voice_list.voices[:page_size]:
+		for voice in catalog[:page_size]:
 			voices_data.append({
-				"voice_id": voice.voice_id,
-				"name": voice.name
+				"voice_id": voice["voice_id"],
+				"name": voice["name"]
 			})
 		
 		logger.info(f"Successfully retrieved {len(voices_data)} voices")
@@ -111,6 +243,55 @@ def list_voices(page_size: int = 50) -> List[Dict[str, str]]:
 		raise
 
 
+def _get_voice_catalog(elevenlabs_client: ElevenLabs) -> List[Dict[str, Any]]:
+	"""
+	Return every voice with its ID, name and default settings.
+	
+	With a shared cache configured, the catalog is fetched once per TTL
+	across all replicas using the same API key.
+	"""
+	def _fetch() -> List[Dict[str, Any]]:
+		with span("fetch_voices"):
+			voice_list = elevenlabs_client.voices.get_all()
+		return [
+			{
+				"voice_id": voice.voice_id,
+				"name": voice.name,
+				"settings": {
+					key: getattr(voice.settings, key, default)
+					for key, default in DEFAULT_VOICE_SETTINGS.items()
+				}
+			}
+			for voice in voice_list.voices
+		]
+	
+	if _shared_cache is None:
+		return _fetch()
+	
+	data = _shared_cache.get_or_compute(
+		f"voices:{_active_key_id}",
+		lambda: encode_json_entry(_fetch()),
+		ttl=VOICE_CATALOG_TTL
+	)
+	return decode_json_entry(data)
+
+
+def invalidate_voice_catalog() -> None:
+	"""
+	Drop the shared voice catalog entry for the current API key.
+
+	The next lookup on any replica fetches the catalog from the API again
+	instead of serving the cached copy until VOICE_CATALOG_TTL expires.
+	Does nothing without a shared cache.
+	"""
+	if _shared_cache is None:
+		return
+	# Resolves the key whose catalog entry to drop
+	get_client()
+	_shared_cache.delete(f"voices:{_active_key_id}")
+	logger.info("Invalidated shared voice catalog")
+
+
 def get_voice_settings(voice_id: str) -> Dict[str, Any]:
 	"""
 	Get default settings for a specific voice.
@@ -126,25 +307,19 @@ def get_voice_settings(voice_id: str) -> Dict[str, Any]:
 	"""
 	try:
 		elevenlabs_client = get_client()
-		voice_list = elevenlabs_client.voices.get_all()
+		catalog = _get_voice_catalog(elevenlabs_client)
 		
 		# Find the specific voice
 		target_voice = None
-		for voice in voice_list.voices:
-			if voice.voice_id == voice_id:
+		for voice in catalog:
+			if voice["voice_id"] == voice_id:
 				target_voice = voice
 				break
 		
 		if not target_voice:
 			raise ValueError(f"Voice with ID {voice_id} not found")
 		
-		# Extract settings
-		settings = {
-			"stability": getattr(target_voice.settings, 'stability', 0.5),
-			"similarity_boost": getattr(target_voice.settings, 'similarity_boost', 0.75),
-			"style": getattr(target_voice.settings, 'style', 0.0),
-			"use_speaker_boost": getattr(target_voice.settings, 'use_speaker_boost', True)
-		}
+		settings = dict(target_voice["settings"])
 		
 		logger.info(f"Retrieved settings for voice {voice_id}")
 		return settings
@@ -154,6 +329,20 @@ def get_voice_settings(voice_id: str) -> Dict[str, Any]:
 		raise
 
 
+def _build_voice_settings(voice_settings: Optional[Dict[str, Any]], speed: Optional[float]) -> Dict[str, Any]:
+	"""Fill in default voice settings and add speed if provided."""
+	# Prepare voice settings: known keys only, defaults for anything missing
+	settings = dict(DEFAULT_VOICE_SETTINGS)
+	if voice_settings:
+		settings.update((k, voice_settings[k]) for k in DEFAULT_VOICE_SETTINGS if k in voice_settings)
+	
+	# Add speed if provided
+	if speed is not None:
+		settings["speed"] = speed
+	
+	return settings
+
+
 def synthesize(
 	text: str,
 	voice_id: str,
@@ -162,7 +351,9 @@ def synthesize(
 	voice_settings: Optional[Dict[str, Any]] = None,
 	seed: Optional[int] = None,
 	language_code: Optional[str] = None,
-	speed: Optional[float] = None
+	speed: Optional[float] = None,
+	post_processing: Optional[Dict[str, Any]] = None,
+	hedge: bool = False
 ) -> Tuple[bytes, str]:
 	"""
 	Convert text to speech using ElevenLabs API.
@@ -176,53 +367,355 @@ def synthesize(
 		seed (int, optional): Random seed for consistency
 		language_code (str, optional): Language code for multilingual models
 		speed (float, optional): Speech rate multiplier (0.5 to 1.5)
+		post_processing (Dict[str, Any], optional): Normalize/trim/fade options for
+			eleven_audio.post_process(); pass {} for defaults. Audio is requested
+			as raw PCM and re-encoded to output_format.
+		hedge (bool): Send a duplicate request if the first byte is slower than
+			recent TTFB (see eleven_hedging); extra spend is capped
 		
 	Returns:
 		Tuple[bytes, str]: Audio bytes and MIME type
 		
+	Raises:
+		Exception: If API call fails
+	"""
+	if post_processing is not None and not can_encode(output_format):
+		raise ValueError(
+			f"Cannot post-process into {output_format}: "
+			+ ("MP3 re-encoding requires the optional 'lameenc' package" if output_format.startswith("mp3_") else "unsupported format")
+		)
+	
+	with span(
+		"synthesize", voice_id=voice_id, model_id=model_id, output_format=output_format,
+		text_length=len(text), hedge=hedge, post_processing=post_processing is not None
+	) as synth_span:
+		try:
+			elevenlabs_client = get_client()
+			
+			settings = _build_voice_settings(voice_settings, speed)
+			
+			# Post-processing works on raw PCM, re-encoded afterwards
+			request_format = pcm_format_for(output_format) if post_processing is not None else output_format
+			
+			def _convert():
+				return elevenlabs_client.text_to_speech.convert(
+					voice_id=voice_id,
+					text=text,
+					model_id=model_id,
+					voice_settings=settings,
+					output_format=request_format,
+					seed=seed,
+					language_code=language_code
+				)
+			
+			# Generate audio
+			request_started = time.monotonic()
+			try:
+				with span("request"):
+					if hedge:
+						audio_generator = get_hedger().run(
+							_convert, cost=len(text), on_hedge=lambda: _record_usage(text, voice_id, model_id)
+						)
+					else:
+						audio_generator = _convert()
+				
+				# Convert generator to bytes (the SDK only sends the request once iterated)
+				with span("drain_stream") as drain_span:
+					chunks = []
+					ttfb = None
+					for chunk in audio_generator:
+						if ttfb is None:
+							ttfb = time.monotonic() - request_started
+						chunks.append(chunk)
+					audio_bytes = b"".join(chunks)
+					drain_span.set_attributes(bytes=len(audio_bytes), ttfb_ms=round((ttfb or 0.0) * 1000, 1))
+			except Exception as e:
+				# Only the API's or the connection's failures count against its health
+				if _is_api_failure(e):
+					get_health_monitor().record_request(False)
+				raise
+			get_health_monitor().record_request(True, time.monotonic() - request_started)
+			# The characters are billed once the response is received, even if post-processing fails
+			_record_usage(text, voice_id, model_id)
+			_record_latency(model_id, ttfb, time.monotonic() - request_started, text, audio_bytes, request_format)
+			
+			# CPU-bound; runs in the audio process pool so it doesn't stall other requests
+			if post_processing is not None:
+				with span("post_process", input_bytes=len(audio_bytes)) as process_span:
+					audio_bytes = run_audio_task(post_process, audio_bytes, request_format, output_format, **post_processing)
+					process_span.set_attribute("output_bytes", len(audio_bytes))
+			
+			# Determine MIME type based on output format
+			mime_type = "audio/mpeg" if output_format.startswith("mp3") else "audio/wav"
+			
+			synth_span.set_attribute("bytes", len(audio_bytes))
+			
+			logger.info(f"Successfully generated audio for text (length: {len(text)})")
+			return audio_bytes, mime_type
+			
+		except Exception as e:
+			logger.error(f"Failed to synthesize speech: {e}")
+			raise
+
+
+def synthesize_stream(
+	text: str,
+	voice_id: str,
+	model_id: str = "eleven_turbo_v2_5",
+	output_format: str = "mp3_44100_128",
+	voice_settings: Optional[Dict[str, Any]] = None,
+	seed: Optional[int] = None,
+	language_code: Optional[str] = None,
+	speed: Optional[float] = None,
+	hedge: bool = False
+) -> Iterator[bytes]:
+	"""
+	Stream text to speech from the ElevenLabs API as audio chunks arrive.
+	
+	Args:
+		Same as synthesize(), without post_processing
+		
+	Yields:
+		bytes: Audio chunks in output_format
+		
 	Raises:
 		Exception: If API call fails
 	"""
 	try:
 		elevenlabs_client = get_client()
+		settings = _build_voice_settings(voice_settings, speed)
 		
-		# Prepare voice settings
-		settings = {
-			"stability": voice_settings.get("stability", 0.5) if voice_settings else 0.5,
-			"similarity_boost": voice_settings.get("similarity_boost", 0.75) if voice_settings else 0.75,
-			"style": voice_settings.get("style", 0.0) if voice_settings else 0.0,
-			"use_speaker_boost": voice_settings.get("use_speaker_boost", True) if voice_settings else True
-		}
-		
-		# Add speed if provided
-		if speed is not None:
-			settings["speed"] = speed
-		
-		# Generate audio
-		audio_generator = elevenlabs_client.text_to_speech.convert(
-			voice_id=voice_id,
-			text=text,
-			model_id=model_id,
-			voice_settings=settings,
-			output_format=output_format,
-			seed=seed,
-			language_code=language_code
-		)
+		def _stream():
+			return elevenlabs_client.text_to_speech.stream(
+				voice_id=voice_id,
+				text=text,
+				model_id=model_id,
+				voice_settings=settings,
+				output_format=output_format,
+				seed=seed,
+				language_code=language_code
+			)
 		
-		# Convert generator to bytes
-		audio_bytes = b"".join(audio_generator)
+		if hedge:
+			chunks = get_hedger().run(
+				_stream, cost=len(text), on_hedge=lambda: _record_usage(text, voice_id, model_id)
+			)
+		else:
+			chunks = iter(_stream())
 		
-		# Determine MIME type based on output format
-		mime_type = "audio/mpeg" if output_format.startswith("mp3") else "audio/wav"
+		# The SDK sends the request on the first next(); only a successful response is billed
+		first_chunk = next(chunks, None)
+		_record_usage(text, voice_id, model_id)
+		if first_chunk is not None:
+			yield first_chunk
+		yield from chunks
 		
-		logger.info(f"Successfully generated audio for text (length: {len(text)})")
-		return audio_bytes, mime_type
+		logger.info(f"Successfully streamed audio for text (length: {len(text)})")
 		
 	except Exception as e:
-		logger.error(f"Failed to synthesize speech: {e}")
+		logger.error(f"Failed to stream speech: {e}")
 		raise
 
 
+def synthesize_with_timestamps(
+	text: str,
+	voice_id: str,
+	model_id: str = "eleven_turbo_v2_5",
+	output_format: str = "mp3_44100_128",
+	voice_settings: Optional[Dict[str, Any]] = None,
+	seed: Optional[int] = None,
+	language_code: Optional[str] = None,
+	speed: Optional[float] = None,
+	max_chars: int = 2500
+) -> Tuple[bytes, str, Alignment]:
+	"""
+	Convert text to speech and return character-level timestamps with the audio.
+	
+	Text longer than max_chars is split at sentence boundaries and each
+	fragment is synthesized with its neighbours as context. Fragments are
+	stitched and their alignments shifted by the running audio duration,
+	so timestamps stay correct across the whole clip.
+	
+	Args:
+		Same as synthesize(), without post_processing, plus:
+		max_chars (int): Longest fragment sent in a single request
+		
+	Returns:
+		Tuple[bytes, str, Alignment]: Audio bytes, MIME type and alignment
+		(use Alignment.to_srt() / to_webvtt() for captions)
+		
+	Raises:
+		Exception: If API call fails
+	"""
+	with span(
+		"synthesize_with_timestamps", voice_id=voice_id, model_id=model_id,
+		output_format=output_format, text_length=len(text)
+	) as synth_span:
+		try:
+			elevenlabs_client = get_client()
+			settings = _build_voice_settings(voice_settings, speed)
+			fragments = chunk_text(text, max_chars=max_chars)
+			synth_span.set_attribute("fragments", len(fragments))
+			# Fail before any characters are spent if the fragments couldn't be stitched
+			if len(fragments) > 1 and not can_stitch(output_format):
+				raise ValueError(
+					f"Cannot stitch {output_format} audio; request an mp3_*, pcm_* or wav_* format "
+					f"or text shorter than {max_chars} characters"
+				)
+			
+			audio_parts = []
+			alignment_parts = []
+			offset = 0.0
+			for index, fragment in enumerate(fragments):
+				with span("request", fragment=index, text_length=len(fragment)) as request_span:
+					response = elevenlabs_client.text_to_speech.convert_with_timestamps(
+						voice_id=voice_id,
+						text=fragment,
+						model_id=model_id,
+						voice_settings=settings,
+						output_format=output_format,
+						seed=seed,
+						language_code=language_code,
+						previous_text=fragments[index - 1] if index > 0 else None,
+						next_text=fragments[index + 1] if index + 1 < len(fragments) else None
+					)
+					audio = base64.b64decode(response.audio_base_64)
+					request_span.set_attribute("bytes", len(audio))
+				_record_usage(fragment, voice_id, model_id)
+				alignment = Alignment.from_response(response.alignment) if response.alignment else Alignment.empty()
+				audio_parts.append(audio)
+				alignment_parts.append((alignment, offset))
+				if index + 1 < len(fragments):
+					offset += audio_duration(audio, output_format)
+			
+			if len(audio_parts) == 1:
+				audio_bytes = audio_parts[0]
+			else:
+				with span("stitch", fragments=len(audio_parts)):
+					audio_bytes = concat_audio(audio_parts, output_format)
+			synth_span.set_attribute("bytes", len(audio_bytes))
+			mime_type = "audio/mpeg" if output_format.startswith("mp3") else "audio/wav"
+			
+			logger.info(
+				f"Successfully generated timestamped audio for text (length: {len(text)}, fragments: {len(fragments)})"
+			)
+			return audio_bytes, mime_type, Alignment.concat(alignment_parts)
+			
+		except Exception as e:
+			logger.error(f"Failed to synthesize speech with timestamps: {e}")
+			raise
+
+
+def _is_api_failure(error: Exception) -> bool:
+	"""
+	Return whether an exception reflects on the API's health.
+	
+	Connection errors, timeouts, rate limiting and 5xx responses count;
+	client errors (unknown voice, invalid parameters) and local errors do not.
+	"""
+	if isinstance(error, ApiError):
+		return error.status_code is None or error.status_code == 429 or error.status_code >= 500
+	return isinstance(error, (httpx.TransportError, ConnectionError, TimeoutError))
+
+
+def _record_latency(
+	model_id: str,
+	ttfb: Optional[float],
+	total_seconds: float,
+	text: str,
+	audio_bytes: bytes,
+	audio_format: str
+) -> None:
+	"""Feed a completed request into the model selection metrics."""
+	if ttfb is None:
+		return
+	try:
+		audio_seconds = audio_duration(audio_bytes, audio_format)
+	except ValueError:
+		audio_seconds = None
+	get_model_metrics().record(model_id, ttfb, total_seconds, len(text), audio_seconds)
+
+
+def _record_usage(text: str, voice_id: str, model_id: str) -> None:
+	"""Add a successful call to the usage ledger without failing the call."""
+	try:
+		get_ledger().record(len(text), voice_id, model_id, key_id=_active_key_id)
+	except Exception as e:
+		logger.warning(f"Failed to record usage: {e}")
+
+
+def synthesize_batch(
+	texts: List[str],
+	voice_id: Optional[str] = None,
+	defer_over_budget: bool = False,
+	preset: Optional[Union[str, VoicePreset]] = None,
+	mode: Optional[str] = None,
+	latency_target: Optional[float] = None,
+	size_target: Optional[int] = None,
+	**kwargs: Any
+) -> Tuple[List[Tuple[bytes, str]], List[str]]:
+	"""
+	Convert several texts to speech after a pre-flight budget check.
+	
+	The check runs before any audio is requested, so a batch that would
+	exceed the character budget never leaves partial output behind.
+	
+	Args:
+		texts (List[str]): Texts to convert, in order
+		voice_id (str, optional): Voice ID to use; taken from preset if omitted
+		defer_over_budget (bool): Run what fits and return the rest instead of rejecting
+		preset (Union[str, VoicePreset], optional): Preset (or stored preset name)
+			supplying voice, model, settings, speed and language; kwargs override it
+		mode (str, optional): "fastest" or "quality" to pick model_id and output_format
+			per text with eleven_policy (overrides the preset, not explicit kwargs)
+		latency_target (float, optional): Seconds per text the selection should stay under
+		size_target (int, optional): Bytes per text the selection should stay under
+		**kwargs: Additional synthesize() arguments (model_id, output_format, ...)
+		
+	Returns:
+		Tuple[List[Tuple[bytes, str]], List[str]]: (audio bytes, MIME type) per
+		synthesized text, and the texts deferred for lack of budget
+		
+	Raises:
+		BudgetExceededError: If the batch exceeds the budget and defer_over_budget is False
+		KeyError: If a preset name is not found
+		ValueError: If neither voice_id nor preset is given
+		Exception: If API call fails
+	"""
+	explicit = set(kwargs)
+	if preset is not None:
+		preset_kwargs = resolve_preset(preset).synthesis_kwargs()
+		if voice_id is None:
+			voice_id = preset_kwargs["voice_id"]
+		del preset_kwargs["voice_id"]
+		kwargs = {**preset_kwargs, **kwargs}
+	if voice_id is None:
+		raise ValueError("synthesize_batch() needs a voice_id or a preset")
+	
+	ledger = get_ledger()
+	ledger.maybe_reconcile(get_client)
+	
+	if defer_over_budget:
+		accepted, deferred = ledger.plan_batch(texts)
+	else:
+		ledger.check_budget(texts)
+		accepted, deferred = list(range(len(texts))), []
+	
+	if deferred:
+		logger.warning(f"Deferring {len(deferred)} of {len(texts)} texts to stay within budget")
+	
+	policy = SelectionPolicy() if mode is not None else None
+	results = []
+	for i in accepted:
+		params = kwargs
+		if policy is not None:
+			choice = policy.choose(len(texts[i]), mode, latency_target=latency_target, size_target=size_target)
+			selected = {"model_id": choice.model_id, "output_format": choice.output_format}
+			params = {**kwargs, **{k: v for k, v in selected.items() if k not in explicit}}
+		results.append(synthesize(texts[i], voice_id, **params))
+	return results, [texts[i] for i in deferred]
+
+
 def list_models() -> List[Dict[str, str]]:
 	"""
 	List available TTS models.
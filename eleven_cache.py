@@ -0,0 +1,350 @@
+"""
+Shared Cache Backends
+
+This module lets several app replicas share the voice catalog and synthesized audio:
+- A SharedCache interface with get/set and stampede-protected get_or_compute
+- A local-disk implementation (one host, many processes)
+- A Redis implementation (many hosts), usable with any redis-py compatible client
+- A compact binary serialization for audio and JSON entries
+
+Configure with ELEVENLABS_CACHE_URL, e.g. "file:///var/cache/eleven" or
+"redis://cache-host:6379/0".
+"""
+
+import os
+import json
+import time
+import uuid
+import zlib
+import struct
+import hashlib
+import logging
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Optional Redis client
+try:
+	import redis
+	REDIS_AVAILABLE = True
+except ImportError:
+	REDIS_AVAILABLE = False
+
+KEY_PREFIX = "eleven:"
+
+# Entry type markers for the serialization format
+_AUDIO_ENTRY = b"A"
+_JSON_ENTRY = b"J"
+_FORMAT_VERSION = b"\x01"
+
+# Deletes a lease only if it still holds the caller's token, in one atomic step
+_RELEASE_LEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+	return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def encode_audio_entry(audio_bytes: bytes, mime_type: str) -> bytes:
+	"""
+	Serialize an (audio, MIME type) pair.
+
+	Layout: version, b"A", MIME length (1 byte), MIME, raw audio. The audio
+	is stored as-is; it is already compressed.
+	"""
+	mime = mime_type.encode("ascii")
+	return _FORMAT_VERSION + _AUDIO_ENTRY + struct.pack("B", len(mime)) + mime + audio_bytes
+
+
+def decode_audio_entry(data: bytes) -> Tuple[bytes, str]:
+	"""
+	Inverse of encode_audio_entry().
+
+	Raises:
+		ValueError: If data is not an audio entry
+	"""
+	if data[:2] != _FORMAT_VERSION + _AUDIO_ENTRY:
+		raise ValueError("Not an audio cache entry")
+	mime_length = data[2]
+	return data[3 + mime_length:], data[3:3 + mime_length].decode("ascii")
+
+
+def encode_json_entry(value: Any) -> bytes:
+	"""
+	Serialize a JSON-compatible value as version, b"J", zlib-compressed compact JSON.
+	"""
+	payload = json.dumps(value, separators=(",", ":")).encode("utf-8")
+	return _FORMAT_VERSION + _JSON_ENTRY + zlib.compress(payload)
+
+
+def decode_json_entry(data: bytes) -> Any:
+	"""
+	Inverse of encode_json_entry().
+
+	Raises:
+		ValueError: If data is not a JSON entry
+	"""
+	if data[:2] != _FORMAT_VERSION + _JSON_ENTRY:
+		raise ValueError("Not a JSON cache entry")
+	return json.loads(zlib.decompress(data[2:]))
+
+
+class SharedCache(ABC):
+	"""
+	Byte-string cache shared between processes or hosts.
+
+	Subclasses implement get, set, delete and the lease methods;
+	get_or_compute uses the lease so that only one replica computes a
+	missing entry while the others wait for it to appear.
+	"""
+
+	@abstractmethod
+	def get(self, key: str) -> Optional[bytes]:
+		"""Return the value for key, or None if missing or expired."""
+
+	@abstractmethod
+	def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+		"""Store value under key, expiring after ttl seconds if given."""
+
+	@abstractmethod
+	def delete(self, key: str) -> None:
+		"""Remove key if present, so the next get_or_compute recomputes it."""
+
+	@abstractmethod
+	def _acquire_lease(self, key: str, seconds: float) -> Optional[str]:
+		"""Try to become the only process computing key; return a lease token, or None if another holds it."""
+
+	@abstractmethod
+	def _release_lease(self, key: str, token: str) -> None:
+		"""Give up the lease identified by token, unless it has since been taken over."""
+
+	def get_or_compute(
+		self,
+		key: str,
+		compute: Callable[[], bytes],
+		ttl: Optional[float] = None,
+		lease_seconds: float = 30.0,
+		poll_interval: float = 0.05
+	) -> bytes:
+		"""
+		Return the cached value, computing and storing it if missing.
+
+		If another process holds the lease for key, waits for its result
+		rather than computing the same value again. If the lease expires
+		without a result, computes it here.
+
+		Args:
+			key (str): Cache key
+			compute (Callable[[], bytes]): Produces the value on a miss
+			ttl (float, optional): Entry lifetime in seconds
+			lease_seconds (float): How long a computing process may hold the lease
+			poll_interval (float): Seconds between checks while waiting
+
+		Returns:
+			bytes: Cached or freshly computed value
+		"""
+		value = self.get(key)
+		if value is not None:
+			return value
+
+		deadline = time.monotonic() + lease_seconds
+		while True:
+			token = self._acquire_lease(key, lease_seconds)
+			if token is not None:
+				break
+			time.sleep(poll_interval)
+			value = self.get(key)
+			if value is not None:
+				return value
+			if time.monotonic() >= deadline:
+				logger.warning(f"Cache lease for {key} expired, computing locally")
+				break
+
+		try:
+			if token is not None:
+				# Another process may have finished between our miss and the lease
+				value = self.get(key)
+				if value is not None:
+					return value
+			value = compute()
+			self.set(key, value, ttl)
+			return value
+		finally:
+			# Only release a lease this call holds, never the one it gave up waiting on
+			if token is not None:
+				self._release_lease(key, token)
+
+
+class DiskCache(SharedCache):
+	"""
+	Cache stored as one file per key in a directory.
+
+	Each file holds an 8-byte expiry timestamp followed by the value.
+	Writes are atomic (write then rename) and leases are exclusive-create
+	lock files holding the holder's token, so any number of processes on
+	one host can share it.
+	"""
+
+	def __init__(self, directory: Path):
+		self.directory = Path(directory)
+		self.directory.mkdir(parents=True, exist_ok=True)
+
+	def _path(self, key: str) -> Path:
+		return self.directory / hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+	def get(self, key: str) -> Optional[bytes]:
+		path = self._path(key)
+		try:
+			with open(path, "rb") as f:
+				data = f.read()
+		except FileNotFoundError:
+			return None
+		(expires,) = struct.unpack("<d", data[:8])
+		if expires and expires < time.time():
+			try:
+				path.unlink()
+			except FileNotFoundError:
+				pass
+			return None
+		return data[8:]
+
+	def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+		path = self._path(key)
+		tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+		expires = time.time() + ttl if ttl else 0.0
+		with open(tmp_path, "wb") as f:
+			f.write(struct.pack("<d", expires))
+			f.write(value)
+		os.replace(tmp_path, path)
+
+	def delete(self, key: str) -> None:
+		try:
+			self._path(key).unlink()
+		except FileNotFoundError:
+			pass
+
+	@staticmethod
+	def _create_lock(lock_path: Path, token: str) -> bool:
+		try:
+			fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+		except FileExistsError:
+			return False
+		with os.fdopen(fd, "w") as f:
+			f.write(token)
+		return True
+
+	def _acquire_lease(self, key: str, seconds: float) -> Optional[str]:
+		lock_path = self._path(key).with_suffix(".lock")
+		token = uuid.uuid4().hex
+		if self._create_lock(lock_path, token):
+			return token
+		try:
+			stale = lock_path.stat()
+		except FileNotFoundError:
+			return None
+		if time.time() - stale.st_mtime <= seconds:
+			return None
+
+		# Holder died. Only one waiter's rename of the stale lock succeeds, and
+		# the new lease is still taken by exclusive create
+		moved_path = lock_path.with_name(f"{lock_path.name}.{token}.stale")
+		try:
+			os.rename(lock_path, moved_path)
+		except FileNotFoundError:
+			return None
+		try:
+			if os.stat(moved_path).st_ino != stale.st_ino:
+				# A fresh lock replaced the stale one after our check: put it back
+				try:
+					os.link(moved_path, lock_path)
+				except FileExistsError:
+					pass
+				return None
+		finally:
+			os.unlink(moved_path)
+		return token if self._create_lock(lock_path, token) else None
+
+	def _release_lease(self, key: str, token: str) -> None:
+		lock_path = self._path(key).with_suffix(".lock")
+		try:
+			with open(lock_path, "r") as f:
+				holder = f.read()
+		except FileNotFoundError:
+			return
+		# A lease held past its expiry may have been taken over; leave the new lock alone
+		if holder == token:
+			try:
+				lock_path.unlink()
+			except FileNotFoundError:
+				pass
+
+
+class RedisCache(SharedCache):
+	"""
+	Cache stored in Redis (or any client with redis-py's get/set/delete/eval).
+
+	Leases use SET NX PX so they expire on their own if the holder dies,
+	and are released with an atomic compare-and-delete of the holder's token.
+	"""
+
+	def __init__(self, client: Any):
+		"""
+		Args:
+			client: redis.Redis instance or a compatible stand-in
+		"""
+		self.client = client
+
+	@classmethod
+	def from_url(cls, url: str) -> "RedisCache":
+		"""
+		Connect using a redis:// URL.
+
+		Raises:
+			ValueError: If the redis package is not installed
+		"""
+		if not REDIS_AVAILABLE:
+			raise ValueError("Redis cache requires the optional 'redis' package")
+		return cls(redis.Redis.from_url(url))
+
+	def get(self, key: str) -> Optional[bytes]:
+		return self.client.get(KEY_PREFIX + key)
+
+	def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+		self.client.set(KEY_PREFIX + key, value, px=int(ttl * 1000) if ttl else None)
+
+	def delete(self, key: str) -> None:
+		self.client.delete(KEY_PREFIX + key)
+
+	def _acquire_lease(self, key: str, seconds: float) -> Optional[str]:
+		token = uuid.uuid4().hex
+		if self.client.set(f"{KEY_PREFIX}lock:{key}", token, nx=True, px=int(seconds * 1000)):
+			return token
+		return None
+
+	def _release_lease(self, key: str, token: str) -> None:
+		self.client.eval(_RELEASE_LEASE_SCRIPT, 1, f"{KEY_PREFIX}lock:{key}", token)
+
+
+def cache_from_env() -> Optional[SharedCache]:
+	"""
+	Build a shared cache from ELEVENLABS_CACHE_URL.
+
+	Returns:
+		Optional[SharedCache]: DiskCache for file:// URLs, RedisCache for redis:// URLs, or None if unset
+
+	Raises:
+		ValueError: If the URL scheme is not supported
+	"""
+	url = os.getenv("ELEVENLABS_CACHE_URL")
+	if not url:
+		return None
+	parsed = urlparse(url)
+	if parsed.scheme == "file":
+		return DiskCache(Path(parsed.path))
+	if parsed.scheme in ("redis", "rediss"):
+		return RedisCache.from_url(url)
+	raise ValueError(f"Unsupported ELEVENLABS_CACHE_URL scheme: {parsed.scheme}")
@@ -0,0 +1,224 @@
+"""
+Record/Replay HTTP Transport
+
+This module plugs into the ElevenLabs client's httpx transport to:
+- Record real request/response exchanges, including per-chunk timing, to a cassette
+- Replay them offline with the original timing or at full speed
+
+A cassette is a gzip file of appended members. Each interaction is one
+JSON metadata line followed by the raw response body; the metadata lists
+chunk lengths and their offsets (seconds since the request was sent).
+Request headers, including the API key, are never written.
+
+Set ELEVENLABS_CASSETTE (path) and ELEVENLABS_CASSETTE_MODE ("record" or
+"replay") to enable it from the environment; ELEVENLABS_CASSETTE_SPEED sets
+the replay speed (0 = no delays, 1 = original timing).
+"""
+
+import os
+import gzip
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Response headers that describe the original transfer rather than the content
+_SKIPPED_HEADERS = {"date", "set-cookie", "transfer-encoding", "connection"}
+
+
+class CassetteMissError(LookupError):
+	"""Raised when a replayed request has no recorded interaction."""
+
+
+def request_key(request: httpx.Request) -> Tuple[str, str, str]:
+	"""
+	Return the identity used to match a request to a recording.
+
+	Args:
+		request (httpx.Request): Outgoing request
+
+	Returns:
+		Tuple[str, str, str]: Method, path with query string, SHA-256 of the body
+	"""
+	target = request.url.raw_path.decode("ascii")
+	return request.method, target, hashlib.sha256(request.read()).hexdigest()
+
+
+def load_cassette(path: Path) -> List[Tuple[Dict[str, Any], bytes]]:
+	"""
+	Read every interaction from a cassette file.
+
+	Args:
+		path (Path): Cassette file
+
+	Returns:
+		List[Tuple[Dict[str, Any], bytes]]: (metadata, body) pairs in recording order
+	"""
+	interactions = []
+	with gzip.open(path, "rb") as f:
+		while True:
+			line = f.readline()
+			if not line:
+				break
+			meta = json.loads(line)
+			body = f.read(sum(length for _, length in meta["chunks"]))
+			interactions.append((meta, body))
+	return interactions
+
+
+class _RecordingStream(httpx.SyncByteStream):
+	"""Pass response chunks through while noting their timing."""
+
+	def __init__(self, inner: httpx.SyncByteStream, meta: Dict[str, Any], started: float, transport: "RecordingTransport"):
+		self._inner = inner
+		self._meta = meta
+		self._started = started
+		self._transport = transport
+		self._body = bytearray()
+		self._complete = False
+
+	def __iter__(self) -> Iterator[bytes]:
+		for chunk in self._inner:
+			self._meta["chunks"].append([round(time.monotonic() - self._started, 4), len(chunk)])
+			self._body += chunk
+			yield chunk
+		self._complete = True
+
+	def close(self) -> None:
+		self._inner.close()
+		if self._complete:
+			self._complete = False
+			self._transport._append(self._meta, bytes(self._body))
+
+
+class RecordingTransport(httpx.BaseTransport):
+	"""Forward requests to a real transport and append each exchange to a cassette."""
+
+	def __init__(self, path: Path, inner: Optional[httpx.BaseTransport] = None):
+		"""
+		Args:
+			path (Path): Cassette file; new interactions are appended
+			inner (httpx.BaseTransport, optional): Transport that talks to the network
+		"""
+		self.path = Path(path)
+		self._inner = inner if inner is not None else httpx.HTTPTransport()
+		self._lock = threading.Lock()
+
+	def handle_request(self, request: httpx.Request) -> httpx.Response:
+		method, target, body_hash = request_key(request)
+		started = time.monotonic()
+		response = self._inner.handle_request(request)
+		meta = {
+			"method": method,
+			"target": target,
+			"body_sha256": body_hash,
+			"status": response.status_code,
+			"headers": [[k, v] for k, v in response.headers.multi_items() if k.lower() not in _SKIPPED_HEADERS],
+			"headers_at": round(time.monotonic() - started, 4),
+			"chunks": []
+		}
+		return httpx.Response(
+			status_code=response.status_code,
+			headers=response.headers,
+			stream=_RecordingStream(response.stream, meta, started, self),
+			extensions=response.extensions
+		)
+
+	def _append(self, meta: Dict[str, Any], body: bytes) -> None:
+		with self._lock:
+			with gzip.open(self.path, "ab") as f:
+				f.write(json.dumps(meta, separators=(",", ":")).encode("utf-8") + b"\n")
+				f.write(body)
+		logger.info(f"Recorded {meta['method']} {meta['target']} ({len(body):,} bytes)")
+
+	def close(self) -> None:
+		self._inner.close()
+
+
+class _ReplayStream(httpx.SyncByteStream):
+	"""Yield recorded chunks, optionally at their original pace."""
+
+	def __init__(self, meta: Dict[str, Any], body: bytes, started: float, speed: float):
+		self._meta = meta
+		self._body = body
+		self._started = started
+		self._speed = speed
+
+	def __iter__(self) -> Iterator[bytes]:
+		position = 0
+		for offset, length in self._meta["chunks"]:
+			if self._speed > 0:
+				delay = self._started + offset / self._speed - time.monotonic()
+				if delay > 0:
+					time.sleep(delay)
+			yield self._body[position:position + length]
+			position += length
+
+
+class ReplayTransport(httpx.BaseTransport):
+	"""
+	Serve requests from a cassette without touching the network.
+
+	Identical requests are served in recording order; once a request's
+	recordings are used up, the last one is repeated.
+	"""
+
+	def __init__(self, path: Path, speed: float = 0.0):
+		"""
+		Args:
+			path (Path): Cassette file
+			speed (float): 0 for no delays, 1.0 for original timing, 2.0 for twice as fast
+		"""
+		self.path = Path(path)
+		self.speed = speed
+		self._queues: Dict[Tuple[str, str, str], Deque[Tuple[Dict[str, Any], bytes]]] = defaultdict(deque)
+		for meta, body in load_cassette(self.path):
+			self._queues[(meta["method"], meta["target"], meta["body_sha256"])].append((meta, body))
+		self._lock = threading.Lock()
+
+	def handle_request(self, request: httpx.Request) -> httpx.Response:
+		key = request_key(request)
+		with self._lock:
+			recordings = self._queues.get(key)
+			if not recordings:
+				raise CassetteMissError(f"No recording for {key[0]} {key[1]} in {self.path}")
+			meta, body = recordings.popleft() if len(recordings) > 1 else recordings[0]
+
+		started = time.monotonic()
+		if self.speed > 0 and meta["headers_at"] > 0:
+			time.sleep(meta["headers_at"] / self.speed)
+		return httpx.Response(
+			status_code=meta["status"],
+			headers=meta["headers"],
+			stream=_ReplayStream(meta, body, started, self.speed),
+			request=request
+		)
+
+
+def transport_from_env() -> Optional[httpx.BaseTransport]:
+	"""
+	Build a cassette transport from ELEVENLABS_CASSETTE* variables.
+
+	Returns:
+		Optional[httpx.BaseTransport]: Recording or replay transport, or None if unset
+
+	Raises:
+		ValueError: If the mode is not "record" or "replay"
+	"""
+	path = os.getenv("ELEVENLABS_CASSETTE")
+	if not path:
+		return None
+	mode = os.getenv("ELEVENLABS_CASSETTE_MODE", "replay")
+	if mode == "record":
+		return RecordingTransport(Path(path))
+	if mode == "replay":
+		return ReplayTransport(Path(path), speed=float(os.getenv("ELEVENLABS_CASSETTE_SPEED", "0")))
+	raise ValueError(f"ELEVENLABS_CASSETTE_MODE must be 'record' or 'replay', got {mode!r}")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+ElevenLabs TTS Command Line
+
+Command-line access to the backend for scripted and batch use:
+- Managing voice settings presets
+- Synthesizing text to a file from a preset
+- Inspecting character usage and starting a new budget period
+
+Usage:
+    python3 eleven_cli.py presets list
+    python3 eleven_cli.py presets show NAME [--version N]
+    python3 eleven_cli.py presets save NAME --voice-id ID [--model-id ...] [--stability ...]
+    python3 eleven_cli.py presets delete NAME
+    python3 eleven_cli.py synthesize --preset NAME (--text TEXT | --file PATH) -o OUTPUT
+    python3 eleven_cli.py usage show
+    python3 eleven_cli.py usage reset
+"""
+
+import sys
+import json
+import argparse
+from typing import List, Optional
+
+from eleven_presets import DEFAULT_MODEL_ID, DEFAULT_VOICE_SETTINGS, get_preset_store, make_preset
+from eleven_usage import get_ledger
+
+
+def _cmd_presets(args: argparse.Namespace) -> int:
+	store = get_preset_store()
+	if args.action == "list":
+		for name in store.names():
+			latest = store.get(name)
+			print(f"{name}\tv{latest.version}\t{latest.voice_id}\t{latest.model_id}")
+	elif args.action == "show":
+		print(json.dumps(store.get(args.name, args.version)._asdict(), indent=2))
+	elif args.action == "save":
+		preset = store.save(make_preset(
+			name=args.name,
+			voice_id=args.voice_id,
+			model_id=args.model_id,
+			stability=args.stability,
+			similarity_boost=args.similarity_boost,
+			style=args.style,
+			use_speaker_boost=not args.no_speaker_boost,
+			speed=args.speed,
+			language_code=args.language_code
+		))
+		print(f"Saved {preset.name} v{preset.version}")
+	elif args.action == "delete":
+		store.delete(args.name)
+		print(f"Deleted {args.name}")
+	return 0
+
+
+def _cmd_synthesize(args: argparse.Namespace) -> int:
+	from eleven_backend import synthesize_batch
+
+	if args.file:
+		with open(args.file, "r", encoding="utf-8") as f:
+			text = f.read()
+	else:
+		text = args.text
+
+	results, _ = synthesize_batch([text], preset=args.preset, output_format=args.output_format)
+	audio_bytes, _ = results[0]
+	with open(args.output, "wb") as f:
+		f.write(audio_bytes)
+	print(f"Wrote {len(audio_bytes):,} bytes to {args.output}")
+	return 0
+
+
+def _cmd_usage(args: argparse.Namespace) -> int:
+	ledger = get_ledger()
+	if args.action == "show":
+		totals = ledger.totals()
+		totals["remaining"] = ledger.remaining()
+		print(json.dumps(totals, indent=2))
+	elif args.action == "reset":
+		ledger.reset()
+		print("Started a new budget period")
+	return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+	parser = argparse.ArgumentParser(description="ElevenLabs TTS command line")
+	commands = parser.add_subparsers(dest="command", required=True)
+
+	presets = commands.add_parser("presets", help="Manage voice settings presets")
+	actions = presets.add_subparsers(dest="action", required=True)
+	actions.add_parser("list", help="List presets")
+	show = actions.add_parser("show", help="Show a preset")
+	show.add_argument("name")
+	show.add_argument("--version", type=int, default=None)
+	save = actions.add_parser("save", help="Save a new preset version")
+	save.add_argument("name")
+	save.add_argument("--voice-id", required=True)
+	save.add_argument("--model-id", default=DEFAULT_MODEL_ID)
+	save.add_argument("--stability", type=float, default=DEFAULT_VOICE_SETTINGS["stability"])
+	save.add_argument("--similarity-boost", type=float, default=DEFAULT_VOICE_SETTINGS["similarity_boost"])
+	save.add_argument("--style", type=float, default=DEFAULT_VOICE_SETTINGS["style"])
+	save.add_argument("--no-speaker-boost", action="store_true")
+	save.add_argument("--speed", type=float, default=None)
+	save.add_argument("--language-code", default=None)
+	delete = actions.add_parser("delete", help="Delete a preset")
+	delete.add_argument("name")
+	presets.set_defaults(func=_cmd_presets)
+
+	synth = commands.add_parser("synthesize", help="Synthesize text with a preset")
+	synth.add_argument("--preset", required=True, help="Stored preset name")
+	source = synth.add_mutually_exclusive_group(required=True)
+	source.add_argument("--text")
+	source.add_argument("--file", help="Read text from this file")
+	synth.add_argument("--output-format", default="mp3_44100_128")
+	synth.add_argument("-o", "--output", required=True)
+	synth.set_defaults(func=_cmd_synthesize)
+
+	usage = commands.add_parser("usage", help="Show character usage or start a new budget period")
+	usage_actions = usage.add_subparsers(dest="action", required=True)
+	usage_actions.add_parser("show", help="Show totals, the current budget period and remaining characters")
+	usage_actions.add_parser("reset", help="Start a new budget period now")
+	usage.set_defaults(func=_cmd_usage)
+
+	return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+	args = build_parser().parse_args(argv)
+	try:
+		return args.func(args)
+	except (KeyError, ValueError) as e:
+		print(f"Error: {e.args[0] if e.args else e}", file=sys.stderr)
+		return 1
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+API Health Monitoring
+
+This module keeps an always-available view of ElevenLabs API health:
+- A background thread that warms the connection at startup and then probes
+  periodically, backing off while the API is down
+- Passive observations of real synthesis calls (latency and errors)
+- A cached HealthStatus snapshot that callers read without blocking
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from typing import Callable, Deque, NamedTuple, Optional
+
+from eleven_stats import RollingWindow
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN = "unknown"
+HEALTHY = "healthy"
+DEGRADED = "degraded"
+DOWN = "down"
+
+
+class HealthStatus(NamedTuple):
+	"""Point-in-time health snapshot; latencies are in milliseconds."""
+
+	state: str = UNKNOWN
+	checked_at: Optional[float] = None
+	probe_latency_ms: Optional[float] = None
+	probe_p50_ms: Optional[float] = None
+	probe_p95_ms: Optional[float] = None
+	synthesis_p50_ms: Optional[float] = None
+	synthesis_error_rate: float = 0.0
+	consecutive_failures: int = 0
+	last_error: Optional[str] = None
+
+
+class HealthMonitor:
+	"""
+	Probe the API in the background and publish a cached HealthStatus.
+
+	The state is "down" after failure_threshold consecutive probe failures,
+	"degraded" after fewer failures or while most recent synthesis calls
+	fail, and "healthy" otherwise. While down, the probe interval doubles
+	up to max_interval; any successful probe or synthesis call resets it.
+	"""
+
+	def __init__(
+		self,
+		probe: Callable[[], None],
+		interval: float = 60.0,
+		max_interval: float = 600.0,
+		failure_threshold: int = 3,
+		window: int = 50
+	):
+		"""
+		Args:
+			probe (Callable): Lightweight API call; raises on failure
+			interval (float): Seconds between probes while the API is up
+			max_interval (float): Longest backoff between probes while down
+			failure_threshold (int): Consecutive probe failures before the state is "down"
+			window (int): Latency and outcome samples kept for statistics
+		"""
+		self.probe = probe
+		self.interval = interval
+		self.max_interval = max_interval
+		self.failure_threshold = failure_threshold
+		self._probe_latency = RollingWindow(window)
+		self._synthesis_latency = RollingWindow(window)
+		self._synthesis_outcomes: Deque[bool] = deque(maxlen=window)
+		self._lock = threading.Lock()
+		self._status = HealthStatus()
+		self._checked = threading.Event()
+		self._stop = threading.Event()
+		self._thread: Optional[threading.Thread] = None
+
+	def status(self) -> HealthStatus:
+		"""Return the latest snapshot without waiting for a probe."""
+		return self._status
+
+	def check_now(self) -> HealthStatus:
+		"""
+		Run the probe synchronously and update the status.
+
+		Returns:
+			HealthStatus: Updated snapshot
+		"""
+		started = time.monotonic()
+		try:
+			self.probe()
+		except Exception as e:
+			logger.warning(f"Health probe failed: {e}")
+			with self._lock:
+				self._publish(
+					probe_ok=False,
+					consecutive_failures=self._status.consecutive_failures + 1,
+					last_error=f"{type(e).__name__}: {e}"
+				)
+		else:
+			latency = time.monotonic() - started
+			self._probe_latency.record(latency)
+			with self._lock:
+				self._publish(probe_ok=True, probe_latency_ms=latency * 1000, consecutive_failures=0, last_error=None)
+		self._checked.set()
+		return self._status
+
+	def record_request(self, ok: bool, seconds: Optional[float] = None) -> None:
+		"""
+		Record the outcome of a real synthesis call.
+
+		Args:
+			ok (bool): Whether the call succeeded
+			seconds (float, optional): Call duration, for successful calls
+		"""
+		if ok and seconds is not None:
+			self._synthesis_latency.record(seconds)
+		with self._lock:
+			self._synthesis_outcomes.append(ok)
+			# A successful call proves the API is reachable again
+			failures = 0 if ok else self._status.consecutive_failures
+			self._publish(probe_ok=None, consecutive_failures=failures)
+
+	def _publish(self, probe_ok: Optional[bool], **changes) -> None:
+		"""Build and swap in a new snapshot; caller holds the lock."""
+		current = self._status._replace(**changes)
+		if probe_ok is not None:
+			current = current._replace(checked_at=time.time())
+
+		outcomes = list(self._synthesis_outcomes)
+		error_rate = outcomes.count(False) / len(outcomes) if outcomes else 0.0
+
+		if current.consecutive_failures >= self.failure_threshold:
+			state = DOWN
+		elif current.consecutive_failures > 0 or (len(outcomes) >= 4 and error_rate > 0.5):
+			state = DEGRADED
+		elif current.checked_at is None and not outcomes:
+			state = UNKNOWN
+		else:
+			state = HEALTHY
+
+		p50, p95 = self._probe_latency.percentile(50), self._probe_latency.percentile(95)
+		synthesis_p50 = self._synthesis_latency.percentile(50)
+		self._status = current._replace(
+			state=state,
+			probe_p50_ms=p50 * 1000 if p50 is not None else None,
+			probe_p95_ms=p95 * 1000 if p95 is not None else None,
+			synthesis_p50_ms=synthesis_p50 * 1000 if synthesis_p50 is not None else None,
+			synthesis_error_rate=error_rate
+		)
+
+	def next_delay(self) -> float:
+		"""Return the wait before the next probe, with backoff while down."""
+		excess = self._status.consecutive_failures - self.failure_threshold
+		if excess < 0:
+			return self.interval
+		return min(self.interval * 2 ** (excess + 1), self.max_interval)
+
+	def start(self) -> None:
+		"""Start the background probe thread (first probe runs immediately); idempotent."""
+		with self._lock:
+			if self._thread is not None and self._thread.is_alive():
+				return
+			self._stop.clear()
+			self._thread = threading.Thread(target=self._run, name="eleven-health", daemon=True)
+			self._thread.start()
+
+	def _run(self) -> None:
+		while not self._stop.is_set():
+			self.check_now()
+			self._stop.wait(self.next_delay())
+
+	def wait_until_checked(self, timeout: float) -> bool:
+		"""
+		Block until the first probe finishes or timeout seconds pass.
+
+		Returns:
+			bool: True if a probe has completed
+		"""
+		return self._checked.wait(timeout)
+
+	def stop(self) -> None:
+		"""Stop the background thread."""
+		self._stop.set()
+		thread = self._thread
+		if thread is not None:
+			thread.join(timeout=5)
@@ -0,0 +1,317 @@
+"""
+Hedged Requests
+
+This module trims tail latency for text-to-speech calls:
+- A rolling window (eleven_stats.RollingWindow) of recent time-to-first-byte (TTFB) samples
+- A hedger that fires a duplicate request when the first byte is late,
+  keeps whichever response starts first and cancels the other
+- An httpx transport through which a losing request can be cancelled
+- Caps on extra spend and counters for how often hedges fire and win
+"""
+
+import time
+import queue
+import logging
+import threading
+from itertools import chain
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import httpx
+
+from eleven_stats import RollingWindow
+
+logger = logging.getLogger(__name__)
+
+
+# Kept for callers that imported the TTFB window from here
+TTFBTracker = RollingWindow
+
+
+def _close(iterator: Iterator[bytes]) -> None:
+	"""Close a losing response so its connection is released."""
+	close = getattr(iterator, "close", None)
+	if close is not None:
+		try:
+			close()
+		except Exception as e:
+			logger.debug(f"Error closing hedged response: {e}")
+
+
+class _Attempt:
+	"""One request issued by Hedger.run(), cancelled if another attempt wins."""
+
+	def __init__(self, on_late_response: Callable[[float], None]):
+		self.began = time.monotonic()
+		self.cancelled = False
+		self._on_late_response = on_late_response
+		self._lock = threading.Lock()
+		self._callbacks: List[Callable[[], None]] = []
+
+	def on_cancel(self, callback: Callable[[], None]) -> None:
+		"""Call callback when the attempt is cancelled (at once if it already was)."""
+		with self._lock:
+			if not self.cancelled:
+				self._callbacks.append(callback)
+				return
+		callback()
+
+	def cancel(self) -> None:
+		with self._lock:
+			if self.cancelled:
+				return
+			self.cancelled = True
+			callbacks, self._callbacks = self._callbacks, []
+		for callback in callbacks:
+			callback()
+
+	def send(self, transport: httpx.BaseTransport, request: httpx.Request) -> httpx.Response:
+		"""
+		Send request on a helper thread so cancelling releases the caller at once.
+
+		A response arriving after cancellation still reports its time to
+		first byte, then is closed unread, which drops its connection.
+		"""
+		done = threading.Event()
+		outcome: Dict[str, object] = {}
+
+		def _send() -> None:
+			try:
+				response = transport.handle_request(request)
+			except Exception as e:
+				outcome["error"] = e
+			else:
+				with self._lock:
+					if not self.cancelled:
+						outcome["response"] = response
+				if "response" not in outcome:
+					self._on_late_response(time.monotonic() - self.began)
+					response.close()
+			done.set()
+
+		self.on_cancel(done.set)
+		threading.Thread(target=_send, daemon=True).start()
+		done.wait()
+		if "response" in outcome:
+			return outcome["response"]
+		if "error" in outcome:
+			raise outcome["error"]
+		raise httpx.ReadError("Hedged request cancelled", request=request)
+
+
+_current = threading.local()
+
+
+class CancellableTransport(httpx.BaseTransport):
+	"""
+	httpx transport through which Hedger can cancel a losing request.
+
+	Requests made from a hedged attempt's thread wait for their response
+	on a helper thread, so the loser stops waiting as soon as a winner is
+	chosen. Closing a socket does not interrupt a blocking read, so its
+	connection is only dropped once the late response arrives. Other
+	requests pass straight through to the wrapped transport.
+	"""
+
+	def __init__(self, transport: Optional[httpx.BaseTransport] = None):
+		"""
+		Args:
+			transport (httpx.BaseTransport, optional): Transport to send through; a default HTTPTransport if omitted
+		"""
+		self._transport = transport if transport is not None else httpx.HTTPTransport()
+
+	def handle_request(self, request: httpx.Request) -> httpx.Response:
+		attempt = getattr(_current, "attempt", None)
+		if attempt is None:
+			return self._transport.handle_request(request)
+		return attempt.send(self._transport, request)
+
+	def close(self) -> None:
+		self._transport.close()
+
+
+class Hedger:
+	"""
+	Issue a backup request when the first byte is slower than usual.
+
+	The hedge delay is the configured percentile of recent TTFB once
+	min_samples have been seen, and initial_delay before that. Hedges are
+	limited to max_hedge_ratio of all requests and, optionally, to
+	max_hedge_characters of extra text in total.
+	"""
+
+	def __init__(
+		self,
+		percentile: float = 95.0,
+		min_samples: int = 20,
+		initial_delay: float = 2.0,
+		max_hedge_ratio: float = 0.05,
+		max_hedge_characters: Optional[int] = None,
+		tracker: Optional[RollingWindow] = None
+	):
+		"""
+		Args:
+			percentile (float): TTFB percentile after which a hedge fires
+			min_samples (int): Samples needed before the percentile is trusted
+			initial_delay (float): Hedge delay in seconds until then
+			max_hedge_ratio (float): Maximum fraction of requests that may be hedged
+			max_hedge_characters (int, optional): Total extra characters hedges may spend
+			tracker (RollingWindow, optional): Shared window of TTFB samples in seconds
+		"""
+		self.percentile = percentile
+		self.min_samples = min_samples
+		self.initial_delay = initial_delay
+		self.max_hedge_ratio = max_hedge_ratio
+		self.max_hedge_characters = max_hedge_characters
+		self.tracker = tracker if tracker is not None else RollingWindow()
+		self._lock = threading.Lock()
+		self._stats = {"requests": 0, "hedges_fired": 0, "hedges_won": 0, "extra_characters": 0}
+
+	def hedge_delay(self) -> float:
+		"""
+		Return how long to wait for the first byte before hedging.
+
+		Returns:
+			float: Delay in seconds
+		"""
+		if len(self.tracker) < self.min_samples:
+			return self.initial_delay
+		return self.tracker.percentile(self.percentile)
+
+	def _reserve_hedge(self, cost: int) -> bool:
+		with self._lock:
+			if self._stats["hedges_fired"] + 1 > self.max_hedge_ratio * self._stats["requests"]:
+				return False
+			if (
+				self.max_hedge_characters is not None
+				and self._stats["extra_characters"] + cost > self.max_hedge_characters
+			):
+				return False
+			self._stats["hedges_fired"] += 1
+			self._stats["extra_characters"] += cost
+			return True
+
+	def run(
+		self,
+		start: Callable[[], Iterable[bytes]],
+		cost: int,
+		on_hedge: Optional[Callable[[], None]] = None
+	) -> Iterator[bytes]:
+		"""
+		Run start(), hedging with a second call if its first byte is late.
+
+		Each call runs on its own thread. Once one returns its first chunk,
+		the other is cancelled: requests sent through a CancellableTransport
+		are abandoned, and any other response is closed when it starts. A
+		loser's time to first byte is still recorded whenever it arrives, so
+		slow responses are not left out of the percentile.
+
+		Args:
+			start (Callable): Issues the request and returns an audio chunk iterable
+			cost (int): Characters a duplicate request would spend
+			on_hedge (Callable, optional): Called once if a hedge is fired
+
+		Returns:
+			Iterator[bytes]: The winning response, starting with its first chunk
+
+		Raises:
+			Exception: The first error if every attempt fails
+		"""
+		with self._lock:
+			self._stats["requests"] += 1
+
+		results: "queue.Queue" = queue.Queue()
+		decided = threading.Event()
+		decide_lock = threading.Lock()
+
+		handles = [_Attempt(self.tracker.record)]
+
+		def attempt(index: int) -> None:
+			handle = handles[index]
+			_current.attempt = handle
+			try:
+				iterator = iter(start())
+				first = next(iterator, b"")
+				outcome = (index, iterator, first, time.monotonic() - handle.began, None)
+			except Exception as e:
+				outcome = (index, None, None, 0.0, e)
+			finally:
+				_current.attempt = None
+			with decide_lock:
+				if not decided.is_set():
+					results.put(outcome)
+					return
+			# Lost the race: keep its first-byte time, drop the response
+			if outcome[1] is not None:
+				self.tracker.record(outcome[3])
+				_close(outcome[1])
+
+		threading.Thread(target=attempt, args=(0,), daemon=True).start()
+		attempts = 1
+		try:
+			outcome = results.get(timeout=self.hedge_delay())
+		except queue.Empty:
+			outcome = None
+			if self._reserve_hedge(cost):
+				logger.info("First byte late, firing hedged request")
+				if on_hedge is not None:
+					on_hedge()
+				handles.append(_Attempt(self.tracker.record))
+				threading.Thread(target=attempt, args=(1,), daemon=True).start()
+				attempts = 2
+
+		errors = []
+		while True:
+			if outcome is None:
+				outcome = results.get()
+			index, iterator, first, ttfb, error = outcome
+			if error is None:
+				break
+			errors.append(error)
+			if len(errors) == attempts:
+				raise errors[0]
+			outcome = None
+
+		with decide_lock:
+			decided.set()
+		for loser_index, handle in enumerate(handles):
+			if loser_index != index:
+				handle.cancel()
+		while not results.empty():
+			loser = results.get_nowait()
+			if loser[1] is not None:
+				self.tracker.record(loser[3])
+				_close(loser[1])
+
+		self.tracker.record(ttfb)
+		if index == 1:
+			with self._lock:
+				self._stats["hedges_won"] += 1
+		return chain((first,), iterator) if first else iterator
+
+	def stats(self) -> Dict[str, int]:
+		"""
+		Return hedging counters.
+
+		Returns:
+			Dict[str, int]: requests, hedges_fired, hedges_won, extra_characters
+		"""
+		with self._lock:
+			return dict(self._stats)
+
+
+_hedger: Optional[Hedger] = None
+_hedger_lock = threading.Lock()
+
+
+def get_hedger() -> Hedger:
+	"""
+	Return the process-wide hedger, creating it on first use.
+
+	Returns:
+		Hedger: Shared hedger instance
+	"""
+	global _hedger
+	with _hedger_lock:
+		if _hedger is None:
+			_hedger = Hedger()
+		return _hedger
@@ -0,0 +1,326 @@
+"""
+Session Audio History
+
+This module keeps the clips a user generates during a session:
+- A bounded history; the oldest clips are dropped once max_clips is reached
+- Only the most recent clips stay in memory, older ones are spilled to disk
+- Every in-memory clip counts against the process-wide budget in eleven_memory
+- Bulk export of every clip plus a JSON manifest (text, voice, model,
+  settings, seed) to a ZIP or gzipped tar archive, written incrementally
+"""
+
+import io
+import json
+import time
+import uuid
+import shutil
+import logging
+import tarfile
+import tempfile
+import weakref
+import zipfile
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from eleven_memory import AudioMemoryManager, get_memory_manager
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMATS = ("zip", "tar.gz")
+
+# Copy buffer size used when streaming clips into an archive
+_COPY_CHUNK = 256 * 1024
+
+
+def file_extension(output_format: str) -> str:
+	"""Return the file extension for an ElevenLabs output format."""
+	prefix = output_format.split("_", 1)[0]
+	return prefix if prefix in ("mp3", "wav", "pcm") else "bin"
+
+
+class Clip:
+	"""
+	One generated clip with the parameters used to create it.
+
+	The audio lives in memory until spill() moves it to a file (either
+	because of the session's limits or the process-wide memory budget);
+	read() and open() work the same either way.
+	"""
+
+	__slots__ = (
+		"clip_id", "created_at", "text", "mime_type", "params", "size",
+		"_audio", "_path", "_spill_dir", "_memory", "__weakref__"
+	)
+
+	def __init__(
+		self,
+		audio_bytes: bytes,
+		mime_type: str,
+		text: str,
+		params: Dict[str, Any],
+		spill_dir: Optional[Path] = None,
+		memory: Optional[AudioMemoryManager] = None
+	):
+		self.clip_id = uuid.uuid4().hex[:12]
+		self.created_at = time.time()
+		self.text = text
+		self.mime_type = mime_type
+		self.params = params
+		self.size = len(audio_bytes)
+		self._audio: Optional[bytes] = audio_bytes
+		self._path: Optional[Path] = None
+		self._spill_dir = spill_dir
+		self._memory = memory
+		if memory is not None:
+			memory.register(self)
+
+	@property
+	def in_memory(self) -> bool:
+		return self._audio is not None
+
+	@property
+	def extension(self) -> str:
+		return file_extension(self.params.get("output_format", ""))
+
+	def read(self) -> bytes:
+		"""Return the audio bytes, loading them from disk if spilled."""
+		audio = self._audio
+		if audio is not None:
+			if self._memory is not None:
+				self._memory.touch(self)
+			return audio
+		with open(self._path, "rb") as f:
+			return f.read()
+
+	def open(self) -> BinaryIO:
+		"""Return a readable binary stream over the audio."""
+		audio = self._audio
+		if audio is not None:
+			if self._memory is not None:
+				self._memory.touch(self)
+			return io.BytesIO(audio)
+		return open(self._path, "rb")
+
+	def spill(self, directory: Optional[Path] = None) -> int:
+		"""
+		Move the audio to a file and release the in-memory copy.
+
+		Args:
+			directory (Path, optional): Where to write; the clip's spill directory if omitted
+
+		Returns:
+			int: Bytes of memory released
+		"""
+		audio = self._audio
+		if audio is None:
+			return 0
+		directory = directory if directory is not None else self._spill_dir
+		if directory is None:
+			directory = Path(tempfile.gettempdir())
+		path = Path(directory) / f"{self.clip_id}.{self.extension}"
+		with open(path, "wb") as f:
+			f.write(audio)
+		# Set the path before dropping the bytes so concurrent readers always find one
+		self._path = path
+		self._audio = None
+		if self._memory is not None:
+			self._memory.release(self)
+		return self.size
+
+	def discard(self) -> None:
+		"""Release the audio and delete any spill file."""
+		self._audio = None
+		if self._memory is not None:
+			self._memory.release(self)
+		if self._path is not None:
+			try:
+				self._path.unlink()
+			except FileNotFoundError:
+				pass
+			self._path = None
+
+	def manifest_entry(self, filename: str) -> Dict[str, Any]:
+		"""Return the manifest record for this clip stored as filename."""
+		return {
+			"file": filename,
+			"created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.created_at)),
+			"text": self.text,
+			"mime_type": self.mime_type,
+			"bytes": self.size,
+			**self.params
+		}
+
+
+class AudioHistory:
+	"""
+	Bounded, oldest-first history of one session's clips.
+
+	Spill files go to a private temporary directory that is removed when
+	the history is cleared or garbage collected (e.g. when the Streamlit
+	session ends).
+	"""
+
+	def __init__(
+		self,
+		max_clips: int = 50,
+		max_memory_clips: int = 5,
+		max_memory_bytes: int = 32 * 1024 * 1024,
+		spill_dir: Optional[Path] = None,
+		memory: Optional[AudioMemoryManager] = None
+	):
+		"""
+		Args:
+			max_clips (int): Clips kept in total; the oldest are discarded beyond this
+			max_memory_clips (int): Most recent clips kept in memory
+			max_memory_bytes (int): Memory budget for in-memory clips
+			spill_dir (Path, optional): Parent directory for spill files; system temp if omitted
+			memory (AudioMemoryManager, optional): Process-wide budget; the shared manager if omitted
+		"""
+		self.max_clips = max_clips
+		self.max_memory_clips = max_memory_clips
+		self.max_memory_bytes = max_memory_bytes
+		self._spill_parent = spill_dir
+		self.memory = memory if memory is not None else get_memory_manager()
+		self._directory: Optional[Path] = None
+		self._clips: List[Clip] = []
+		self._finalizer = None
+
+	@property
+	def directory(self) -> Path:
+		"""Private directory for spill files and exports, created on first use."""
+		if self._directory is None:
+			self._directory = Path(tempfile.mkdtemp(prefix="eleven_history_", dir=self._spill_parent))
+			self._finalizer = weakref.finalize(self, shutil.rmtree, self._directory, True)
+		return self._directory
+
+	def __len__(self) -> int:
+		return len(self._clips)
+
+	def clips(self) -> List[Clip]:
+		"""Return clips oldest first."""
+		return list(self._clips)
+
+	def get(self, clip_id: str) -> Clip:
+		"""
+		Look up a clip by ID.
+
+		Raises:
+			KeyError: If the clip is not (or no longer) in the history
+		"""
+		for clip in self._clips:
+			if clip.clip_id == clip_id:
+				return clip
+		raise KeyError(f"Clip {clip_id!r} not in history")
+
+	@property
+	def memory_bytes(self) -> int:
+		"""Audio bytes currently held in memory."""
+		return sum(clip.size for clip in self._clips if clip.in_memory)
+
+	def add(self, audio_bytes: bytes, mime_type: str, text: str, **params: Any) -> Clip:
+		"""
+		Append a generated clip and enforce the history limits.
+
+		Args:
+			audio_bytes (bytes): Audio
+			mime_type (str): MIME type of the audio
+			text (str): Text that was synthesized
+			**params: Synthesis parameters for the manifest (voice_id, model_id,
+				output_format, voice_settings, seed, ...); must be JSON-serializable
+
+		Returns:
+			Clip: The stored clip
+		"""
+		clip = Clip(audio_bytes, mime_type, text, params, spill_dir=self.directory, memory=self.memory)
+		self._clips.append(clip)
+		self._enforce_limits()
+		return clip
+
+	def _enforce_limits(self) -> None:
+		while len(self._clips) > self.max_clips:
+			self._clips.pop(0).discard()
+
+		in_memory = [clip for clip in self._clips if clip.in_memory]
+		held = sum(clip.size for clip in in_memory)
+		# Spill oldest first, but always keep the newest clip in memory
+		for clip in in_memory[:-1]:
+			if len(in_memory) <= self.max_memory_clips and held <= self.max_memory_bytes:
+				break
+			held -= clip.spill(self.directory)
+			in_memory.remove(clip)
+			logger.debug(f"Spilled clip {clip.clip_id} ({clip.size:,} bytes) to disk")
+
+	def export(self, fileobj: BinaryIO, archive_format: str = "zip") -> int:
+		"""
+		Write every clip and a manifest.json to an archive.
+
+		Clips are copied into the archive in fixed-size chunks straight from
+		memory or their spill files, so the archive is never assembled in
+		memory. MP3 entries are stored as-is in ZIP files (already compressed).
+
+		Args:
+			fileobj (BinaryIO): Writable destination; need not be seekable
+			archive_format (str): "zip" or "tar.gz"
+
+		Returns:
+			int: Number of clips written
+
+		Raises:
+			ValueError: If archive_format is unsupported
+		"""
+		if archive_format not in ARCHIVE_FORMATS:
+			raise ValueError(f"Archive format must be one of {ARCHIVE_FORMATS}, got {archive_format!r}")
+
+		clips = self.clips()
+		names = [f"{index:03d}_{clip.params.get('voice_id', 'voice')}.{clip.extension}" for index, clip in enumerate(clips, 1)]
+		manifest = json.dumps(
+			{"clips": [clip.manifest_entry(name) for clip, name in zip(clips, names)]},
+			indent=2,
+			default=str
+		).encode("utf-8")
+
+		if archive_format == "zip":
+			with zipfile.ZipFile(fileobj, "w") as archive:
+				for clip, name in zip(clips, names):
+					info = zipfile.ZipInfo(name, time.localtime(clip.created_at)[:6])
+					info.compress_type = zipfile.ZIP_STORED if clip.extension == "mp3" else zipfile.ZIP_DEFLATED
+					with clip.open() as source, archive.open(info, "w") as target:
+						shutil.copyfileobj(source, target, _COPY_CHUNK)
+				archive.writestr("manifest.json", manifest, compress_type=zipfile.ZIP_DEFLATED)
+		else:
+			with tarfile.open(fileobj=fileobj, mode="w|gz") as archive:
+				for clip, name in zip(clips, names):
+					info = tarfile.TarInfo(name)
+					info.size = clip.size
+					info.mtime = int(clip.created_at)
+					with clip.open() as source:
+						archive.addfile(info, source)
+				info = tarfile.TarInfo("manifest.json")
+				info.size = len(manifest)
+				info.mtime = int(time.time())
+				archive.addfile(info, io.BytesIO(manifest))
+
+		logger.info(f"Exported {len(clips)} clips to {archive_format} archive")
+		return len(clips)
+
+	def export_to_file(self, archive_format: str = "zip") -> Path:
+		"""
+		Export to a file in the history directory, replacing any earlier export.
+
+		Returns:
+			Path: Archive file
+		"""
+		path = self.directory / f"export.{archive_format}"
+		with open(path, "wb") as f:
+			self.export(f, archive_format)
+		return path
+
+	def clear(self) -> None:
+		"""Discard every clip and remove the spill directory."""
+		for clip in self._clips:
+			clip.discard()
+		self._clips = []
+		if self._finalizer is not None:
+			self._finalizer()
+			self._directory = None
+			self._finalizer = None
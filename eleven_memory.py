@@ -0,0 +1,135 @@
+"""
+Process-Wide Audio Memory Budget
+
+This module bounds the audio held in memory across every session in the process:
+- Tracks the in-memory size of each registered clip
+- Spills the least recently used clips to disk once a global budget is exceeded
+- Forgets clips automatically when their session is garbage collected
+- Reports usage statistics
+
+Set ELEVENLABS_AUDIO_MEMORY_BUDGET (bytes) to change the default 256 MB budget.
+"""
+
+import os
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGET_BYTES = 256 * 1024 * 1024
+
+
+class AudioMemoryManager:
+	"""
+	LRU accounting of in-memory clips with spill-to-disk over a byte budget.
+
+	Clips are held by weak reference, so the manager never keeps a
+	finished session's audio alive. Clips must provide clip_id, size and
+	spill(), and call touch() when read; eleven_history.Clip does.
+	"""
+
+	def __init__(self, budget_bytes: Optional[int] = None):
+		"""
+		Args:
+			budget_bytes (int, optional): Global budget; ELEVENLABS_AUDIO_MEMORY_BUDGET or 256 MB if omitted
+		"""
+		if budget_bytes is None:
+			budget_bytes = int(os.getenv("ELEVENLABS_AUDIO_MEMORY_BUDGET", DEFAULT_BUDGET_BYTES))
+		self.budget_bytes = budget_bytes
+		# clip_id -> (weak reference, size), least recently used first
+		self._entries: "OrderedDict[str, Any]" = OrderedDict()
+		self._bytes = 0
+		self._lock = threading.RLock()
+		self._stats = {"spills": 0, "spilled_bytes": 0, "peak_bytes": 0}
+
+	def register(self, clip: Any) -> None:
+		"""
+		Start tracking an in-memory clip and enforce the budget.
+
+		The newly registered clip is the most recently used, so it is only
+		spilled if it alone exceeds the budget.
+		"""
+		key = clip.clip_id
+		with self._lock:
+			if key in self._entries:
+				return
+			self._entries[key] = (weakref.ref(clip, lambda _, key=key: self._forget(key)), clip.size)
+			self._bytes += clip.size
+			self._stats["peak_bytes"] = max(self._stats["peak_bytes"], self._bytes)
+			self._enforce_budget()
+
+	def touch(self, clip: Any) -> None:
+		"""Mark clip as most recently used."""
+		with self._lock:
+			if clip.clip_id in self._entries:
+				self._entries.move_to_end(clip.clip_id)
+
+	def release(self, clip: Any) -> None:
+		"""Stop tracking a clip that was spilled or discarded."""
+		self._forget(clip.clip_id)
+
+	def _forget(self, key: str) -> None:
+		with self._lock:
+			entry = self._entries.pop(key, None)
+			if entry is not None:
+				self._bytes -= entry[1]
+
+	def _enforce_budget(self) -> None:
+		while self._bytes > self.budget_bytes and self._entries:
+			key, (ref, size) = next(iter(self._entries.items()))
+			clip = ref()
+			if clip is None:
+				self._forget(key)
+				continue
+			try:
+				# spill() calls release(), which removes the entry
+				clip.spill()
+			except OSError as e:
+				logger.warning(f"Could not spill clip to disk, keeping it in memory: {e}")
+				self._entries.move_to_end(key)
+				return
+			self._forget(key)
+			self._stats["spills"] += 1
+			self._stats["spilled_bytes"] += size
+
+	@property
+	def memory_bytes(self) -> int:
+		"""Bytes of tracked audio currently in memory."""
+		return self._bytes
+
+	def stats(self) -> Dict[str, int]:
+		"""
+		Return budget usage and spill counters.
+
+		Returns:
+			Dict[str, int]: budget_bytes, memory_bytes, clips_in_memory, peak_bytes,
+			spills and spilled_bytes
+		"""
+		with self._lock:
+			return {
+				"budget_bytes": self.budget_bytes,
+				"memory_bytes": self._bytes,
+				"clips_in_memory": len(self._entries),
+				**self._stats
+			}
+
+
+_manager: Optional[AudioMemoryManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_memory_manager() -> AudioMemoryManager:
+	"""
+	Return the process-wide audio memory manager, creating it on first use.
+
+	Returns:
+		AudioMemoryManager: Shared manager
+	"""
+	global _manager
+	with _manager_lock:
+		if _manager is None:
+			_manager = AudioMemoryManager()
+		return _manager
@@ -0,0 +1,269 @@
+"""
+Model and Output Format Selection
+
+This module picks model_id and output_format for a synthesis call:
+- Per-model rolling windows of observed TTFB and generation time per character
+- Latency and file size predictions for a given text length
+- A "fastest" mode for interactive previews and a "quality" mode for final renders,
+  both honouring optional latency and size targets
+
+Predictions start from built-in priors and switch to live measurements
+(recorded by eleven_backend.synthesize()) once enough samples exist.
+"""
+
+import logging
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from eleven_stats import RollingWindow
+
+logger = logging.getLogger(__name__)
+
+FASTEST = "fastest"
+QUALITY = "quality"
+
+# Models from lowest to highest quality, with prior (TTFB seconds, generation seconds per character)
+MODEL_PRIORS: Dict[str, Tuple[float, float]] = {
+	"eleven_flash_v2_5": (0.35, 0.0012),
+	"eleven_turbo_v2_5": (0.5, 0.0018),
+	"eleven_multilingual_v2": (1.2, 0.004)
+}
+
+# Output formats from smallest to highest fidelity
+OUTPUT_FORMATS: List[str] = ["mp3_22050_32", "mp3_44100_64", "mp3_44100_128", "wav_44100"]
+
+# Typical narration rate, used until audio durations have been observed
+DEFAULT_CHARACTERS_PER_AUDIO_SECOND = 15.0
+
+
+def format_bytes_per_second(output_format: str) -> float:
+	"""
+	Return the encoded size of one second of audio in output_format.
+
+	Args:
+		output_format (str): ElevenLabs format such as "mp3_44100_128" or "pcm_22050"
+
+	Returns:
+		float: Bytes per second of audio
+
+	Raises:
+		ValueError: If the format is not recognized
+	"""
+	parts = output_format.split("_")
+	if parts[0] == "mp3" and len(parts) > 2:
+		return int(parts[2]) * 1000 / 8
+	if parts[0] in ("pcm", "wav") and len(parts) > 1:
+		return int(parts[1]) * 2
+	raise ValueError(f"Cannot estimate size of output format {output_format}")
+
+
+class Choice(NamedTuple):
+	"""A selected model and output format with the predictions behind it."""
+
+	model_id: str
+	output_format: str
+	predicted_latency: float
+	predicted_bytes: int
+	meets_targets: bool
+
+
+class ModelMetrics:
+	"""Thread-safe per-model latency observations."""
+
+	def __init__(self, window: int = 100, min_samples: int = 5):
+		"""
+		Args:
+			window (int): Samples kept per model
+			min_samples (int): Samples needed before observations replace the priors
+		"""
+		self.window = window
+		self.min_samples = min_samples
+		self._ttfb: Dict[str, RollingWindow] = {}
+		self._seconds_per_char: Dict[str, RollingWindow] = {}
+		self._audio_seconds_per_char = RollingWindow(window)
+		self._lock = threading.Lock()
+
+	def _trackers(self, model_id: str) -> Tuple[RollingWindow, RollingWindow]:
+		with self._lock:
+			if model_id not in self._ttfb:
+				self._ttfb[model_id] = RollingWindow(self.window)
+				self._seconds_per_char[model_id] = RollingWindow(self.window)
+			return self._ttfb[model_id], self._seconds_per_char[model_id]
+
+	def record(
+		self,
+		model_id: str,
+		ttfb: float,
+		total_seconds: float,
+		characters: int,
+		audio_seconds: Optional[float] = None
+	) -> None:
+		"""
+		Add one completed request.
+
+		Args:
+			model_id (str): Model used
+			ttfb (float): Seconds until the first audio byte
+			total_seconds (float): Seconds until the last audio byte
+			characters (int): Characters synthesized
+			audio_seconds (float, optional): Length of the returned audio
+		"""
+		if characters <= 0:
+			return
+		ttfb_tracker, rate_tracker = self._trackers(model_id)
+		ttfb_tracker.record(ttfb)
+		rate_tracker.record(max(total_seconds - ttfb, 0.0) / characters)
+		if audio_seconds:
+			self._audio_seconds_per_char.record(audio_seconds / characters)
+
+	def estimate(self, model_id: str) -> Tuple[float, float]:
+		"""
+		Return the median TTFB and generation seconds per character for a model.
+
+		Falls back to MODEL_PRIORS (or the slowest prior for unknown models)
+		until min_samples requests have been recorded.
+
+		Returns:
+			Tuple[float, float]: (TTFB seconds, seconds per character)
+		"""
+		ttfb_tracker, rate_tracker = self._trackers(model_id)
+		if len(ttfb_tracker) >= self.min_samples:
+			return ttfb_tracker.percentile(50), rate_tracker.percentile(50)
+		return MODEL_PRIORS.get(model_id, max(MODEL_PRIORS.values()))
+
+	def audio_seconds_per_character(self) -> float:
+		"""Return the observed (or default) audio length per character of text."""
+		if len(self._audio_seconds_per_char) >= self.min_samples:
+			return self._audio_seconds_per_char.percentile(50)
+		return 1.0 / DEFAULT_CHARACTERS_PER_AUDIO_SECOND
+
+	def stats(self) -> Dict[str, Dict[str, float]]:
+		"""
+		Return current estimates and sample counts per known model.
+
+		Returns:
+			Dict[str, Dict[str, float]]: {model_id: {"samples", "ttfb", "seconds_per_char"}}
+		"""
+		with self._lock:
+			models = list(dict.fromkeys(list(MODEL_PRIORS) + list(self._ttfb)))
+		result = {}
+		for model_id in models:
+			ttfb, seconds_per_char = self.estimate(model_id)
+			result[model_id] = {
+				"samples": len(self._trackers(model_id)[0]),
+				"ttfb": ttfb,
+				"seconds_per_char": seconds_per_char
+			}
+		return result
+
+
+class SelectionPolicy:
+	"""
+	Choose model_id and output_format from targets and live metrics.
+
+	"fastest" returns the lowest predicted latency, using the smallest
+	format that fits the targets. "quality" returns the highest quality
+	model and format whose predictions fit the targets. When nothing fits,
+	both return the fastest, smallest combination with meets_targets=False.
+	"""
+
+	def __init__(
+		self,
+		metrics: Optional[ModelMetrics] = None,
+		models: Optional[List[str]] = None,
+		output_formats: Optional[List[str]] = None
+	):
+		"""
+		Args:
+			metrics (ModelMetrics, optional): Observations; the shared instance if omitted
+			models (List[str], optional): Candidate models, lowest quality first
+			output_formats (List[str], optional): Candidate formats, smallest first
+		"""
+		self.metrics = metrics if metrics is not None else get_model_metrics()
+		self.models = list(models or MODEL_PRIORS)
+		self.output_formats = list(output_formats or OUTPUT_FORMATS)
+
+	def predict(self, model_id: str, output_format: str, text_length: int) -> Tuple[float, int]:
+		"""
+		Predict request latency and output size.
+
+		Args:
+			model_id (str): Model
+			output_format (str): Output format
+			text_length (int): Characters to synthesize
+
+		Returns:
+			Tuple[float, int]: (seconds until the audio is complete, bytes)
+		"""
+		ttfb, seconds_per_char = self.metrics.estimate(model_id)
+		audio_seconds = text_length * self.metrics.audio_seconds_per_character()
+		return ttfb + text_length * seconds_per_char, int(audio_seconds * format_bytes_per_second(output_format))
+
+	def choose(
+		self,
+		text_length: int,
+		mode: str = FASTEST,
+		latency_target: Optional[float] = None,
+		size_target: Optional[int] = None
+	) -> Choice:
+		"""
+		Pick a model and output format for text_length characters.
+
+		Args:
+			text_length (int): Characters to synthesize
+			mode (str): "fastest" (interactive previews) or "quality" (final renders)
+			latency_target (float, optional): Maximum seconds until the audio is complete
+			size_target (int, optional): Maximum output size in bytes
+
+		Returns:
+			Choice: Selected model_id and output_format with predictions
+
+		Raises:
+			ValueError: If mode is unknown
+		"""
+		if mode not in (FASTEST, QUALITY):
+			raise ValueError(f"Selection mode must be '{FASTEST}' or '{QUALITY}', got {mode!r}")
+
+		candidates = []
+		for model_rank, model_id in enumerate(self.models):
+			for format_rank, output_format in enumerate(self.output_formats):
+				latency, size = self.predict(model_id, output_format, text_length)
+				fits = (
+					(latency_target is None or latency <= latency_target)
+					and (size_target is None or size <= size_target)
+				)
+				candidates.append((fits, latency, size, model_rank, format_rank, model_id, output_format))
+
+		def fastest_key(c):
+			return c[1], c[2]
+
+		fitting = [c for c in candidates if c[0]]
+		if not fitting:
+			best = min(candidates, key=fastest_key)
+		elif mode == FASTEST:
+			best = min(fitting, key=fastest_key)
+		else:
+			best = max(fitting, key=lambda c: (c[3], c[4], -c[1]))
+
+		fits, latency, size, _, _, model_id, output_format = best
+		if not fits:
+			logger.info(f"No model/format meets the targets for {text_length} characters; using the fastest")
+		return Choice(model_id, output_format, latency, size, fits)
+
+
+_metrics: Optional[ModelMetrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_model_metrics() -> ModelMetrics:
+	"""
+	Return the process-wide model metrics, creating them on first use.
+
+	Returns:
+		ModelMetrics: Shared metrics instance
+	"""
+	global _metrics
+	with _metrics_lock:
+		if _metrics is None:
+			_metrics = ModelMetrics()
+		return _metrics
@@ -0,0 +1,296 @@
+"""
+Speculative Synthesis Prefetch
+
+This module lets the app pre-synthesize likely follow-up requests:
+- A bounded in-process audio cache keyed by synthesis parameters,
+  optionally backed by a cache shared between replicas
+- A background prefetcher with a concurrency limit, a rolling character
+  budget and a check against the usage ledger's remaining characters
+"""
+
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Dict, List, Tuple, Optional, Any, Callable, Hashable
+
+from eleven_cache import SharedCache, encode_audio_entry, decode_audio_entry
+from eleven_usage import UsageLedger, get_ledger
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def synthesis_key(
+	text: str,
+	voice_id: str,
+	model_id: str = "eleven_turbo_v2_5",
+	output_format: str = "mp3_44100_128",
+	voice_settings: Optional[Dict[str, Any]] = None,
+	seed: Optional[int] = None,
+	language_code: Optional[str] = None,
+	speed: Optional[float] = None,
+	post_processing: Optional[Dict[str, Any]] = None,
+	hedge: bool = False
+) -> Tuple[Hashable, ...]:
+	"""
+	Build a hashable cache key from synthesize() arguments.
+
+	Args:
+		Same as eleven_backend.synthesize(); hedge does not change the audio
+		and is left out of the key
+
+	Returns:
+		Tuple: Key that is equal for equivalent requests
+	"""
+	settings = tuple(sorted(voice_settings.items())) if voice_settings else ()
+	processing = tuple(sorted(post_processing.items())) if post_processing is not None else None
+	return (text, voice_id, model_id, output_format, settings, seed, language_code, speed, processing)
+
+
+class AudioCache:
+	"""
+	Thread-safe LRU cache of (audio bytes, MIME type) bounded by total bytes.
+
+	With a shared cache, local misses fall through to it and new entries
+	are written to both, so replicas reuse each other's audio.
+	"""
+
+	def __init__(
+		self,
+		max_bytes: int = DEFAULT_CACHE_BYTES,
+		shared: Optional[SharedCache] = None,
+		shared_ttl: Optional[float] = 24 * 3600
+	):
+		self.max_bytes = max_bytes
+		self.shared = shared
+		self.shared_ttl = shared_ttl
+		self._entries: "OrderedDict[Hashable, Tuple[bytes, str]]" = OrderedDict()
+		self._size = 0
+		self._lock = threading.Lock()
+
+	@staticmethod
+	def _shared_key(key: Hashable) -> str:
+		return "audio:" + hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+
+	def get(self, key: Hashable) -> Optional[Tuple[bytes, str]]:
+		with self._lock:
+			value = self._entries.get(key)
+			if value is not None:
+				self._entries.move_to_end(key)
+				return value
+		if self.shared is not None:
+			data = self.shared.get(self._shared_key(key))
+			if data is not None:
+				value = decode_audio_entry(data)
+				self._put_local(key, value)
+		return value
+
+	def get_or_compute(self, key: Hashable, compute: Callable[[], Tuple[bytes, str]]) -> Tuple[bytes, str]:
+		"""
+		Return the cached value or compute it, letting only one replica compute a shared miss.
+		"""
+		value = self.get(key)
+		if value is not None:
+			return value
+		if self.shared is None:
+			value = compute()
+			self.put(key, value)
+			return value
+		data = self.shared.get_or_compute(
+			self._shared_key(key), lambda: encode_audio_entry(*compute()), ttl=self.shared_ttl
+		)
+		value = decode_audio_entry(data)
+		self._put_local(key, value)
+		return value
+
+	def put(self, key: Hashable, value: Tuple[bytes, str]) -> None:
+		self._put_local(key, value)
+		if self.shared is not None:
+			self.shared.set(self._shared_key(key), encode_audio_entry(*value), ttl=self.shared_ttl)
+
+	def _put_local(self, key: Hashable, value: Tuple[bytes, str]) -> None:
+		if len(value[0]) > self.max_bytes:
+			return
+		with self._lock:
+			old = self._entries.pop(key, None)
+			if old is not None:
+				self._size -= len(old[0])
+			self._entries[key] = value
+			self._size += len(value[0])
+			while self._size > self.max_bytes:
+				_, evicted = self._entries.popitem(last=False)
+				self._size -= len(evicted[0])
+
+	def __contains__(self, key: Hashable) -> bool:
+		with self._lock:
+			return key in self._entries
+
+	def __len__(self) -> int:
+		with self._lock:
+			return len(self._entries)
+
+
+class SpeculativePrefetcher:
+	"""
+	Serve synthesis requests from cache and pre-synthesize likely next requests.
+
+	Prefetches run on a small thread pool. Speculation pauses while the
+	characters it spent in the last budget_window seconds reach
+	credit_budget, or when the usage ledger has too few characters left,
+	so wrong guesses have a bounded cost and never eat into the budget
+	for real requests.
+	"""
+
+	def __init__(
+		self,
+		synthesize_fn: Callable[..., Tuple[bytes, str]],
+		cache: Optional[AudioCache] = None,
+		max_workers: int = 2,
+		credit_budget: int = 10000,
+		budget_window: float = 3600.0,
+		voice_settings_fn: Optional[Callable[[str], Dict[str, Any]]] = None,
+		ledger: Optional[UsageLedger] = None
+	):
+		"""
+		Args:
+			synthesize_fn (Callable): Function with the signature of eleven_backend.synthesize()
+			cache (AudioCache, optional): Cache to fill; a new one is created by default
+			max_workers (int): Maximum concurrent prefetch requests
+			credit_budget (int): Characters that speculation may spend per budget_window
+			budget_window (float): Length of the rolling budget window in seconds
+			voice_settings_fn (Callable, optional): Returns a voice's default settings
+				(e.g. eleven_backend.get_voice_settings); prefetched variants use them,
+				matching what the app selects after a voice switch. Without it the
+				last request's settings are reused.
+			ledger (UsageLedger, optional): Ledger whose remaining() caps speculation;
+				the shared ledger if omitted
+		"""
+		self.synthesize_fn = synthesize_fn
+		self.cache = cache if cache is not None else AudioCache()
+		self.credit_budget = credit_budget
+		self.budget_window = budget_window
+		self.voice_settings_fn = voice_settings_fn
+		self.ledger = ledger
+		# (monotonic time, characters) of recent prefetches, oldest first
+		self._spending: Deque[Tuple[float, int]] = deque()
+		self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+		self._inflight: Dict[Hashable, Future] = {}
+		self._lock = threading.Lock()
+		self._stats = {"hits": 0, "misses": 0, "prefetched": 0, "prefetch_hits": 0, "credits_spent": 0}
+		self._prefetched_keys = set()
+
+	def get_or_synthesize(self, **params: Any) -> Tuple[bytes, str]:
+		"""
+		Return cached audio for these parameters, or synthesize and cache it.
+
+		If a prefetch for the same parameters is still running, waits for it
+		instead of issuing a duplicate request.
+
+		Args:
+			**params: synthesize() keyword arguments
+
+		Returns:
+			Tuple[bytes, str]: Audio bytes and MIME type
+		"""
+		key = synthesis_key(**params)
+		with self._lock:
+			pending = self._inflight.get(key)
+		if pending is not None:
+			try:
+				pending.result()
+			except Exception:
+				pass  # Fall through and synthesize in the foreground
+
+		cached = self.cache.get(key)
+		with self._lock:
+			if cached is not None:
+				self._stats["hits"] += 1
+				if key in self._prefetched_keys:
+					self._stats["prefetch_hits"] += 1
+					self._prefetched_keys.discard(key)
+			else:
+				self._stats["misses"] += 1
+		if cached is not None:
+			return cached
+
+		return self.cache.get_or_compute(key, lambda: self.synthesize_fn(**params))
+
+	def prefetch(self, params: Dict[str, Any], voice_ids: List[str]) -> int:
+		"""
+		Schedule background synthesis of the same request for other voices.
+
+		Args:
+			params (Dict[str, Any]): synthesize() keyword arguments of the last request
+			voice_ids (List[str]): Voices to speculate on
+
+		Returns:
+			int: Number of prefetches scheduled
+		"""
+		cost = len(params["text"])
+		ledger = self.ledger if self.ledger is not None else get_ledger()
+		available = ledger.remaining()
+		scheduled = 0
+		for voice_id in voice_ids:
+			variant = dict(params, voice_id=voice_id)
+			if self.voice_settings_fn is not None:
+				try:
+					variant["voice_settings"] = self.voice_settings_fn(voice_id)
+				except Exception as e:
+					logger.warning(f"Skipping prefetch for voice {voice_id}, no default settings: {e}")
+					continue
+			key = synthesis_key(**variant)
+			with self._lock:
+				if key in self._inflight or key in self.cache:
+					continue
+				if available is not None and cost > available:
+					logger.info("Not prefetching: usage ledger budget nearly spent")
+					break
+				if self._window_spent() + cost > self.credit_budget:
+					logger.info("Prefetch credit budget exhausted for this window")
+					break
+				if available is not None:
+					available -= cost
+				self._spending.append((time.monotonic(), cost))
+				self._stats["credits_spent"] += cost
+				self._stats["prefetched"] += 1
+				self._inflight[key] = self._executor.submit(self._run, key, variant)
+			scheduled += 1
+		return scheduled
+
+	def _window_spent(self) -> int:
+		"""Characters prefetched within the budget window; caller holds the lock."""
+		cutoff = time.monotonic() - self.budget_window
+		while self._spending and self._spending[0][0] < cutoff:
+			self._spending.popleft()
+		return sum(cost for _, cost in self._spending)
+
+	def _run(self, key: Hashable, params: Dict[str, Any]) -> None:
+		try:
+			self.cache.put(key, self.synthesize_fn(**params))
+			with self._lock:
+				self._prefetched_keys.add(key)
+		except Exception as e:
+			logger.warning(f"Prefetch for voice {params['voice_id']} failed: {e}")
+			raise
+		finally:
+			with self._lock:
+				self._inflight.pop(key, None)
+
+	def stats(self) -> Dict[str, int]:
+		"""
+		Return cache and prefetch counters.
+
+		Returns:
+			Dict[str, int]: hits, misses, prefetched, prefetch_hits, credits_spent
+			(all time) and window_credits_spent (within the budget window)
+		"""
+		with self._lock:
+			return dict(self._stats, window_credits_spent=self._window_spent())
+
+	def shutdown(self) -> None:
+		"""Stop accepting prefetches and wait for running ones."""
+		self._executor.shutdown(wait=True)
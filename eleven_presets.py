@@ -0,0 +1,359 @@
+"""
+Voice Settings Presets
+
+This module stores reusable synthesis configurations:
+- Immutable, hashable VoicePreset objects validated once and interned
+- A local JSON store of named presets with version history
+- Helpers turning a preset into synthesize() arguments
+"""
+
+import os
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Union
+
+# File locking is POSIX-only; elsewhere concurrent writers are only serialized within a process
+try:
+	import fcntl
+	FCNTL_AVAILABLE = True
+except ImportError:
+	FCNTL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRESETS_PATH = Path(__file__).resolve().parent / ".eleven_presets.json"
+
+DEFAULT_MODEL_ID = "eleven_turbo_v2_5"
+
+# Defaults used when a voice setting is not supplied
+DEFAULT_VOICE_SETTINGS: Dict[str, Any] = {
+	"stability": 0.5,
+	"similarity_boost": 0.75,
+	"style": 0.0,
+	"use_speaker_boost": True
+}
+
+SPEED_RANGE = (0.5, 1.5)
+
+
+class VoicePreset(NamedTuple):
+	"""
+	A named, versioned synthesis configuration.
+
+	Instances are immutable and hashable, so they can be used directly as
+	(part of) a cache key. Build them with make_preset() so they are
+	validated and interned.
+	"""
+
+	name: str
+	voice_id: str
+	model_id: str = DEFAULT_MODEL_ID
+	stability: float = DEFAULT_VOICE_SETTINGS["stability"]
+	similarity_boost: float = DEFAULT_VOICE_SETTINGS["similarity_boost"]
+	style: float = DEFAULT_VOICE_SETTINGS["style"]
+	use_speaker_boost: bool = DEFAULT_VOICE_SETTINGS["use_speaker_boost"]
+	speed: Optional[float] = None
+	language_code: Optional[str] = None
+	version: int = 0
+
+	@property
+	def voice_settings(self) -> Dict[str, Any]:
+		"""Voice settings dict in the shape synthesize() expects."""
+		return {
+			"stability": self.stability,
+			"similarity_boost": self.similarity_boost,
+			"style": self.style,
+			"use_speaker_boost": self.use_speaker_boost
+		}
+
+	def synthesis_kwargs(self) -> Dict[str, Any]:
+		"""
+		Return synthesize() keyword arguments for this preset.
+
+		Returns:
+			Dict[str, Any]: voice_id, model_id, voice_settings, speed and language_code
+		"""
+		return {
+			"voice_id": self.voice_id,
+			"model_id": self.model_id,
+			"voice_settings": self.voice_settings,
+			"speed": self.speed,
+			"language_code": self.language_code
+		}
+
+
+def make_preset(
+	name: str,
+	voice_id: str,
+	model_id: str = DEFAULT_MODEL_ID,
+	stability: float = DEFAULT_VOICE_SETTINGS["stability"],
+	similarity_boost: float = DEFAULT_VOICE_SETTINGS["similarity_boost"],
+	style: float = DEFAULT_VOICE_SETTINGS["style"],
+	use_speaker_boost: bool = DEFAULT_VOICE_SETTINGS["use_speaker_boost"],
+	speed: Optional[float] = None,
+	language_code: Optional[str] = None,
+	version: int = 0
+) -> VoicePreset:
+	"""
+	Validate preset fields and return the interned VoicePreset.
+
+	Results are memoized, so repeated calls with the same values (e.g. on
+	every Streamlit rerun) skip validation and return the same object,
+	whether the fields are passed positionally or by keyword.
+
+	Args:
+		name (str): Preset name
+		voice_id (str): Voice ID
+		model_id (str): TTS model
+		stability, similarity_boost, style (float): Voice settings in [0, 1]
+		use_speaker_boost (bool): Speaker boost flag
+		speed (float, optional): Speech rate multiplier (0.5 to 1.5)
+		language_code (str, optional): Language code for multilingual models
+		version (int): Store version (0 for unsaved presets)
+
+	Returns:
+		VoicePreset: Validated preset
+
+	Raises:
+		ValueError: If any field is out of range
+	"""
+	# Positional arguments only, so equal values always hit the same cache entry
+	return _intern_preset(
+		name, voice_id, model_id, stability, similarity_boost, style,
+		use_speaker_boost, speed, language_code, version
+	)
+
+
+@lru_cache(maxsize=1024)
+def _intern_preset(
+	name: str,
+	voice_id: str,
+	model_id: str,
+	stability: float,
+	similarity_boost: float,
+	style: float,
+	use_speaker_boost: bool,
+	speed: Optional[float],
+	language_code: Optional[str],
+	version: int
+) -> VoicePreset:
+	"""Validate and build a VoicePreset; memoized by make_preset()."""
+	if not name or not name.strip():
+		raise ValueError("Preset name must not be empty")
+	if not voice_id:
+		raise ValueError("Preset voice_id must not be empty")
+	for field, value in (("stability", stability), ("similarity_boost", similarity_boost), ("style", style)):
+		if not 0.0 <= value <= 1.0:
+			raise ValueError(f"Preset {field} must be between 0 and 1, got {value}")
+	if speed is not None and not SPEED_RANGE[0] <= speed <= SPEED_RANGE[1]:
+		raise ValueError(f"Preset speed must be between {SPEED_RANGE[0]} and {SPEED_RANGE[1]}, got {speed}")
+
+	return VoicePreset(
+		name=name.strip(),
+		voice_id=voice_id,
+		model_id=model_id,
+		stability=float(stability),
+		similarity_boost=float(similarity_boost),
+		style=float(style),
+		use_speaker_boost=bool(use_speaker_boost),
+		speed=float(speed) if speed is not None else None,
+		language_code=language_code or None,
+		version=version
+	)
+
+
+class PresetStore:
+	"""
+	Named presets persisted to a local JSON file.
+
+	Saving a preset under an existing name adds a new version; lookups
+	return the latest version unless one is requested.
+
+	The app, the CLI and batch jobs may share one file: every change
+	re-reads the file and writes it back under an exclusive file lock,
+	and lookups always reflect the file's current contents.
+	"""
+
+	def __init__(self, path: Optional[Path] = None):
+		"""
+		Args:
+			path (Path, optional): Store file; defaults to ELEVENLABS_PRESETS_PATH or .eleven_presets.json
+		"""
+		env_path = os.getenv("ELEVENLABS_PRESETS_PATH")
+		self.path = Path(path) if path else Path(env_path) if env_path else DEFAULT_PRESETS_PATH
+		self._lock = threading.Lock()
+		self._presets: Dict[str, List[VoicePreset]] = self._load()
+
+	def _load(self) -> Dict[str, List[VoicePreset]]:
+		try:
+			with open(self.path, "r", encoding="utf-8") as f:
+				raw = json.load(f)
+		except FileNotFoundError:
+			return {}
+		except (OSError, ValueError) as e:
+			logger.warning(f"Could not read preset store {self.path}: {e}")
+			return {}
+
+		presets: Dict[str, List[VoicePreset]] = {}
+		for name, versions in raw.items():
+			try:
+				presets[name] = [make_preset(**fields) for fields in versions]
+			except (TypeError, ValueError) as e:
+				logger.warning(f"Skipping invalid preset {name!r}: {e}")
+		return presets
+
+	@contextmanager
+	def _file_lock(self) -> Iterator[None]:
+		"""Hold an exclusive lock on the store's sidecar lock file."""
+		if not FCNTL_AVAILABLE:
+			yield
+			return
+		try:
+			lock_file = open(self.path.with_name(self.path.name + ".lock"), "a")
+		except OSError as e:
+			logger.warning(f"Could not lock preset store {self.path}: {e}")
+			yield
+			return
+		with lock_file:
+			fcntl.flock(lock_file, fcntl.LOCK_EX)
+			try:
+				yield
+			finally:
+				fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+	def _update(self, apply: Callable[[Dict[str, List[VoicePreset]]], None]) -> None:
+		"""Re-read the file, apply a change and write it back; caller holds self._lock."""
+		with self._file_lock():
+			self._presets = self._load()
+			apply(self._presets)
+			self._save()
+
+	def _refresh(self) -> None:
+		"""Pick up presets saved by other processes; caller holds self._lock."""
+		self._presets = self._load()
+
+	def _save(self) -> None:
+		raw = {name: [preset._asdict() for preset in versions] for name, versions in self._presets.items()}
+		tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+		with open(tmp_path, "w", encoding="utf-8") as f:
+			json.dump(raw, f, indent=2)
+		os.replace(tmp_path, self.path)
+
+	def save(self, preset: VoicePreset) -> VoicePreset:
+		"""
+		Store preset as the next version of its name.
+
+		Args:
+			preset (VoicePreset): Preset to save (its version is ignored)
+
+		Returns:
+			VoicePreset: The stored preset with its assigned version
+		"""
+		saved: List[VoicePreset] = []
+
+		def apply(presets: Dict[str, List[VoicePreset]]) -> None:
+			# Number the version against the file as it is now, not as this store last saw it
+			versions = presets.setdefault(preset.name, [])
+			fields = preset._asdict()
+			fields["version"] = versions[-1].version + 1 if versions else 1
+			versions.append(make_preset(**fields))
+			saved.append(versions[-1])
+
+		with self._lock:
+			self._update(apply)
+		stored = saved[0]
+		logger.info(f"Saved preset {stored.name!r} version {stored.version}")
+		return stored
+
+	def get(self, name: str, version: Optional[int] = None) -> VoicePreset:
+		"""
+		Look up a preset by name.
+
+		Args:
+			name (str): Preset name
+			version (int, optional): Specific version; latest if omitted
+
+		Returns:
+			VoicePreset: The preset
+
+		Raises:
+			KeyError: If the preset or version does not exist
+		"""
+		with self._lock:
+			self._refresh()
+			versions = self._presets.get(name)
+			if not versions:
+				raise KeyError(f"Preset {name!r} not found")
+			if version is None:
+				return versions[-1]
+			for preset in versions:
+				if preset.version == version:
+					return preset
+		raise KeyError(f"Preset {name!r} has no version {version}")
+
+	def versions(self, name: str) -> List[VoicePreset]:
+		"""Return every stored version of a preset, oldest first."""
+		with self._lock:
+			self._refresh()
+			return list(self._presets.get(name, []))
+
+	def names(self) -> List[str]:
+		"""Return preset names in alphabetical order."""
+		with self._lock:
+			self._refresh()
+			return sorted(self._presets)
+
+	def delete(self, name: str) -> None:
+		"""
+		Remove a preset and all its versions.
+
+		Raises:
+			KeyError: If the preset does not exist
+		"""
+		def apply(presets: Dict[str, List[VoicePreset]]) -> None:
+			if name not in presets:
+				raise KeyError(f"Preset {name!r} not found")
+			del presets[name]
+
+		with self._lock:
+			self._update(apply)
+
+
+_store: Optional[PresetStore] = None
+_store_lock = threading.Lock()
+
+
+def get_preset_store() -> PresetStore:
+	"""
+	Return the process-wide preset store, creating it on first use.
+
+	Returns:
+		PresetStore: Shared store instance
+	"""
+	global _store
+	with _store_lock:
+		if _store is None:
+			_store = PresetStore()
+		return _store
+
+
+def resolve_preset(preset: Union[str, VoicePreset]) -> VoicePreset:
+	"""
+	Accept a preset object or the name of a stored preset.
+
+	Args:
+		preset (Union[str, VoicePreset]): Preset or preset name
+
+	Returns:
+		VoicePreset: The preset
+
+	Raises:
+		KeyError: If a name is given and not found
+	"""
+	if isinstance(preset, VoicePreset):
+		return preset
+	return get_preset_store().get(preset)
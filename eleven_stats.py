@@ -0,0 +1,42 @@
+"""
+Rolling Statistics
+
+This module holds the small statistics helpers shared by the latency-aware
+modules (hedging, model selection, health monitoring):
+- A thread-safe, fixed-size rolling window of numeric samples with percentiles
+"""
+
+import threading
+from collections import deque
+from typing import Deque, Optional
+
+
+class RollingWindow:
+	"""Thread-safe rolling window of the most recent numeric samples."""
+
+	def __init__(self, window: int = 200):
+		"""
+		Args:
+			window (int): Number of most recent samples kept
+		"""
+		self._samples: Deque[float] = deque(maxlen=window)
+		self._lock = threading.Lock()
+
+	def record(self, value: float) -> None:
+		with self._lock:
+			self._samples.append(value)
+
+	def __len__(self) -> int:
+		with self._lock:
+			return len(self._samples)
+
+	def percentile(self, p: float) -> Optional[float]:
+		"""
+		Return the p-th percentile (0-100) of recent samples, or None if empty.
+		"""
+		with self._lock:
+			ordered = sorted(self._samples)
+		if not ordered:
+			return None
+		index = min(int(round(p / 100 * (len(ordered) - 1))), len(ordered) - 1)
+		return ordered[index]
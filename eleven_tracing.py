@@ -0,0 +1,267 @@
+"""
+Request Tracing
+
+This module records where time goes in a request:
+- Nested spans with attributes (voice, model, text length, bytes, ...)
+- A no-op default, so instrumented code costs one global lookup when tracing is off
+- A local JSON-lines exporter for offline analysis
+- Optional export to OpenTelemetry when the opentelemetry packages are installed
+
+Set ELEVENLABS_TRACE to a file path for JSON-lines output, or to "otel"
+to forward spans to the globally configured OpenTelemetry tracer provider.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import contextvars
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Optional OpenTelemetry export
+try:
+	from opentelemetry import trace as otel_trace
+	OTEL_AVAILABLE = True
+except ImportError:
+	OTEL_AVAILABLE = False
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("eleven_current_span", default=None)
+
+
+class _NoopSpan:
+	"""Span stand-in used while tracing is disabled; every method does nothing."""
+
+	__slots__ = ()
+
+	def __enter__(self) -> "_NoopSpan":
+		return self
+
+	def __exit__(self, exc_type, exc, tb) -> None:
+		return None
+
+	def set_attribute(self, key: str, value: Any) -> None:
+		pass
+
+	def set_attributes(self, **attributes: Any) -> None:
+		pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+	"""
+	One timed phase of a request.
+
+	Use as a context manager; spans opened inside it (in the same thread
+	or task) become its children. When the outermost span of a trace
+	ends, the whole trace is handed to the tracer's exporters.
+	"""
+
+	__slots__ = ("tracer", "name", "attributes", "trace_id", "span_id", "parent_id",
+		"start_ns", "end_ns", "status", "_trace", "_token")
+
+	def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+		self.tracer = tracer
+		self.name = name
+		self.attributes = attributes
+		self.start_ns = 0
+		self.end_ns = 0
+		self.status = "ok"
+		self._token = None
+
+		parent = _current_span.get()
+		self.span_id = tracer._next_id()
+		if parent is not None and parent.tracer is tracer:
+			self.trace_id = parent.trace_id
+			self.parent_id = parent.span_id
+			self._trace = parent._trace
+		else:
+			self.trace_id = self.span_id
+			self.parent_id = None
+			self._trace = []
+
+	def __enter__(self) -> "Span":
+		self.start_ns = time.time_ns()
+		self._token = _current_span.set(self)
+		return self
+
+	def __exit__(self, exc_type, exc, tb) -> None:
+		self.end_ns = time.time_ns()
+		_current_span.reset(self._token)
+		if exc_type is not None:
+			self.status = "error"
+			self.attributes["error"] = f"{exc_type.__name__}: {exc}"
+		self._trace.append(self)
+		if self.parent_id is None:
+			self.tracer._export(self._trace)
+
+	def set_attribute(self, key: str, value: Any) -> None:
+		self.attributes[key] = value
+
+	def set_attributes(self, **attributes: Any) -> None:
+		self.attributes.update(attributes)
+
+	@property
+	def duration_ms(self) -> float:
+		return (self.end_ns - self.start_ns) / 1e6
+
+	def to_dict(self) -> Dict[str, Any]:
+		"""
+		Return the span as a JSON-compatible dict.
+
+		Returns:
+			Dict[str, Any]: trace_id, span_id, parent_id, name, start (epoch seconds),
+			duration_ms, status and attributes
+		"""
+		return {
+			"trace_id": f"{self.trace_id:016x}",
+			"span_id": f"{self.span_id:016x}",
+			"parent_id": f"{self.parent_id:016x}" if self.parent_id is not None else None,
+			"name": self.name,
+			"start": self.start_ns / 1e9,
+			"duration_ms": round(self.duration_ms, 3),
+			"status": self.status,
+			"attributes": self.attributes
+		}
+
+
+class JSONLinesExporter:
+	"""Append finished spans to a file, one JSON object per line."""
+
+	def __init__(self, path: Path):
+		"""
+		Args:
+			path (Path): Output file; spans are appended
+		"""
+		self.path = Path(path)
+		self._lock = threading.Lock()
+
+	def export(self, spans: List[Span]) -> None:
+		lines = "".join(json.dumps(s.to_dict(), default=str, separators=(",", ":")) + "\n" for s in spans)
+		with self._lock:
+			with open(self.path, "a", encoding="utf-8") as f:
+				f.write(lines)
+
+
+class OpenTelemetryExporter:
+	"""
+	Re-emit finished traces as OpenTelemetry spans with their original timing.
+
+	Uses the global tracer provider unless one is given, so any exporter
+	configured there (OTLP, console, ...) receives the spans.
+	"""
+
+	def __init__(self, tracer_provider: Any = None):
+		"""
+		Args:
+			tracer_provider: OpenTelemetry TracerProvider; the global provider if omitted
+
+		Raises:
+			ValueError: If the opentelemetry packages are not installed
+		"""
+		if not OTEL_AVAILABLE:
+			raise ValueError("OpenTelemetry export requires the optional 'opentelemetry-api' package")
+		self._tracer = otel_trace.get_tracer(__name__, tracer_provider=tracer_provider)
+
+	def export(self, spans: List[Span]) -> None:
+		otel_spans: Dict[int, Any] = {}
+		# Parents start before their children, so they are created first
+		for span in sorted(spans, key=lambda s: s.start_ns):
+			parent = otel_spans.get(span.parent_id)
+			context = otel_trace.set_span_in_context(parent) if parent is not None else None
+			attributes = {k: v if isinstance(v, (str, bool, int, float)) else str(v) for k, v in span.attributes.items()}
+			otel_span = self._tracer.start_span(span.name, context=context, attributes=attributes, start_time=span.start_ns)
+			if span.status == "error":
+				otel_span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR))
+			otel_spans[span.span_id] = otel_span
+		for span in spans:
+			otel_spans[span.span_id].end(end_time=span.end_ns)
+
+
+class Tracer:
+	"""Creates spans and passes each finished trace to its exporters."""
+
+	def __init__(self, exporters: List[Any]):
+		"""
+		Args:
+			exporters (List): Objects with an export(spans) method
+		"""
+		self.exporters = list(exporters)
+		self._ids = iter(range(1, 2 ** 63))
+		self._id_lock = threading.Lock()
+		# Randomize IDs across processes so traces from several replicas don't collide
+		self._id_base = int.from_bytes(os.urandom(4), "big") << 32
+
+	def _next_id(self) -> int:
+		with self._id_lock:
+			return self._id_base | next(self._ids)
+
+	def span(self, name: str, **attributes: Any) -> Span:
+		return Span(self, name, attributes)
+
+	def _export(self, spans: List[Span]) -> None:
+		for exporter in self.exporters:
+			try:
+				exporter.export(spans)
+			except Exception as e:
+				# Tracing must never break the request it observes
+				logger.warning(f"Trace export to {type(exporter).__name__} failed: {e}")
+
+
+def tracer_from_env() -> Optional[Tracer]:
+	"""
+	Build a tracer from ELEVENLABS_TRACE.
+
+	Returns:
+		Optional[Tracer]: Tracer exporting to OpenTelemetry ("otel") or a JSON-lines file (any other value), or None if unset
+	"""
+	target = os.getenv("ELEVENLABS_TRACE")
+	if not target:
+		return None
+	if target == "otel":
+		return Tracer([OpenTelemetryExporter()])
+	return Tracer([JSONLinesExporter(Path(target))])
+
+
+_tracer: Optional[Tracer] = tracer_from_env()
+
+
+def set_tracer(tracer: Optional[Tracer]) -> None:
+	"""
+	Enable tracing with tracer, or disable it with None.
+
+	Args:
+		tracer (Tracer, optional): Tracer to use for all subsequent spans
+	"""
+	global _tracer
+	_tracer = tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+	"""Return the active tracer, or None while tracing is disabled."""
+	return _tracer
+
+
+def span(name: str, **attributes: Any):
+	"""
+	Open a span on the active tracer.
+
+	With tracing disabled this returns a shared no-op object, so call
+	sites need no checks of their own.
+
+	Args:
+		name (str): Phase name, e.g. "synthesize" or "drain_stream"
+		**attributes: Initial span attributes
+
+	Returns:
+		Span or no-op span: Context manager with set_attribute()/set_attributes()
+	"""
+	tracer = _tracer
+	if tracer is None:
+		return _NOOP_SPAN
+	return Span(tracer, name, attributes)
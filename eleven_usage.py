@@ -0,0 +1,380 @@
+"""
+ElevenLabs Character Usage Accounting
+
+This module keeps a local ledger of characters submitted to the ElevenLabs API:
+- Totals per call, voice, model and API key, persisted to a local JSON file
+- Periodic reconciliation against the subscription usage endpoint
+- Pre-flight budget checks that reject or defer batch jobs, per billing cycle
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Tuple, Optional, Any, Callable, Iterator
+
+# File locking is POSIX-only; elsewhere concurrent writers are only serialized within a process
+try:
+	import fcntl
+	FCNTL_AVAILABLE = True
+except ImportError:
+	FCNTL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USAGE_PATH = Path(__file__).resolve().parent / ".eleven_usage.json"
+DEFAULT_RECONCILE_INTERVAL = 3600.0
+
+
+class BudgetExceededError(ValueError):
+	"""Raised when a job would push character usage past the configured budget."""
+
+
+def key_fingerprint(api_key: Optional[str]) -> str:
+	"""
+	Return a short, non-reversible identifier for an API key.
+
+	Args:
+		api_key (str, optional): The API key to identify
+
+	Returns:
+		str: First 12 hex digits of the key's SHA-256, or "unknown"
+	"""
+	if not api_key:
+		return "unknown"
+	return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+
+
+def _budget_from_env() -> Optional[int]:
+	value = os.getenv("ELEVENLABS_CHARACTER_BUDGET")
+	if not value:
+		return None
+	try:
+		return int(value)
+	except ValueError:
+		logger.warning(f"Ignoring invalid ELEVENLABS_CHARACTER_BUDGET: {value!r}")
+		return None
+
+
+class UsageLedger:
+	"""
+	Thread-safe character ledger persisted to a local JSON file.
+
+	The ledger counts characters as they are submitted. When reconciled,
+	it also remembers the subscription's used/limit counters so the
+	remaining quota can be estimated between reconciliations.
+
+	The character budget applies per period: a new period starts when
+	the subscription's character count resets (learned on reconcile) or
+	when reset() is called. Lifetime totals are kept across periods.
+
+	Several processes (the app, the CLI, replicas) may share one file:
+	every update re-reads the file and writes it back under an exclusive
+	file lock, and reads always reflect the file's current contents.
+	"""
+
+	def __init__(
+		self,
+		path: Optional[Path] = None,
+		budget: Optional[int] = None,
+		reconcile_interval: float = DEFAULT_RECONCILE_INTERVAL
+	):
+		"""
+		Args:
+			path (Path, optional): Ledger file; defaults to ELEVENLABS_USAGE_PATH or .eleven_usage.json
+			budget (int, optional): Character budget per period; defaults to ELEVENLABS_CHARACTER_BUDGET
+			reconcile_interval (float): Seconds between subscription reconciliations
+		"""
+		env_path = os.getenv("ELEVENLABS_USAGE_PATH")
+		self.path = Path(path) if path else Path(env_path) if env_path else DEFAULT_USAGE_PATH
+		self.budget = budget if budget is not None else _budget_from_env()
+		self.reconcile_interval = reconcile_interval
+		self._lock = threading.Lock()
+		self._data = self._load()
+
+	def _empty(self) -> Dict[str, Any]:
+		return {
+			"total_characters": 0,
+			"calls": 0,
+			"period_characters": 0,
+			"period_started": None,
+			"period_resets_at": None,
+			"by_voice": {},
+			"by_model": {},
+			"by_key": {},
+			"subscription": None
+		}
+
+	def _load(self) -> Dict[str, Any]:
+		data = self._empty()
+		try:
+			with open(self.path, "r", encoding="utf-8") as f:
+				loaded = json.load(f)
+			data.update(loaded)
+			# Ledgers written before budget periods count everything toward the current one
+			loaded.setdefault("period_characters", data["total_characters"])
+			data["period_characters"] = loaded["period_characters"]
+		except FileNotFoundError:
+			pass
+		except (OSError, ValueError) as e:
+			logger.warning(f"Could not read usage ledger {self.path}: {e}")
+		return data
+
+	@contextmanager
+	def _file_lock(self) -> Iterator[None]:
+		"""Hold an exclusive lock on the ledger's sidecar lock file."""
+		if not FCNTL_AVAILABLE:
+			yield
+			return
+		try:
+			lock_file = open(self.path.with_name(self.path.name + ".lock"), "a")
+		except OSError as e:
+			logger.warning(f"Could not lock usage ledger {self.path}: {e}")
+			yield
+			return
+		with lock_file:
+			fcntl.flock(lock_file, fcntl.LOCK_EX)
+			try:
+				yield
+			finally:
+				fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+	def _update(self, apply: Callable[[Dict[str, Any]], None]) -> None:
+		"""Re-read the file, apply a change and write it back; caller holds self._lock."""
+		with self._file_lock():
+			self._data = self._load()
+			apply(self._data)
+			self._save()
+
+	def _refresh(self) -> None:
+		"""Pick up changes written by other processes; caller holds self._lock."""
+		self._data = self._load()
+
+	@staticmethod
+	def _period_characters(data: Dict[str, Any], now: float) -> int:
+		"""Characters counted toward the budget, zero once the period's reset time has passed."""
+		resets_at = data.get("period_resets_at")
+		if resets_at is not None and now >= resets_at:
+			return 0
+		return data["period_characters"]
+
+	@classmethod
+	def _roll_period(cls, data: Dict[str, Any], now: float) -> None:
+		"""Start a new budget period if the current one's reset time has passed."""
+		resets_at = data.get("period_resets_at")
+		if resets_at is not None and now >= resets_at:
+			data["period_characters"] = 0
+			data["period_started"] = resets_at
+			data["period_resets_at"] = None
+
+	def _save(self) -> None:
+		tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+		try:
+			with open(tmp_path, "w", encoding="utf-8") as f:
+				json.dump(self._data, f)
+			os.replace(tmp_path, self.path)
+		except OSError as e:
+			logger.warning(f"Could not write usage ledger {self.path}: {e}")
+
+	def record(self, characters: int, voice_id: str, model_id: str, key_id: str = "unknown") -> None:
+		"""
+		Record characters submitted in a single call.
+
+		Args:
+			characters (int): Number of characters sent
+			voice_id (str): Voice used
+			model_id (str): Model used
+			key_id (str): API key fingerprint (see key_fingerprint)
+		"""
+		def apply(data: Dict[str, Any]) -> None:
+			self._roll_period(data, time.time())
+			data["total_characters"] += characters
+			data["period_characters"] += characters
+			data["calls"] += 1
+			for bucket, name in (("by_voice", voice_id), ("by_model", model_id), ("by_key", key_id)):
+				counts = data[bucket]
+				counts[name] = counts.get(name, 0) + characters
+
+		with self._lock:
+			self._update(apply)
+
+	def totals(self) -> Dict[str, Any]:
+		"""
+		Return a snapshot of the ledger.
+
+		Returns:
+			Dict[str, Any]: total_characters, calls, by_voice, by_model, by_key, subscription
+			and the budget period (period_characters, period_started, period_resets_at)
+		"""
+		with self._lock:
+			self._refresh()
+			return json.loads(json.dumps(self._data))
+
+	def reconcile(self, client: Any) -> Dict[str, Any]:
+		"""
+		Fetch subscription usage and store it alongside the local totals.
+
+		Also learns when the subscription's character count next resets,
+		which ends the current budget period.
+
+		Args:
+			client: ElevenLabs client instance
+
+		Returns:
+			Dict[str, Any]: The stored subscription snapshot
+
+		Raises:
+			Exception: If API call fails
+		"""
+		subscription = client.user.subscription.get()
+		resets_at = getattr(subscription, "next_character_count_reset_unix", None)
+		snapshot: Dict[str, Any] = {}
+
+		def apply(data: Dict[str, Any]) -> None:
+			now = time.time()
+			self._roll_period(data, now)
+			if isinstance(resets_at, (int, float)) and resets_at > now:
+				data["period_resets_at"] = resets_at
+			snapshot.update(
+				character_count=subscription.character_count,
+				character_limit=subscription.character_limit,
+				local_total=data["total_characters"],
+				reconciled_at=now
+			)
+			data["subscription"] = snapshot
+
+		with self._lock:
+			self._update(apply)
+		logger.info(
+			f"Reconciled usage: {snapshot['character_count']:,}/{snapshot['character_limit']:,} characters"
+		)
+		return snapshot
+
+	def maybe_reconcile(self, client_factory: Callable[[], Any]) -> None:
+		"""
+		Reconcile if the last snapshot is older than reconcile_interval or
+		predates the subscription's character count reset.
+
+		Failures are logged and the ledger falls back to local totals.
+
+		Args:
+			client_factory (Callable): Returns an ElevenLabs client, called only when needed
+		"""
+		with self._lock:
+			self._refresh()
+			snapshot = self._data.get("subscription")
+			now = time.time()
+			resets_at = self._data.get("period_resets_at")
+			stale = (
+				not snapshot
+				or now - snapshot["reconciled_at"] >= self.reconcile_interval
+				or (resets_at is not None and now >= resets_at)
+			)
+		if not stale:
+			return
+		try:
+			self.reconcile(client_factory())
+		except Exception as e:
+			logger.warning(f"Usage reconciliation failed, using local totals: {e}")
+
+	def remaining(self) -> Optional[int]:
+		"""
+		Estimate characters still available.
+
+		Takes the smaller of the local budget headroom for the current
+		period and the subscription headroom (adjusted for characters
+		recorded since the last reconcile).
+
+		Returns:
+			Optional[int]: Remaining characters, or None if unbounded/unknown
+		"""
+		with self._lock:
+			self._refresh()
+			limits = []
+			total = self._data["total_characters"]
+			if self.budget is not None:
+				limits.append(self.budget - self._period_characters(self._data, time.time()))
+			snapshot = self._data.get("subscription")
+			if snapshot:
+				used = snapshot["character_count"] + (total - snapshot["local_total"])
+				limits.append(snapshot["character_limit"] - used)
+		return max(min(limits), 0) if limits else None
+
+	def reset(self) -> None:
+		"""
+		Start a new budget period now.
+
+		For budgets that should not follow the subscription's billing
+		cycle, or after raising a budget mid-cycle. Lifetime totals and
+		the subscription snapshot are kept.
+		"""
+		def apply(data: Dict[str, Any]) -> None:
+			data["period_characters"] = 0
+			data["period_started"] = time.time()
+
+		with self._lock:
+			self._update(apply)
+		logger.info("Started a new character budget period")
+
+	def plan_batch(self, texts: List[str]) -> Tuple[List[int], List[int]]:
+		"""
+		Split a batch into texts that fit in the remaining budget and texts to defer.
+
+		Texts are admitted in order until the next one would not fit.
+
+		Args:
+			texts (List[str]): Texts in submission order
+
+		Returns:
+			Tuple[List[int], List[int]]: Indices to run now and indices to defer
+		"""
+		remaining = self.remaining()
+		if remaining is None:
+			return list(range(len(texts))), []
+
+		accepted: List[int] = []
+		for index, text in enumerate(texts):
+			if len(text) > remaining:
+				return accepted, list(range(index, len(texts)))
+			remaining -= len(text)
+			accepted.append(index)
+		return accepted, []
+
+	def check_budget(self, texts: List[str]) -> None:
+		"""
+		Reject a batch outright if it does not fit in the remaining budget.
+
+		Args:
+			texts (List[str]): Texts that would be submitted
+
+		Raises:
+			BudgetExceededError: If the batch needs more characters than remain
+		"""
+		remaining = self.remaining()
+		needed = sum(len(text) for text in texts)
+		if remaining is not None and needed > remaining:
+			raise BudgetExceededError(
+				f"Batch needs {needed:,} characters but only {remaining:,} remain in budget"
+			)
+
+
+_ledger: Optional[UsageLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger() -> UsageLedger:
+	"""
+	Return the process-wide usage ledger, creating it on first use.
+
+	Returns:
+		UsageLedger: Shared ledger instance
+	"""
+	global _ledger
+	with _ledger_lock:
+		if _ledger is None:
+			_ledger = UsageLedger()
+		return _ledger
@@ -7,10 +7,17 @@ functions work correctly with the actual ElevenLabs service.
 
 Usage:
     python3 test_integration.py
+    python3 test_integration.py --record tests/cassettes/integration.cassette
+    python3 test_integration.py --replay tests/cassettes/integration.cassette [--speed 1.0]
+
+--record saves every API exchange to a cassette; --replay runs the suite
+offline from it (no API key or network needed).
 """
 
 import os
 import sys
+import argparse
+from pathlib import Path
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -20,7 +27,8 @@ load_dotenv()
 current_dir = os.path.dirname(os.path.abspath(__file__)) if '__file__' in globals() else os.getcwd()
 sys.path.insert(0, current_dir)
 
-from eleven_backend import get_client, list_voices, get_voice_settings, synthesize, list_models
+from eleven_backend import get_client, list_voices, get_voice_settings, synthesize, list_models, set_transport
+from eleven_cassette import RecordingTransport, ReplayTransport
 
 
 def test_api_connection():
@@ -199,5 +207,16 @@ def main():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ElevenLabs backend integration tests")
+    parser.add_argument("--record", metavar="CASSETTE", help="Record API traffic to this cassette")
+    parser.add_argument("--replay", metavar="CASSETTE", help="Replay API traffic from this cassette")
+    parser.add_argument("--speed", type=float, default=0.0, help="Replay speed (0 = no delays, 1 = original timing)")
+    args = parser.parse_args()
+    
+    if args.record:
+        set_transport(RecordingTransport(Path(args.record)))
+    elif args.replay:
+        set_transport(ReplayTransport(Path(args.replay), speed=args.speed))
+    
     success = main()
     sys.exit(0 if success else 1)
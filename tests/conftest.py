@@ -0,0 +1,56 @@
+"""
+Shared pytest fixtures.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import eleven_backend
+import eleven_memory
+import eleven_policy
+import eleven_presets
+import eleven_usage
+
+
+@pytest.fixture(autouse=True)
+def isolated_usage_ledger(tmp_path, monkeypatch):
+    """Point the shared usage ledger at a temporary file for every test."""
+    ledger = eleven_usage.UsageLedger(path=tmp_path / "usage.json", budget=None)
+    monkeypatch.setattr(eleven_usage, "_ledger", ledger)
+    return ledger
+
+
+@pytest.fixture(autouse=True)
+def isolated_preset_store(tmp_path, monkeypatch):
+    """Point the shared preset store at a temporary file for every test."""
+    store = eleven_presets.PresetStore(path=tmp_path / "presets.json")
+    monkeypatch.setattr(eleven_presets, "_store", store)
+    return store
+
+
+@pytest.fixture(autouse=True)
+def isolated_model_metrics(monkeypatch):
+    """Start every test with no observed model latency."""
+    metrics = eleven_policy.ModelMetrics()
+    monkeypatch.setattr(eleven_policy, "_metrics", metrics)
+    return metrics
+
+
+@pytest.fixture(autouse=True)
+def isolated_backend_clients(monkeypatch):
+    """Give every test a fresh client cache and health monitor."""
+    monkeypatch.setattr(eleven_backend, "_clients", {})
+    monkeypatch.setattr(eleven_backend, "_health_monitor", None)
+
+
+@pytest.fixture(autouse=True)
+def isolated_memory_manager(monkeypatch):
+    """Give every test its own process-wide audio memory budget."""
+    manager = eleven_memory.AudioMemoryManager()
+    monkeypatch.setattr(eleven_memory, "_manager", manager)
+    return manager
@@ -0,0 +1,160 @@
+"""
+Unit tests for the alignment and captions module.
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+import base64
+import os
+import sys
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eleven_alignment import Alignment, chunk_text
+from eleven_backend import synthesize_with_timestamps
+
+
+def fake_alignment(text, char_seconds=0.1):
+    """API-style alignment with evenly spaced characters."""
+    starts = [i * char_seconds for i in range(len(text))]
+    return Mock(
+        characters=list(text),
+        character_start_times_seconds=starts,
+        character_end_times_seconds=[s + char_seconds for s in starts]
+    )
+
+
+class TestAlignment:
+    """Test cases for the Alignment class."""
+    
+    def test_from_response_is_array_backed(self):
+        """Test that alignments are stored as a string plus float32 arrays."""
+        alignment = Alignment.from_response(fake_alignment("Hi there"))
+        
+        assert alignment.text == "Hi there"
+        assert alignment.starts.dtype == np.float32
+        assert alignment.nbytes == 2 * 4 * len("Hi there")
+        assert alignment.duration == pytest.approx(0.8)
+    
+    def test_words(self):
+        """Test that words get the start of their first and end of their last character."""
+        alignment = Alignment.from_response(fake_alignment("Hi there"))
+        
+        words = alignment.words()
+        
+        assert [w for w, _, _ in words] == ["Hi", "there"]
+        assert words[1][1] == pytest.approx(0.3)
+        assert words[1][2] == pytest.approx(0.8)
+    
+    def test_concat_applies_offsets(self):
+        """Test that stitched alignments are shifted by fragment offsets."""
+        first = Alignment.from_response(fake_alignment("One."))
+        second = Alignment.from_response(fake_alignment("Two."))
+        
+        joined = Alignment.concat([(first, 0.0), (second, 1.5)])
+        
+        assert joined.text == "One. Two."
+        assert joined.words()[1][1] == pytest.approx(1.5)
+    
+    def test_to_srt(self):
+        """Test SRT rendering with sentence breaks."""
+        alignment = Alignment.from_response(fake_alignment("Hello world. Bye."))
+        
+        srt = alignment.to_srt()
+        
+        assert srt == (
+            "1\n00:00:00,000 --> 00:00:01,200\nHello world.\n\n"
+            "2\n00:00:01,300 --> 00:00:01,700\nBye.\n"
+        )
+    
+    def test_to_webvtt_respects_max_chars(self):
+        """Test WebVTT rendering splits cues at max_chars."""
+        alignment = Alignment.from_response(fake_alignment("aaaa bbbb cccc"))
+        
+        vtt = alignment.to_webvtt(max_chars=9)
+        
+        assert vtt.startswith("WEBVTT\n")
+        assert "00:00:00.000 --> 00:00:00.900\naaaa bbbb\n" in vtt
+        assert "00:00:01.000 --> 00:00:01.400\ncccc\n" in vtt
+
+
+class TestChunkText:
+    """Test cases for chunk_text()."""
+    
+    def test_splits_at_sentences(self):
+        """Test that fragments break between sentences and stay under the limit."""
+        fragments = chunk_text("First sentence. Second one here. Third.", max_chars=20)
+        
+        assert fragments == ["First sentence.", "Second one here.", "Third."]
+    
+    def test_long_sentence_splits_at_words(self):
+        """Test that an over-long sentence falls back to word boundaries."""
+        fragments = chunk_text("alpha beta gamma delta", max_chars=11)
+        
+        assert fragments == ["alpha beta", "gamma delta"]
+        assert all(len(f) <= 11 for f in fragments)
+
+
+class TestBackendTimestamps:
+    """Test cases for synthesize_with_timestamps()."""
+    
+    @patch('eleven_backend.get_client')
+    def test_long_text_offsets_follow_audio_duration(self, mock_get_client):
+        """Test that fragment alignments are offset by the stitched audio length."""
+        mock_client = Mock()
+        mock_get_client.return_value = mock_client
+        
+        def convert_with_timestamps(**kwargs):
+            # 16000 bytes of 128 kbps MP3 = 1 second per fragment
+            return Mock(
+                audio_base_64=base64.b64encode(b"\xff" * 16000).decode(),
+                alignment=fake_alignment(kwargs["text"], char_seconds=0.05)
+            )
+        mock_client.text_to_speech.convert_with_timestamps.side_effect = convert_with_timestamps
+        
+        audio_bytes, mime_type, alignment = synthesize_with_timestamps(
+            "First part. Second part.", "voice1", max_chars=12
+        )
+        
+        assert len(audio_bytes) == 32000
+        assert mime_type == "audio/mpeg"
+        assert alignment.text == "First part. Second part."
+        assert alignment.words()[2][1] == pytest.approx(1.0)
+        calls = mock_client.text_to_speech.convert_with_timestamps.call_args_list
+        assert calls[0][1]["next_text"] == "Second part."
+        assert calls[1][1]["previous_text"] == "First part."
+    
+    @patch('eleven_backend.get_client')
+    def test_single_fragment_in_unmeasurable_format(self, mock_get_client, isolated_usage_ledger):
+        """Test that a one-fragment opus request is returned as is and billed."""
+        mock_client = Mock()
+        mock_client.text_to_speech.convert_with_timestamps.return_value = Mock(
+            audio_base_64=base64.b64encode(b"opus").decode(),
+            alignment=fake_alignment("Hello.")
+        )
+        mock_get_client.return_value = mock_client
+        
+        audio_bytes, _, alignment = synthesize_with_timestamps("Hello.", "voice1", output_format="opus_48000_64")
+        
+        assert audio_bytes == b"opus"
+        assert alignment.text == "Hello."
+        assert isolated_usage_ledger.totals()["total_characters"] == len("Hello.")
+    
+    @patch('eleven_backend.get_client')
+    def test_unstitchable_format_rejected_before_request(self, mock_get_client, isolated_usage_ledger):
+        """Test that multi-fragment text in a format that can't be stitched fails before any request."""
+        mock_client = Mock()
+        mock_get_client.return_value = mock_client
+        
+        with pytest.raises(ValueError, match="Cannot stitch"):
+            synthesize_with_timestamps("First part. Second part.", "voice1", output_format="ulaw_8000", max_chars=12)
+        
+        mock_client.text_to_speech.convert_with_timestamps.assert_not_called()
+        assert isolated_usage_ledger.totals()["total_characters"] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
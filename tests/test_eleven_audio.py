@@ -0,0 +1,168 @@
+"""
+Unit tests for the audio post-processing module.
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+import io
+import os
+import sys
+import wave
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eleven_audio import can_encode, decode_pcm, format_sample_rate, pcm_format_for, post_process, process_samples
+from eleven_backend import synthesize
+
+RATE = 16000
+
+
+def tone_with_silence(amplitude=0.1, silence_seconds=0.5, tone_seconds=1.0):
+    """Return int16 PCM bytes: silence, a 440 Hz tone, silence."""
+    t = np.arange(int(tone_seconds * RATE)) / RATE
+    tone = amplitude * np.sin(2 * np.pi * 440 * t)
+    silence = np.zeros(int(silence_seconds * RATE))
+    return (np.concatenate([silence, tone, silence]) * 32767).astype("<i2").tobytes()
+
+
+def rms_dbfs(samples):
+    samples = samples.astype(np.float64)
+    return 20 * np.log10(np.sqrt(np.mean(samples ** 2)) / 32768)
+
+
+class TestAudioHelpers:
+    """Test cases for format helpers and decoding."""
+    
+    def test_format_sample_rate(self):
+        """Test that sample rates are parsed from format names."""
+        assert format_sample_rate("mp3_44100_128") == 44100
+        assert format_sample_rate("wav_22050") == 22050
+        assert pcm_format_for("mp3_22050_32") == "pcm_22050"
+        
+        with pytest.raises(ValueError, match="Cannot determine sample rate"):
+            format_sample_rate("opus")
+    
+    def test_decode_wav_round_trip(self):
+        """Test that WAV output decodes back to the same samples."""
+        pcm = tone_with_silence()
+        wav_bytes = post_process(pcm, f"pcm_{RATE}", f"wav_{RATE}", normalize=False, trim=False, fade_ms=0)
+        
+        samples, rate = decode_pcm(wav_bytes, f"wav_{RATE}")
+        
+        assert rate == RATE
+        assert samples.tobytes() == pcm
+    
+    def test_decode_rejects_mp3(self):
+        """Test that compressed input is refused with a clear error."""
+        with pytest.raises(ValueError, match="request a pcm_"):
+            decode_pcm(b"\xff\xfb", "mp3_44100_128")
+
+
+class TestProcessSamples:
+    """Test cases for normalization, trimming and fades."""
+    
+    def test_trim_removes_silence(self):
+        """Test that leading and trailing silence is trimmed to the tone."""
+        samples, _ = decode_pcm(tone_with_silence(), f"pcm_{RATE}")
+        
+        out = np.concatenate(list(process_samples(samples, RATE, normalize=False, fade_ms=0, chunk_seconds=0.1)))
+        
+        assert abs(len(out) - RATE) <= RATE // 100
+    
+    def test_normalize_reaches_target(self):
+        """Test that gated RMS is brought to the target level."""
+        samples, _ = decode_pcm(tone_with_silence(amplitude=0.01), f"pcm_{RATE}")
+        
+        out = np.concatenate(list(process_samples(samples, RATE, target_dbfs=-20.0, fade_ms=0)))
+        
+        assert rms_dbfs(out) == pytest.approx(-20.0, abs=0.5)
+    
+    def test_peak_ceiling_limits_gain(self):
+        """Test that normalization never pushes peaks past the ceiling."""
+        samples, _ = decode_pcm(tone_with_silence(amplitude=0.5), f"pcm_{RATE}")
+        
+        out = np.concatenate(list(process_samples(samples, RATE, target_dbfs=0.0, peak_dbfs=-3.0)))
+        
+        assert np.abs(out).max() <= 32768 * 10 ** (-3.0 / 20) + 1
+    
+    def test_fades_start_and_end_at_zero(self):
+        """Test that fades ramp the clip edges."""
+        samples, _ = decode_pcm(tone_with_silence(amplitude=0.5, silence_seconds=0), f"pcm_{RATE}")
+        
+        out = np.concatenate(list(process_samples(samples, RATE, normalize=False, trim=False, fade_ms=10, chunk_seconds=0.01)))
+        
+        assert out[0] == 0
+        assert out[-1] == 0
+        assert np.abs(out[RATE // 2 - 50:RATE // 2 + 50]).max() > 10000
+    
+    def test_all_silence_trims_to_empty(self):
+        """Test that a silent clip produces no samples."""
+        samples = np.zeros(RATE, dtype="<i2")
+        
+        assert list(process_samples(samples, RATE)) == []
+
+
+class TestCanEncode:
+    """Test cases for can_encode()."""
+    
+    def test_formats(self):
+        """Test which output formats post-processed audio can be written to."""
+        assert can_encode(f"wav_{RATE}")
+        assert can_encode(f"pcm_{RATE}")
+        assert not can_encode("opus_48000_64")
+        with patch('eleven_audio.LAMEENC_AVAILABLE', False):
+            assert not can_encode("mp3_44100_128")
+
+
+class TestBackendPostProcessing:
+    """Test cases for post-processing in synthesize()."""
+    
+    @patch('eleven_backend.get_client')
+    def test_synthesize_requests_pcm_and_reencodes(self, mock_get_client):
+        """Test that post-processing asks for PCM and returns the requested format."""
+        mock_client = Mock()
+        mock_client.text_to_speech.convert.return_value = [tone_with_silence()]
+        mock_get_client.return_value = mock_client
+        
+        audio_bytes, mime_type = synthesize(
+            "Hello", "voice1", output_format=f"wav_{RATE}", post_processing={}
+        )
+        
+        assert mock_client.text_to_speech.convert.call_args[1]["output_format"] == f"pcm_{RATE}"
+        assert mime_type == "audio/wav"
+        with wave.open(io.BytesIO(audio_bytes)) as reader:
+            assert reader.getframerate() == RATE
+            assert reader.getnframes() < RATE * 2
+    
+    @patch('eleven_backend.get_client')
+    @patch('eleven_audio.LAMEENC_AVAILABLE', False)
+    def test_unencodable_format_rejected_before_request(self, mock_get_client, isolated_usage_ledger):
+        """Test that MP3 clean-up without lameenc fails before any characters are spent."""
+        mock_client = Mock()
+        mock_get_client.return_value = mock_client
+        
+        with pytest.raises(ValueError, match="lameenc"):
+            synthesize("Hello", "voice1", output_format="mp3_44100_128", post_processing={})
+        
+        mock_client.text_to_speech.convert.assert_not_called()
+        assert isolated_usage_ledger.totals()["total_characters"] == 0
+    
+    @patch('eleven_backend.get_client')
+    def test_failed_post_processing_still_records_usage(self, mock_get_client, isolated_usage_ledger):
+        """Test that characters are recorded once the audio is received, even if processing fails."""
+        mock_client = Mock()
+        mock_client.text_to_speech.convert.return_value = [b"\x01"]
+        mock_get_client.return_value = mock_client
+        
+        with patch('eleven_backend.run_audio_task', side_effect=ValueError("bad audio")):
+            with pytest.raises(ValueError, match="bad audio"):
+                synthesize("Hello", "voice1", output_format=f"wav_{RATE}", post_processing={})
+        
+        assert isolated_usage_ledger.totals()["total_characters"] == 5
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
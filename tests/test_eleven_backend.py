@@ -4,6 +4,7 @@ Unit tests for the ElevenLabs backend module.
 
 import pytest
 from unittest.mock import Mock, patch, MagicMock
+import logging
 import os
 import sys
 
@@ -11,6 +12,8 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from eleven_backend import get_client, list_voices, get_voice_settings, synthesize, list_models
+from eleven_hedging import CancellableTransport
+from eleven_usage import key_fingerprint
 
 
 class TestElevenBackend:
@@ -52,7 +55,21 @@ class TestElevenBackend:
         client = get_client()
         
         assert client == mock_client
-        mock_elevenlabs.assert_called_once_with(api_key="test-api-key")
+        mock_elevenlabs.assert_called_once()
+        assert mock_elevenlabs.call_args.kwargs["api_key"] == "test-api-key"
+        assert isinstance(mock_elevenlabs.call_args.kwargs["httpx_client"]._transport, CancellableTransport)
+    
+    @patch('eleven_backend.os.getenv')
+    @patch('eleven_backend.ElevenLabs')
+    def test_get_client_does_not_log_key(self, mock_elevenlabs, mock_getenv, caplog):
+        """Test that only the key's fingerprint is logged."""
+        mock_getenv.return_value = "sk_secret-test-key"
+        
+        with caplog.at_level(logging.INFO, logger="eleven_backend"):
+            get_client()
+        
+        assert "sk_secret" not in caplog.text
+        assert key_fingerprint("sk_secret-test-key") in caplog.text
     
     @patch('eleven_backend.st.secrets')
     @patch('eleven_backend.os.getenv')
@@ -0,0 +1,259 @@
+"""
+Unit tests for the shared cache module.
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+import os
+import sys
+import threading
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eleven_cache import (
+    DiskCache, RedisCache, SharedCache,
+    encode_audio_entry, decode_audio_entry, encode_json_entry, decode_json_entry
+)
+from eleven_prefetch import AudioCache, SpeculativePrefetcher
+from eleven_backend import list_voices, get_voice_settings, invalidate_voice_catalog, set_shared_cache
+
+
+class FakeRedis:
+    """Local stand-in for the subset of redis-py used by RedisCache."""
+    
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+    
+    def get(self, name):
+        with self.lock:
+            value, expires = self.data.get(name, (None, None))
+            if expires is not None and expires < time.time():
+                del self.data[name]
+                return None
+            return value
+    
+    def set(self, name, value, px=None, nx=False):
+        with self.lock:
+            current = self.data.get(name)
+            if nx and current is not None and (current[1] is None or current[1] >= time.time()):
+                return None
+            if isinstance(value, str):
+                value = value.encode()
+            self.data[name] = (value, time.time() + px / 1000 if px else None)
+            return True
+    
+    def delete(self, name):
+        with self.lock:
+            self.data.pop(name, None)
+    
+    def eval(self, script, numkeys, *keys_and_args):
+        """Run RedisCache's compare-and-delete script atomically."""
+        assert "redis.call(\"del\"" in script and numkeys == 1
+        name, token = keys_and_args
+        with self.lock:
+            value, _ = self.data.get(name, (None, None))
+            if value is not None and value == token.encode():
+                del self.data[name]
+                return 1
+            return 0
+
+
+@pytest.fixture(params=["disk", "redis"])
+def cache(request, tmp_path):
+    if request.param == "disk":
+        return DiskCache(tmp_path / "cache")
+    return RedisCache(FakeRedis())
+
+
+@pytest.fixture
+def shared_cache_reset():
+    yield
+    set_shared_cache(None)
+
+
+class TestSerialization:
+    """Test cases for the compact entry format."""
+    
+    def test_audio_round_trip(self):
+        """Test that audio entries add only a few bytes of overhead."""
+        data = encode_audio_entry(b"\x00" * 1000, "audio/mpeg")
+        
+        assert decode_audio_entry(data) == (b"\x00" * 1000, "audio/mpeg")
+        assert len(data) == 1000 + 3 + len("audio/mpeg")
+    
+    def test_json_round_trip(self):
+        """Test that JSON entries round-trip and reject the wrong type."""
+        value = [{"voice_id": "v1", "name": "Voice", "settings": {"stability": 0.5}}]
+        
+        assert decode_json_entry(encode_json_entry(value)) == value
+        with pytest.raises(ValueError):
+            decode_json_entry(encode_audio_entry(b"", "audio/wav"))
+
+
+class TestSharedCache:
+    """Test cases common to every SharedCache implementation."""
+    
+    def test_set_get_and_expiry(self, cache):
+        """Test that values are stored and expire after their TTL."""
+        cache.set("k", b"value", ttl=0.05)
+        
+        assert cache.get("k") == b"value"
+        time.sleep(0.1)
+        assert cache.get("k") is None
+    
+    def test_get_or_compute_prevents_stampede(self, cache):
+        """Test that concurrent misses compute the value only once."""
+        calls = []
+        
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return b"computed"
+        
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert results == [b"computed"] * 5
+        assert len(calls) == 1
+    
+    def test_delete(self, cache):
+        """Test that a deleted entry is recomputed."""
+        cache.set("k", b"old")
+        
+        cache.delete("k")
+        cache.delete("missing")
+        
+        assert cache.get("k") is None
+        assert cache.get_or_compute("k", lambda: b"new") == b"new"
+    
+    def test_giving_up_keeps_other_lease(self, cache):
+        """Test that a caller that stops waiting computes without releasing the holder's lease."""
+        token = cache._acquire_lease("k", 30)
+        
+        assert cache.get_or_compute("k", lambda: b"local", lease_seconds=0.1) == b"local"
+        assert cache._acquire_lease("k", 30) is None
+        cache._release_lease("k", token)
+        assert cache._acquire_lease("k", 30) is not None
+    
+    def test_release_ignores_other_token(self, cache):
+        """Test that releasing with a token other than the holder's leaves the lease."""
+        cache._acquire_lease("k", 30)
+        
+        cache._release_lease("k", "not-the-holder")
+        
+        assert cache._acquire_lease("k", 30) is None
+    
+    def test_concurrent_leases_are_exclusive(self, cache):
+        """Test that threads racing for one key get exactly one lease."""
+        barrier = threading.Barrier(8)
+        tokens = []
+        
+        def acquire():
+            barrier.wait()
+            tokens.append(cache._acquire_lease("k", 30))
+        
+        threads = [threading.Thread(target=acquire) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert len([token for token in tokens if token is not None]) == 1
+    
+    def test_interface_is_abstract(self):
+        """Test that a backend missing methods cannot be instantiated."""
+        class Incomplete(SharedCache):
+            def get(self, key):
+                return None
+        
+        with pytest.raises(TypeError):
+            Incomplete()
+
+
+class TestDiskCacheLeases:
+    """Test cases for DiskCache lock files."""
+    
+    def test_stale_lease_taken_over_once(self, tmp_path):
+        """Test that only one of several waiters takes over a stale lock."""
+        cache = DiskCache(tmp_path / "cache")
+        cache._acquire_lease("k", 30)
+        lock_path = cache._path("k").with_suffix(".lock")
+        os.utime(lock_path, (time.time() - 60, time.time() - 60))
+        barrier = threading.Barrier(8)
+        tokens = []
+        
+        def acquire():
+            barrier.wait()
+            tokens.append(cache._acquire_lease("k", 30))
+        
+        threads = [threading.Thread(target=acquire) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        winners = [token for token in tokens if token is not None]
+        assert len(winners) == 1
+        assert lock_path.read_text() == winners[0]
+        assert sorted(p.name for p in lock_path.parent.iterdir()) == [lock_path.name]
+
+
+class TestReplicaSharing:
+    """Test cases for replicas sharing the voice catalog and audio."""
+    
+    @patch('eleven_backend.get_client')
+    def test_voice_catalog_shared(self, mock_get_client, tmp_path, shared_cache_reset):
+        """Test that the catalog is fetched once and serves voices and settings."""
+        mock_client = Mock()
+        voice = Mock(voice_id="voice1")
+        voice.name = "Voice 1"
+        voice.settings = Mock(stability=0.7, similarity_boost=0.8, style=0.1, use_speaker_boost=False)
+        mock_client.voices.get_all.return_value = Mock(voices=[voice])
+        mock_get_client.return_value = mock_client
+        set_shared_cache(DiskCache(tmp_path / "cache"))
+        
+        voices = list_voices()
+        settings = get_voice_settings("voice1")
+        
+        assert voices == [{"voice_id": "voice1", "name": "Voice 1"}]
+        assert settings["stability"] == 0.7
+        mock_client.voices.get_all.assert_called_once()
+    
+    @patch('eleven_backend.get_client')
+    def test_invalidate_voice_catalog(self, mock_get_client, tmp_path, shared_cache_reset):
+        """Test that a refresh makes the next lookup fetch the catalog again."""
+        mock_client = Mock()
+        mock_client.voices.get_all.return_value = Mock(voices=[])
+        mock_get_client.return_value = mock_client
+        set_shared_cache(DiskCache(tmp_path / "cache"))
+        
+        list_voices()
+        invalidate_voice_catalog()
+        list_voices()
+        
+        assert mock_client.voices.get_all.call_count == 2
+    
+    def test_audio_shared_between_replicas(self):
+        """Test that one replica's synthesis is reused by another."""
+        shared = RedisCache(FakeRedis())
+        synth_a = Mock(return_value=(b"audio", "audio/mpeg"))
+        synth_b = Mock(return_value=(b"other", "audio/mpeg"))
+        replica_a = SpeculativePrefetcher(synth_a, cache=AudioCache(shared=shared))
+        replica_b = SpeculativePrefetcher(synth_b, cache=AudioCache(shared=shared))
+        
+        replica_a.get_or_synthesize(text="hi", voice_id="v1")
+        audio, _ = replica_b.get_or_synthesize(text="hi", voice_id="v1")
+        
+        assert audio == b"audio"
+        synth_b.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
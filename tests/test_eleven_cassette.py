@@ -0,0 +1,112 @@
+"""
+Unit tests for the record/replay transport.
+"""
+
+import pytest
+from unittest.mock import patch
+import os
+import sys
+import time
+
+import httpx
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import eleven_backend
+from eleven_backend import synthesize, synthesize_stream, set_transport
+from eleven_cassette import CassetteMissError, RecordingTransport, ReplayTransport, load_cassette
+
+
+class ChunkedStream(httpx.SyncByteStream):
+    """Response body delivered in several timed chunks."""
+    
+    def __init__(self, chunks, pause=0.0):
+        self.chunks = chunks
+        self.pause = pause
+    
+    def __iter__(self):
+        for chunk in self.chunks:
+            time.sleep(self.pause)
+            yield chunk
+
+
+def fake_api(pause=0.0):
+    """Transport standing in for the ElevenLabs API."""
+    def handler(request):
+        return httpx.Response(200, headers={"content-type": "audio/mpeg"}, stream=ChunkedStream([b"ab", b"cd", b"ef"], pause))
+    return httpx.MockTransport(handler)
+
+
+@pytest.fixture
+def transport_reset():
+    yield
+    set_transport(None)
+
+
+class TestCassette:
+    """Test cases for recording and replaying API traffic."""
+    
+    def test_record_then_replay_offline(self, tmp_path, monkeypatch, transport_reset):
+        """Test that a recorded synthesize call replays byte-for-byte without a key."""
+        cassette = tmp_path / "tts.cassette"
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "sk_record_key")
+        set_transport(RecordingTransport(cassette, inner=fake_api()))
+        recorded, _ = synthesize("Hello", "voice1")
+        
+        monkeypatch.delenv("ELEVENLABS_API_KEY")
+        set_transport(ReplayTransport(cassette))
+        with patch('eleven_backend.st.secrets') as mock_secrets:
+            mock_secrets.get.return_value = None
+            replayed, _ = synthesize("Hello", "voice1")
+        
+        assert recorded == replayed == b"abcdef"
+    
+    def test_cassette_omits_api_key(self, tmp_path, monkeypatch, transport_reset):
+        """Test that request headers (and so the API key) are not written."""
+        cassette = tmp_path / "tts.cassette"
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "sk_record_key")
+        set_transport(RecordingTransport(cassette, inner=fake_api()))
+        synthesize("Hello", "voice1")
+        
+        (meta, body), = load_cassette(cassette)
+        
+        assert "sk_record_key" not in str(meta)
+        assert [length for _, length in meta["chunks"]] == [2, 2, 2]
+        assert body == b"abcdef"
+    
+    def test_replay_preserves_stream_timing(self, tmp_path, monkeypatch, transport_reset):
+        """Test that replay at speed 1 reproduces chunk timing and speed 0 skips it."""
+        cassette = tmp_path / "tts.cassette"
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "sk_record_key")
+        set_transport(RecordingTransport(cassette, inner=fake_api(pause=0.05)))
+        list(synthesize_stream("Hello", "voice1"))
+        
+        set_transport(ReplayTransport(cassette, speed=1.0))
+        started = time.monotonic()
+        chunks = list(synthesize_stream("Hello", "voice1"))
+        realtime = time.monotonic() - started
+        
+        set_transport(ReplayTransport(cassette, speed=0.0))
+        started = time.monotonic()
+        list(synthesize_stream("Hello", "voice1"))
+        fast = time.monotonic() - started
+        
+        assert b"".join(chunks) == b"abcdef"
+        assert realtime >= 0.14
+        assert fast < realtime
+    
+    def test_unrecorded_request_fails(self, tmp_path, monkeypatch, transport_reset):
+        """Test that replay refuses requests that were never recorded."""
+        cassette = tmp_path / "tts.cassette"
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "sk_record_key")
+        set_transport(RecordingTransport(cassette, inner=fake_api()))
+        synthesize("Hello", "voice1")
+        
+        set_transport(ReplayTransport(cassette))
+        with pytest.raises(CassetteMissError):
+            synthesize("Different text", "voice1")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,85 @@
+"""
+Unit tests for the CPU offload module.
+"""
+
+import pytest
+import asyncio
+import os
+import sys
+from unittest.mock import patch
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import eleven_executor
+from eleven_executor import run_audio_task, run_audio_task_async, submit_audio_task, shutdown_process_pool, warm_process_pool
+from eleven_audio import post_process
+from test_eleven_audio import tone_with_silence, RATE
+
+
+@pytest.fixture
+def pooled(monkeypatch):
+    """Force every task through the process pool."""
+    monkeypatch.setattr(eleven_executor, "INLINE_THRESHOLD", 0)
+    yield
+    shutdown_process_pool()
+
+
+class TestAudioExecutor:
+    """Test cases for the process pool offload."""
+    
+    def test_pool_result_matches_inline(self, pooled):
+        """Test that a pooled task returns the same bytes as running inline."""
+        pcm = tone_with_silence()
+        expected = post_process(pcm, f"pcm_{RATE}", f"wav_{RATE}")
+        
+        assert run_audio_task(post_process, pcm, f"pcm_{RATE}", f"wav_{RATE}") == expected
+    
+    def test_worker_exception_propagates(self, pooled):
+        """Test that errors raised in the worker reach the caller."""
+        with pytest.raises(ValueError, match="Cannot decode"):
+            run_audio_task(post_process, b"\x00" * 16, "mp3_44100_128", f"wav_{RATE}")
+    
+    def test_exception_after_decoding_propagates(self, pooled):
+        """Test that an error raised while arrays view the shared buffer still reaches the caller."""
+        with pytest.raises(TypeError):
+            run_audio_task(post_process, tone_with_silence(), f"pcm_{RATE}", f"wav_{RATE}", target_dbfs="loud")
+    
+    def test_async_entry_point(self, pooled):
+        """Test that tasks can be awaited from an event loop."""
+        pcm = tone_with_silence()
+        
+        result = asyncio.run(run_audio_task_async(post_process, pcm, f"pcm_{RATE}", f"pcm_{RATE}"))
+        
+        assert 0 < len(result) < len(pcm)
+    
+    def test_small_buffers_run_inline(self):
+        """Test that small inputs skip the pool entirely."""
+        with patch('eleven_executor.get_process_pool') as mock_pool:
+            future = submit_audio_task(post_process, tone_with_silence(), f"pcm_{RATE}", f"pcm_{RATE}")
+        
+        assert future.result()
+        mock_pool.assert_not_called()
+    
+    def test_pool_workers_capped(self, monkeypatch):
+        """Test that the pool is capped by default and sized by the environment variable."""
+        monkeypatch.delenv("ELEVENLABS_AUDIO_WORKERS", raising=False)
+        monkeypatch.setattr(eleven_executor, "available_cores", lambda: 64)
+        assert eleven_executor.pool_workers() == eleven_executor.DEFAULT_MAX_WORKERS
+        
+        monkeypatch.setenv("ELEVENLABS_AUDIO_WORKERS", "2")
+        assert eleven_executor.pool_workers() == 2
+    
+    def test_warm_process_pool_starts_workers(self):
+        """Test that warming starts the pool's workers before any audio task."""
+        try:
+            pool = warm_process_pool(wait=True)
+            
+            assert pool is eleven_executor.get_process_pool()
+            assert len(pool._processes) == eleven_executor.pool_workers()
+        finally:
+            shutdown_process_pool()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,157 @@
+"""
+Unit tests for the API health monitoring module.
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from elevenlabs.core.api_error import ApiError
+from eleven_health import DEGRADED, DOWN, HEALTHY, UNKNOWN, HealthMonitor
+from eleven_backend import get_client, get_health_monitor, set_transport, start_health_monitor, synthesize
+
+
+class TestHealthMonitor:
+    """Test cases for HealthMonitor."""
+    
+    def test_initial_status_is_unknown(self):
+        """Test that no probe has run before start()."""
+        probe = Mock()
+        monitor = HealthMonitor(probe)
+        
+        assert monitor.status().state == UNKNOWN
+        probe.assert_not_called()
+    
+    def test_successful_probe(self):
+        """Test that a successful probe publishes latency statistics."""
+        monitor = HealthMonitor(Mock())
+        
+        status = monitor.check_now()
+        
+        assert status.state == HEALTHY
+        assert status.checked_at is not None
+        assert status.probe_latency_ms is not None
+        assert status.probe_p95_ms >= status.probe_p50_ms
+    
+    def test_failures_degrade_then_down_with_backoff(self):
+        """Test state transitions and probe backoff while the API is down."""
+        probe = Mock(side_effect=ConnectionError("unreachable"))
+        monitor = HealthMonitor(probe, interval=10, max_interval=60, failure_threshold=3)
+        
+        assert monitor.check_now().state == DEGRADED
+        monitor.check_now()
+        status = monitor.check_now()
+        
+        assert status.state == DOWN
+        assert status.last_error == "ConnectionError: unreachable"
+        assert monitor.next_delay() == 20
+        monitor.check_now()
+        monitor.check_now()
+        assert monitor.next_delay() == 60
+        
+        probe.side_effect = None
+        assert monitor.check_now().state == HEALTHY
+        assert monitor.next_delay() == 10
+    
+    def test_synthesis_outcomes(self):
+        """Test that failing synthesis degrades and a success clears probe failures."""
+        monitor = HealthMonitor(Mock(side_effect=OSError("down")), failure_threshold=1)
+        monitor.check_now()
+        assert monitor.status().state == DOWN
+        
+        monitor.record_request(True, 0.5)
+        assert monitor.status().state == HEALTHY
+        assert monitor.status().synthesis_p50_ms == pytest.approx(500)
+        
+        for _ in range(4):
+            monitor.record_request(False)
+        assert monitor.status().state == DEGRADED
+        assert monitor.status().synthesis_error_rate == pytest.approx(0.8)
+    
+    def test_background_thread(self):
+        """Test that start() probes immediately in the background."""
+        probe = Mock()
+        monitor = HealthMonitor(probe, interval=60)
+        
+        monitor.start()
+        monitor.start()
+        try:
+            assert monitor.wait_until_checked(5)
+        finally:
+            monitor.stop()
+        
+        probe.assert_called_once()
+        assert monitor.status().state == HEALTHY
+
+
+class TestBackendHealth:
+    """Test cases for client reuse and health integration in eleven_backend."""
+    
+    @patch.dict(os.environ, {'ELEVENLABS_API_KEY': 'test-key-123'})
+    @patch('eleven_backend.ElevenLabs')
+    def test_client_is_reused(self, mock_elevenlabs):
+        """Test that the client (and its connection pool) is built once per key."""
+        first = get_client()
+        second = get_client()
+        
+        assert first is second
+        mock_elevenlabs.assert_called_once()
+        
+        set_transport(None)
+        get_client()
+        assert mock_elevenlabs.call_count == 2
+    
+    @patch('eleven_backend.get_client')
+    def test_start_health_monitor_probes_subscription(self, mock_get_client):
+        """Test that warm-up runs the lightweight subscription probe."""
+        mock_client = Mock()
+        mock_get_client.return_value = mock_client
+        
+        monitor = start_health_monitor(wait=5)
+        monitor.stop()
+        
+        mock_client.user.subscription.get.assert_called()
+        assert monitor.status().state == HEALTHY
+    
+    @patch('eleven_backend.get_client')
+    def test_synthesize_reports_outcomes(self, mock_get_client):
+        """Test that synthesis results feed the health monitor."""
+        mock_client = Mock()
+        mock_client.text_to_speech.convert.side_effect = [iter([b"audio"]), ApiError(status_code=503)]
+        mock_get_client.return_value = mock_client
+        
+        synthesize("Hello", "voice1")
+        with pytest.raises(ApiError):
+            synthesize("Hello", "voice1")
+        
+        status = get_health_monitor().status()
+        assert status.synthesis_error_rate == pytest.approx(0.5)
+        assert status.synthesis_p50_ms is not None
+    
+    @patch('eleven_backend.get_client')
+    def test_local_errors_do_not_count_as_failures(self, mock_get_client):
+        """Test that post-processing and client errors are not held against the API."""
+        mock_client = Mock()
+        mock_client.text_to_speech.convert.side_effect = [iter([b"audio"]), ApiError(status_code=404)]
+        mock_get_client.return_value = mock_client
+        
+        with patch('eleven_backend.run_audio_task', side_effect=ValueError("bad audio")):
+            with pytest.raises(ValueError):
+                synthesize("Hello", "voice1", output_format="wav_16000", post_processing={})
+        with pytest.raises(ApiError):
+            synthesize("Hello", "unknown-voice")
+        mock_get_client.side_effect = ValueError("ELEVENLABS_API_KEY not found")
+        with pytest.raises(ValueError):
+            synthesize("Hello", "voice1")
+        
+        status = get_health_monitor().status()
+        assert status.synthesis_error_rate == 0.0
+        assert status.state == HEALTHY
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,237 @@
+"""
+Unit tests for the hedged requests module.
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+import os
+import sys
+import threading
+import time
+
+import httpx
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eleven_hedging import CancellableTransport, Hedger
+from eleven_backend import synthesize, synthesize_stream
+
+
+class SlowThenFast:
+    """start() callable whose first call stalls and later calls answer quickly."""
+    
+    def __init__(self, stall=0.5):
+        self.stall = stall
+        self.calls = 0
+        self.closed = []
+        self.lock = threading.Lock()
+    
+    def __call__(self):
+        with self.lock:
+            self.calls += 1
+            index = self.calls
+        return self._response(index)
+    
+    def _response(self, index):
+        try:
+            if index == 1:
+                time.sleep(self.stall)
+            yield f"first-{index}".encode()
+            yield b"-rest"
+        finally:
+            self.closed.append(index)
+
+
+class StalledFirstTransport(httpx.BaseTransport):
+    """Transport whose first request waits until released; later requests answer at once."""
+    
+    def __init__(self):
+        self.release = threading.Event()
+        self.first_closed = threading.Event()
+        self.calls = 0
+        self.lock = threading.Lock()
+    
+    def handle_request(self, request):
+        with self.lock:
+            self.calls += 1
+            index = self.calls
+        if index == 1:
+            self.release.wait(5)
+        transport = self
+        
+        class Body(httpx.SyncByteStream):
+            def __iter__(self):
+                yield f"first-{index}".encode()
+            
+            def close(self):
+                if index == 1:
+                    transport.first_closed.set()
+        
+        return httpx.Response(200, stream=Body())
+
+
+def warmed_hedger(**kwargs):
+    """Hedger with a short initial delay and room to hedge every request."""
+    kwargs.setdefault("initial_delay", 0.05)
+    kwargs.setdefault("max_hedge_ratio", 1.0)
+    return Hedger(**kwargs)
+
+
+class TestHedger:
+    """Test cases for the Hedger class."""
+    
+    def test_fast_primary_does_not_hedge(self):
+        """Test that no duplicate is sent when the first byte is on time."""
+        hedger = warmed_hedger(initial_delay=1.0)
+        start = Mock(side_effect=lambda: iter([b"a", b"b"]))
+        
+        assert b"".join(hedger.run(start, cost=10)) == b"ab"
+        assert start.call_count == 1
+        assert hedger.stats()["hedges_fired"] == 0
+    
+    def test_slow_primary_loses_to_hedge(self):
+        """Test that a late first byte fires a hedge which wins and the loser is closed."""
+        hedger = warmed_hedger()
+        start = SlowThenFast()
+        on_hedge = Mock()
+        
+        audio = b"".join(hedger.run(start, cost=10, on_hedge=on_hedge))
+        time.sleep(0.7)
+        
+        assert audio == b"first-2-rest"
+        assert hedger.stats() == {"requests": 1, "hedges_fired": 1, "hedges_won": 1, "extra_characters": 10}
+        on_hedge.assert_called_once()
+        assert 1 in start.closed
+    
+    def test_loser_ttfb_is_recorded(self):
+        """Test that the slow primary's first-byte time is recorded when it arrives."""
+        hedger = warmed_hedger()
+        start = SlowThenFast(stall=0.3)
+        
+        b"".join(hedger.run(start, cost=10))
+        time.sleep(0.5)
+        
+        assert len(hedger.tracker) == 2
+        assert hedger.tracker.percentile(100) >= 0.3
+    
+    def test_losing_request_is_cancelled(self):
+        """Test that a losing request sent through a CancellableTransport stops waiting at once."""
+        hedger = warmed_hedger()
+        transport = StalledFirstTransport()
+        client = httpx.Client(transport=CancellableTransport(transport))
+        finished = []
+        
+        def start():
+            def body():
+                try:
+                    with client.stream("GET", "http://api.test/") as response:
+                        yield from response.iter_bytes()
+                finally:
+                    finished.append(time.monotonic())
+            return body()
+        
+        assert b"".join(hedger.run(start, cost=10)) == b"first-2"
+        deadline = time.monotonic() + 1.0
+        while len(finished) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        
+        assert len(finished) == 2
+        assert not transport.first_closed.is_set()
+        transport.release.set()
+        assert transport.first_closed.wait(1.0)
+        assert len(hedger.tracker) == 2
+    
+    def test_hedge_ratio_cap(self):
+        """Test that hedges stop once the allowed fraction is used."""
+        hedger = warmed_hedger(max_hedge_ratio=0.0)
+        start = SlowThenFast(stall=0.1)
+        
+        assert b"".join(hedger.run(start, cost=10)) == b"first-1-rest"
+        assert start.calls == 1
+        assert hedger.stats()["hedges_fired"] == 0
+    
+    def test_character_cap(self):
+        """Test that hedges respect the extra character budget."""
+        hedger = warmed_hedger(max_hedge_characters=5)
+        start = SlowThenFast(stall=0.1)
+        
+        b"".join(hedger.run(start, cost=10))
+        
+        assert start.calls == 1
+    
+    def test_error_when_all_attempts_fail(self):
+        """Test that the first error is raised if every attempt fails."""
+        hedger = warmed_hedger()
+        start = Mock(side_effect=Exception("boom"))
+        
+        with pytest.raises(Exception, match="boom"):
+            hedger.run(start, cost=10)
+    
+    def test_delay_uses_percentile_after_warmup(self):
+        """Test that the hedge delay follows recent TTFB once warmed up."""
+        hedger = Hedger(percentile=90, min_samples=10, initial_delay=5.0)
+        for _ in range(10):
+            hedger.tracker.record(0.2)
+        
+        assert hedger.hedge_delay() == pytest.approx(0.2)
+
+
+class TestBackendHedging:
+    """Test cases for hedging in synthesize() and synthesize_stream()."""
+    
+    @patch('eleven_backend.get_hedger')
+    @patch('eleven_backend.get_client')
+    def test_synthesize_hedge_uses_hedger(self, mock_get_client, mock_get_hedger):
+        """Test that hedge=True routes the request through the hedger."""
+        mock_get_client.return_value = Mock()
+        mock_get_hedger.return_value.run.return_value = iter([b"audio"])
+        
+        audio_bytes, _ = synthesize("Hello", "voice1", hedge=True)
+        
+        assert audio_bytes == b"audio"
+        assert mock_get_hedger.return_value.run.call_args[1]["cost"] == 5
+    
+    @patch('eleven_backend.get_client')
+    def test_synthesize_stream_yields_chunks(self, mock_get_client):
+        """Test that the streaming variant yields chunks as they arrive."""
+        mock_client = Mock()
+        mock_client.text_to_speech.stream.return_value = iter([b"a", b"b"])
+        mock_get_client.return_value = mock_client
+        
+        chunks = list(synthesize_stream("Hello", "voice1"))
+        
+        assert chunks == [b"a", b"b"]
+        assert mock_client.text_to_speech.stream.call_args[1]["voice_id"] == "voice1"
+    
+    @patch('eleven_backend.get_client')
+    def test_failed_stream_records_no_usage(self, mock_get_client, isolated_usage_ledger):
+        """Test that a stream rejected by the API is not charged to the ledger."""
+        def rejected():
+            raise Exception("401 Unauthorized")
+            yield
+        
+        mock_client = Mock()
+        mock_client.text_to_speech.stream.return_value = rejected()
+        mock_get_client.return_value = mock_client
+        
+        with pytest.raises(Exception, match="401"):
+            list(synthesize_stream("Hello world", "voice1"))
+        
+        assert isolated_usage_ledger.totals()["total_characters"] == 0
+    
+    @patch('eleven_backend.get_client')
+    def test_stream_records_usage_after_first_chunk(self, mock_get_client, isolated_usage_ledger):
+        """Test that usage is recorded once the first chunk arrives."""
+        mock_client = Mock()
+        mock_client.text_to_speech.stream.return_value = iter([b"a", b"b"])
+        mock_get_client.return_value = mock_client
+        
+        stream = synthesize_stream("Hello world", "voice1")
+        assert next(stream) == b"a"
+        
+        assert isolated_usage_ledger.totals()["total_characters"] == 11
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
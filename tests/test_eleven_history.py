@@ -0,0 +1,122 @@
+"""
+Unit tests for the session audio history module.
+"""
+
+import pytest
+import os
+import sys
+import io
+import json
+import tarfile
+import zipfile
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eleven_history import AudioHistory
+
+
+class NonSeekable(io.RawIOBase):
+    """Write-only stream that cannot seek, like a network response."""
+    
+    def __init__(self):
+        self.buffer = bytearray()
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        self.buffer += data
+        return len(data)
+
+
+def add_clips(history, count, size=1000, output_format="mp3_44100_128"):
+    return [
+        history.add(bytes([i]) * size, "audio/mpeg", f"Text {i}", voice_id=f"v{i}", model_id="m", output_format=output_format, seed=i)
+        for i in range(count)
+    ]
+
+
+class TestAudioHistory:
+    """Test cases for history limits and spilling."""
+    
+    def test_old_clips_spill_to_disk(self, tmp_path):
+        """Test that only the most recent clips stay in memory."""
+        history = AudioHistory(max_memory_clips=2, spill_dir=tmp_path)
+        clips = add_clips(history, 4)
+        
+        assert [c.in_memory for c in clips] == [False, False, True, True]
+        assert history.memory_bytes == 2000
+        assert clips[0].read() == bytes([0]) * 1000
+        assert history.get(clips[1].clip_id).read() == bytes([1]) * 1000
+    
+    def test_memory_budget(self, tmp_path):
+        """Test that the byte budget spills clips but keeps the newest in memory."""
+        history = AudioHistory(max_memory_bytes=1500, spill_dir=tmp_path)
+        clips = add_clips(history, 2) + [history.add(b"x" * 5000, "audio/wav", "Big", output_format="wav_44100")]
+        
+        assert [c.in_memory for c in clips] == [False, False, True]
+    
+    def test_bounded_history(self, tmp_path):
+        """Test that clips beyond max_clips are discarded with their files."""
+        history = AudioHistory(max_clips=3, max_memory_clips=1, spill_dir=tmp_path)
+        clips = add_clips(history, 5)
+        
+        assert len(history) == 3
+        assert history.clips() == clips[2:]
+        with pytest.raises(KeyError):
+            history.get(clips[0].clip_id)
+        assert len(list(history.directory.iterdir())) == 2
+    
+    def test_clear_removes_directory(self, tmp_path):
+        """Test that clear() deletes spill files."""
+        history = AudioHistory(max_memory_clips=1, spill_dir=tmp_path)
+        add_clips(history, 3)
+        directory = history.directory
+        
+        history.clear()
+        
+        assert len(history) == 0
+        assert not directory.exists()
+
+
+class TestExport:
+    """Test cases for bulk archive export."""
+    
+    def test_zip_export_to_unseekable_stream(self, tmp_path):
+        """Test that ZIP export streams every clip and the manifest."""
+        history = AudioHistory(max_memory_clips=1, spill_dir=tmp_path)
+        add_clips(history, 3)
+        target = NonSeekable()
+        
+        assert history.export(target, "zip") == 3
+        
+        with zipfile.ZipFile(io.BytesIO(bytes(target.buffer))) as archive:
+            names = archive.namelist()
+            manifest = json.loads(archive.read("manifest.json"))
+            assert archive.read("001_v0.mp3") == bytes([0]) * 1000
+            assert archive.getinfo("001_v0.mp3").compress_type == zipfile.ZIP_STORED
+        assert names == ["001_v0.mp3", "002_v1.mp3", "003_v2.mp3", "manifest.json"]
+        assert manifest["clips"][2]["text"] == "Text 2"
+        assert manifest["clips"][2]["seed"] == 2
+        assert manifest["clips"][2]["voice_id"] == "v2"
+    
+    def test_tar_export(self, tmp_path):
+        """Test that tar.gz export contains the same entries."""
+        history = AudioHistory(max_memory_clips=1, spill_dir=tmp_path)
+        add_clips(history, 2, output_format="wav_44100")
+        
+        path = history.export_to_file("tar.gz")
+        
+        with tarfile.open(path, "r:gz") as archive:
+            assert archive.getnames() == ["001_v0.wav", "002_v1.wav", "manifest.json"]
+            assert archive.extractfile("001_v0.wav").read() == bytes([0]) * 1000
+    
+    def test_unknown_format(self, tmp_path):
+        """Test that unsupported archive formats are rejected."""
+        with pytest.raises(ValueError, match="Archive format"):
+            AudioHistory(spill_dir=tmp_path).export(io.BytesIO(), "rar")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
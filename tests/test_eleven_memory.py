@@ -0,0 +1,118 @@
+"""
+Unit tests for the process-wide audio memory budget.
+"""
+
+import pytest
+import gc
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eleven_history import AudioHistory
+from eleven_memory import AudioMemoryManager, get_memory_manager
+
+
+def add_clip(history, byte, size=1000):
+    return history.add(bytes([byte]) * size, "audio/mpeg", "Text", voice_id="v", output_format="mp3_44100_128")
+
+
+class TestAudioMemoryManager:
+    """Test cases for budget enforcement across histories."""
+    
+    def test_budget_spans_sessions(self, tmp_path):
+        """Test that the least recently used clip of any session is spilled."""
+        memory = AudioMemoryManager(budget_bytes=2500)
+        first = AudioHistory(spill_dir=tmp_path, memory=memory)
+        second = AudioHistory(spill_dir=tmp_path, memory=memory)
+        
+        a = add_clip(first, 1)
+        b = add_clip(second, 2)
+        c = add_clip(first, 3)
+        
+        assert not a.in_memory
+        assert b.in_memory and c.in_memory
+        assert memory.memory_bytes == 2000
+        assert a.read() == bytes([1]) * 1000
+    
+    def test_touch_updates_lru_order(self, tmp_path):
+        """Test that reading a clip protects it from the next spill."""
+        memory = AudioMemoryManager(budget_bytes=2500)
+        history = AudioHistory(spill_dir=tmp_path, memory=memory)
+        a = add_clip(history, 1)
+        b = add_clip(history, 2)
+        
+        a.read()
+        add_clip(history, 3)
+        
+        assert a.in_memory
+        assert not b.in_memory
+    
+    def test_oversized_clip_spills_itself(self, tmp_path):
+        """Test that a single clip over the budget goes straight to disk."""
+        memory = AudioMemoryManager(budget_bytes=500)
+        history = AudioHistory(spill_dir=tmp_path, memory=memory)
+        
+        clip = add_clip(history, 1)
+        
+        assert not clip.in_memory
+        assert clip.read() == bytes([1]) * 1000
+        assert memory.memory_bytes == 0
+    
+    def test_collected_history_is_forgotten(self, tmp_path):
+        """Test that a garbage-collected session no longer counts against the budget."""
+        memory = AudioMemoryManager(budget_bytes=10000)
+        history = AudioHistory(spill_dir=tmp_path, memory=memory)
+        add_clip(history, 1)
+        add_clip(history, 2)
+        assert memory.memory_bytes == 2000
+        
+        del history
+        gc.collect()
+        
+        assert memory.memory_bytes == 0
+    
+    def test_history_limits_release_memory(self, tmp_path):
+        """Test that per-session spills and clear() are reflected in the budget."""
+        memory = AudioMemoryManager(budget_bytes=10000)
+        history = AudioHistory(max_memory_clips=1, spill_dir=tmp_path, memory=memory)
+        add_clip(history, 1)
+        add_clip(history, 2)
+        assert memory.memory_bytes == 1000
+        
+        history.clear()
+        
+        assert memory.memory_bytes == 0
+    
+    def test_stats(self, tmp_path):
+        """Test the reported usage and spill counters."""
+        memory = AudioMemoryManager(budget_bytes=1500)
+        history = AudioHistory(spill_dir=tmp_path, memory=memory)
+        add_clip(history, 1)
+        add_clip(history, 2)
+        
+        stats = memory.stats()
+        
+        assert stats == {
+            "budget_bytes": 1500,
+            "memory_bytes": 1000,
+            "clips_in_memory": 1,
+            "peak_bytes": 2000,
+            "spills": 1,
+            "spilled_bytes": 1000
+        }
+    
+    def test_budget_from_environment(self, monkeypatch):
+        """Test that the default budget can be set with an environment variable."""
+        monkeypatch.setenv("ELEVENLABS_AUDIO_MEMORY_BUDGET", "4096")
+        
+        assert AudioMemoryManager().budget_bytes == 4096
+    
+    def test_histories_share_process_manager(self, isolated_memory_manager):
+        """Test that histories use the shared manager by default."""
+        assert AudioHistory().memory is get_memory_manager() is isolated_memory_manager
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
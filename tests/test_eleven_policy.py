@@ -0,0 +1,125 @@
+"""
+Unit tests for the model and output format selection module.
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eleven_policy import FASTEST, QUALITY, ModelMetrics, SelectionPolicy, format_bytes_per_second
+from eleven_backend import synthesize, synthesize_batch
+
+
+class TestPredictions:
+    """Test cases for size and latency predictions."""
+    
+    def test_format_bytes_per_second(self):
+        """Test sizes derived from format names."""
+        assert format_bytes_per_second("mp3_44100_128") == 16000
+        assert format_bytes_per_second("mp3_22050_32") == 4000
+        assert format_bytes_per_second("wav_44100") == 88200
+        assert format_bytes_per_second("pcm_16000") == 32000
+        with pytest.raises(ValueError):
+            format_bytes_per_second("opus")
+    
+    def test_observations_replace_priors(self):
+        """Test that live samples take over once min_samples are recorded."""
+        metrics = ModelMetrics(min_samples=3)
+        prior = metrics.estimate("eleven_flash_v2_5")
+        
+        for _ in range(3):
+            metrics.record("eleven_flash_v2_5", ttfb=2.0, total_seconds=3.0, characters=100, audio_seconds=10.0)
+        
+        assert prior != (2.0, 0.01)
+        assert metrics.estimate("eleven_flash_v2_5") == pytest.approx((2.0, 0.01))
+        assert metrics.audio_seconds_per_character() == pytest.approx(0.1)
+        assert metrics.stats()["eleven_flash_v2_5"]["samples"] == 3
+
+
+class TestSelectionPolicy:
+    """Test cases for SelectionPolicy.choose()."""
+    
+    def test_fastest_mode(self):
+        """Test that previews get the fastest model and smallest format."""
+        choice = SelectionPolicy(ModelMetrics()).choose(200, FASTEST)
+        
+        assert (choice.model_id, choice.output_format) == ("eleven_flash_v2_5", "mp3_22050_32")
+        assert choice.meets_targets
+    
+    def test_quality_mode(self):
+        """Test that final renders get the best model and format without targets."""
+        choice = SelectionPolicy(ModelMetrics()).choose(200, QUALITY)
+        
+        assert (choice.model_id, choice.output_format) == ("eleven_multilingual_v2", "wav_44100")
+    
+    def test_quality_mode_respects_targets(self):
+        """Test that quality mode steps down to what fits the latency and size targets."""
+        policy = SelectionPolicy(ModelMetrics())
+        latency, _ = policy.predict("eleven_multilingual_v2", "wav_44100", 2000)
+        _, mp3_size = policy.predict("eleven_turbo_v2_5", "mp3_44100_128", 2000)
+        
+        choice = policy.choose(2000, QUALITY, latency_target=latency - 0.1, size_target=mp3_size)
+        
+        assert (choice.model_id, choice.output_format) == ("eleven_turbo_v2_5", "mp3_44100_128")
+        assert choice.predicted_latency <= latency - 0.1
+    
+    def test_fastest_follows_live_metrics(self):
+        """Test that a model observed to be slow is no longer picked as fastest."""
+        metrics = ModelMetrics(min_samples=2)
+        for _ in range(2):
+            metrics.record("eleven_flash_v2_5", ttfb=3.0, total_seconds=4.0, characters=200)
+        
+        choice = SelectionPolicy(metrics).choose(200, FASTEST)
+        
+        assert choice.model_id == "eleven_turbo_v2_5"
+    
+    def test_unreachable_target(self):
+        """Test that the fastest option is returned and flagged when nothing fits."""
+        choice = SelectionPolicy(ModelMetrics()).choose(200, QUALITY, latency_target=0.01)
+        
+        assert (choice.model_id, choice.output_format) == ("eleven_flash_v2_5", "mp3_22050_32")
+        assert not choice.meets_targets
+    
+    def test_unknown_mode(self):
+        """Test that an unknown mode is rejected."""
+        with pytest.raises(ValueError, match="Selection mode"):
+            SelectionPolicy(ModelMetrics()).choose(200, "cheapest")
+
+
+class TestBackendIntegration:
+    """Test cases for metrics recording and batch selection in eleven_backend."""
+    
+    @patch('eleven_backend.get_client')
+    def test_synthesize_records_metrics(self, mock_get_client, isolated_model_metrics):
+        """Test that each synthesis feeds the model's latency window."""
+        mock_client = Mock()
+        mock_client.text_to_speech.convert.return_value = iter([b"\x00" * 16000])
+        mock_get_client.return_value = mock_client
+        
+        synthesize("Hello", "voice1", model_id="eleven_flash_v2_5", output_format="mp3_44100_128")
+        
+        assert isolated_model_metrics.stats()["eleven_flash_v2_5"]["samples"] == 1
+    
+    @patch('eleven_backend.get_client')
+    def test_batch_mode_selects_per_text(self, mock_get_client):
+        """Test that batch mode picks model and format unless given explicitly."""
+        mock_client = Mock()
+        mock_client.user.subscription.get.return_value = Mock(character_count=0, character_limit=10000)
+        mock_client.text_to_speech.convert.side_effect = lambda **kwargs: iter([b"audio"])
+        mock_get_client.return_value = mock_client
+        
+        synthesize_batch(["Hello"], "voice1", mode=FASTEST)
+        selected = mock_client.text_to_speech.convert.call_args[1]
+        synthesize_batch(["Hello"], "voice1", mode=FASTEST, output_format="mp3_44100_128")
+        explicit = mock_client.text_to_speech.convert.call_args[1]
+        
+        assert (selected["model_id"], selected["output_format"]) == ("eleven_flash_v2_5", "mp3_22050_32")
+        assert (explicit["model_id"], explicit["output_format"]) == ("eleven_flash_v2_5", "mp3_44100_128")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
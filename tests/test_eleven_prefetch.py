@@ -0,0 +1,123 @@
+"""
+Unit tests for the speculative prefetch module.
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eleven_prefetch import AudioCache, SpeculativePrefetcher, synthesis_key
+
+
+def fake_synthesize(**params):
+    return f"{params['voice_id']}:{params['text']}".encode(), "audio/mpeg"
+
+
+class TestAudioCache:
+    """Test cases for the AudioCache class."""
+    
+    def test_evicts_least_recently_used(self):
+        """Test that the cache stays under its byte limit."""
+        cache = AudioCache(max_bytes=10)
+        cache.put("a", (b"12345", "audio/mpeg"))
+        cache.put("b", (b"12345", "audio/mpeg"))
+        cache.get("a")
+        cache.put("c", (b"12345", "audio/mpeg"))
+        
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+    
+    def test_synthesis_key_ignores_settings_order(self):
+        """Test that equivalent voice settings produce the same key."""
+        key1 = synthesis_key("hi", "v1", voice_settings={"stability": 0.5, "style": 0.0})
+        key2 = synthesis_key("hi", "v1", voice_settings={"style": 0.0, "stability": 0.5})
+        
+        assert key1 == key2
+
+
+class TestSpeculativePrefetcher:
+    """Test cases for the SpeculativePrefetcher class."""
+    
+    def test_repeat_request_served_from_cache(self):
+        """Test that an identical request does not call synthesize again."""
+        synth = Mock(side_effect=fake_synthesize)
+        prefetcher = SpeculativePrefetcher(synth)
+        
+        prefetcher.get_or_synthesize(text="hi", voice_id="v1")
+        audio, _ = prefetcher.get_or_synthesize(text="hi", voice_id="v1")
+        
+        assert audio == b"v1:hi"
+        assert synth.call_count == 1
+        assert prefetcher.stats()["hits"] == 1
+    
+    def test_prefetched_voice_is_a_hit(self):
+        """Test that prefetching another voice serves the later switch."""
+        synth = Mock(side_effect=fake_synthesize)
+        prefetcher = SpeculativePrefetcher(synth)
+        
+        scheduled = prefetcher.prefetch({"text": "hi", "voice_id": "v1"}, ["v2"])
+        prefetcher.shutdown()
+        audio, _ = prefetcher.get_or_synthesize(text="hi", voice_id="v2")
+        
+        assert scheduled == 1
+        assert audio == b"v2:hi"
+        assert synth.call_count == 1
+        assert prefetcher.stats()["prefetch_hits"] == 1
+    
+    def test_credit_budget_limits_prefetch(self):
+        """Test that speculation stops once the character budget is spent."""
+        prefetcher = SpeculativePrefetcher(fake_synthesize, credit_budget=5)
+        
+        scheduled = prefetcher.prefetch({"text": "abc", "voice_id": "v1"}, ["v2", "v3", "v4"])
+        prefetcher.shutdown()
+        
+        assert scheduled == 1
+        assert prefetcher.stats()["credits_spent"] == 3
+
+    
+    def test_credit_budget_is_a_rolling_window(self):
+        """Test that speculation resumes once old spending leaves the window."""
+        prefetcher = SpeculativePrefetcher(fake_synthesize, credit_budget=3, budget_window=60)
+        
+        with patch("eleven_prefetch.time.monotonic", return_value=1000.0):
+            assert prefetcher.prefetch({"text": "abc", "voice_id": "v1"}, ["v2", "v3"]) == 1
+        with patch("eleven_prefetch.time.monotonic", return_value=1061.0):
+            assert prefetcher.prefetch({"text": "abc", "voice_id": "v1"}, ["v3"]) == 1
+        prefetcher.shutdown()
+        
+        assert prefetcher.stats()["credits_spent"] == 6
+    
+    def test_ledger_remaining_limits_prefetch(self, isolated_usage_ledger):
+        """Test that speculation does not spend characters the ledger budget lacks."""
+        isolated_usage_ledger.budget = 10
+        isolated_usage_ledger.record(5, "v1", "m")
+        prefetcher = SpeculativePrefetcher(fake_synthesize)
+        
+        scheduled = prefetcher.prefetch({"text": "abc", "voice_id": "v1"}, ["v2", "v3"])
+        prefetcher.shutdown()
+        
+        assert scheduled == 1
+    
+    def test_variants_use_voice_default_settings(self):
+        """Test that a prefetched voice is hit with the settings the app shows after switching."""
+        defaults = {"v2": {"stability": 0.9, "similarity_boost": 0.1, "style": 0.0, "use_speaker_boost": False}}
+        synth = Mock(side_effect=fake_synthesize)
+        prefetcher = SpeculativePrefetcher(synth, voice_settings_fn=defaults.__getitem__)
+        current = {"stability": 0.5, "similarity_boost": 0.75, "style": 0.0, "use_speaker_boost": True}
+        
+        prefetcher.prefetch({"text": "hi", "voice_id": "v1", "voice_settings": current}, ["v2"])
+        prefetcher.shutdown()
+        prefetcher.get_or_synthesize(text="hi", voice_id="v2", voice_settings=dict(defaults["v2"]))
+        
+        assert synth.call_count == 1
+        assert synth.call_args[1]["voice_settings"] == defaults["v2"]
+        assert prefetcher.stats()["prefetch_hits"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,137 @@
+"""
+Unit tests for the voice settings presets module.
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eleven_presets import DEFAULT_VOICE_SETTINGS, PresetStore, VoicePreset, make_preset
+from eleven_backend import synthesize_batch
+from eleven_cli import main as cli_main
+
+
+class TestMakePreset:
+    """Test cases for make_preset()."""
+    
+    def test_interned_and_hashable(self):
+        """Test that equal values return the same object, usable as a dict key."""
+        first = make_preset("narrator", "voice1", stability=0.6)
+        second = make_preset("narrator", "voice1", stability=0.6)
+        
+        assert first is second
+        assert {first: "cached"}[second] == "cached"
+    
+    def test_interned_regardless_of_call_style(self):
+        """Test that positional, keyword and defaulted calls with equal values share one object."""
+        positional = make_preset("narrator", "voice1", "eleven_turbo_v2_5", 0.5, 0.75)
+        keyword = make_preset(name="narrator", voice_id="voice1", stability=0.5, similarity_boost=0.75)
+        defaulted = make_preset("narrator", "voice1")
+        
+        assert positional is keyword is defaulted
+    
+    def test_defaults_match_voice_settings(self):
+        """Test that preset defaults come from DEFAULT_VOICE_SETTINGS."""
+        assert make_preset("narrator", "voice1").voice_settings == DEFAULT_VOICE_SETTINGS
+    
+    def test_validation(self):
+        """Test that out-of-range settings are rejected."""
+        with pytest.raises(ValueError, match="stability must be between 0 and 1"):
+            make_preset("bad", "voice1", stability=1.5)
+        with pytest.raises(ValueError, match="speed must be between"):
+            make_preset("bad", "voice1", speed=3.0)
+        with pytest.raises(ValueError, match="name must not be empty"):
+            make_preset(" ", "voice1")
+    
+    def test_synthesis_kwargs(self):
+        """Test that presets expand to synthesize() arguments."""
+        preset = make_preset("narrator", "voice1", model_id="eleven_flash_v2_5", speed=1.1, language_code="en")
+        
+        kwargs = preset.synthesis_kwargs()
+        
+        assert kwargs["voice_id"] == "voice1"
+        assert kwargs["model_id"] == "eleven_flash_v2_5"
+        assert kwargs["voice_settings"]["use_speaker_boost"] is True
+        assert kwargs["speed"] == 1.1
+        assert kwargs["language_code"] == "en"
+
+
+class TestPresetStore:
+    """Test cases for the PresetStore class."""
+    
+    def test_versions_persist(self, tmp_path):
+        """Test that saves add versions and survive a reload."""
+        path = tmp_path / "presets.json"
+        store = PresetStore(path=path)
+        store.save(make_preset("narrator", "voice1", stability=0.4))
+        store.save(make_preset("narrator", "voice1", stability=0.8))
+        
+        reloaded = PresetStore(path=path)
+        
+        assert reloaded.get("narrator").version == 2
+        assert reloaded.get("narrator").stability == 0.8
+        assert reloaded.get("narrator", version=1).stability == 0.4
+        assert reloaded.names() == ["narrator"]
+    
+    def test_stores_sharing_a_file_merge(self, tmp_path):
+        """Test that a store sees and keeps presets saved through another store on the same file."""
+        path = tmp_path / "presets.json"
+        cli = PresetStore(path=path)
+        app = PresetStore(path=path)
+        
+        cli.save(make_preset("narrator", "voice1"))
+        app.save(make_preset("teaser", "voice2"))
+        app.save(make_preset("narrator", "voice1", stability=0.9))
+        
+        assert app.names() == ["narrator", "teaser"]
+        assert cli.get("narrator").version == 2
+        assert PresetStore(path=path).names() == ["narrator", "teaser"]
+    
+    def test_missing_preset(self, tmp_path):
+        """Test that unknown names raise KeyError."""
+        store = PresetStore(path=tmp_path / "presets.json")
+        
+        with pytest.raises(KeyError, match="not found"):
+            store.get("nope")
+
+
+class TestPresetSelection:
+    """Test cases for selecting presets by name from the batch API and CLI."""
+    
+    @patch('eleven_backend.get_client')
+    def test_batch_by_preset_name(self, mock_get_client, isolated_preset_store):
+        """Test that synthesize_batch() takes voice and settings from a stored preset."""
+        isolated_preset_store.save(make_preset("narrator", "voice1", stability=0.9, speed=1.2))
+        mock_client = Mock()
+        mock_client.user.subscription.get.return_value = Mock(character_count=0, character_limit=10000)
+        mock_client.text_to_speech.convert.return_value = [b"audio"]
+        mock_get_client.return_value = mock_client
+        
+        results, _ = synthesize_batch(["Hello"], preset="narrator")
+        
+        call_kwargs = mock_client.text_to_speech.convert.call_args[1]
+        assert results == [(b"audio", "audio/mpeg")]
+        assert call_kwargs["voice_id"] == "voice1"
+        assert call_kwargs["voice_settings"]["stability"] == 0.9
+        assert call_kwargs["voice_settings"]["speed"] == 1.2
+    
+    def test_batch_requires_voice_or_preset(self):
+        """Test that synthesize_batch() needs a voice from somewhere."""
+        with pytest.raises(ValueError, match="needs a voice_id or a preset"):
+            synthesize_batch(["Hello"])
+    
+    def test_cli_save_and_show(self, isolated_preset_store, capsys):
+        """Test saving and showing presets from the command line."""
+        assert cli_main(["presets", "save", "narrator", "--voice-id", "voice1", "--stability", "0.3"]) == 0
+        assert cli_main(["presets", "show", "narrator"]) == 0
+        
+        assert '"stability": 0.3' in capsys.readouterr().out
+        assert cli_main(["presets", "show", "missing"]) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,39 @@
+"""
+Unit tests for the rolling statistics module.
+"""
+
+import pytest
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eleven_stats import RollingWindow
+
+
+class TestRollingWindow:
+    """Test cases for the RollingWindow class."""
+    
+    def test_percentile(self):
+        """Test percentile over the rolling window."""
+        window = RollingWindow(window=100)
+        for value in range(1, 101):
+            window.record(value / 100)
+        
+        assert window.percentile(50) == pytest.approx(0.5, abs=0.02)
+        assert window.percentile(95) == pytest.approx(0.95, abs=0.02)
+        assert RollingWindow().percentile(95) is None
+    
+    def test_keeps_most_recent_samples(self):
+        """Test that old samples fall out of the window."""
+        window = RollingWindow(window=3)
+        for value in (100.0, 1.0, 2.0, 3.0):
+            window.record(value)
+        
+        assert len(window) == 3
+        assert window.percentile(100) == 3.0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,165 @@
+"""
+Unit tests for the request tracing module.
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+import os
+import sys
+import json
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import eleven_tracing
+from eleven_tracing import JSONLinesExporter, Tracer, set_tracer, span
+from eleven_backend import synthesize
+
+
+class CollectingExporter:
+    """Exporter that keeps every exported trace in memory."""
+    
+    def __init__(self):
+        self.traces = []
+    
+    def export(self, spans):
+        self.traces.append(list(spans))
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    collector = CollectingExporter()
+    monkeypatch.setattr(eleven_tracing, "_tracer", Tracer([collector]))
+    return collector
+
+
+class TestSpans:
+    """Test cases for span creation and nesting."""
+    
+    def test_disabled_tracing_is_noop(self, monkeypatch):
+        """Test that spans are a shared no-op while no tracer is set."""
+        monkeypatch.setattr(eleven_tracing, "_tracer", None)
+        
+        with span("outer", voice_id="v1") as outer:
+            outer.set_attribute("bytes", 10)
+        
+        assert span("a") is span("b")
+    
+    def test_nested_spans_form_one_trace(self, exporter):
+        """Test that inner spans are children of the enclosing span."""
+        with span("outer", voice_id="v1") as outer:
+            with span("inner") as inner:
+                inner.set_attribute("bytes", 42)
+            assert exporter.traces == []
+        
+        assert len(exporter.traces) == 1
+        names = [s.name for s in exporter.traces[0]]
+        assert names == ["inner", "outer"]
+        assert inner.trace_id == outer.trace_id
+        assert inner.parent_id == outer.span_id
+        assert outer.parent_id is None
+        assert inner.to_dict()["attributes"] == {"bytes": 42}
+        assert outer.duration_ms >= inner.duration_ms
+    
+    def test_exception_marks_span_as_error(self, exporter):
+        """Test that a failing phase is recorded with its error."""
+        with pytest.raises(ValueError):
+            with span("failing"):
+                raise ValueError("boom")
+        
+        failed = exporter.traces[0][0]
+        assert failed.status == "error"
+        assert failed.attributes["error"] == "ValueError: boom"
+    
+    def test_exporter_failure_does_not_propagate(self, monkeypatch):
+        """Test that a broken exporter never breaks the traced request."""
+        broken = Mock()
+        broken.export.side_effect = OSError("disk full")
+        monkeypatch.setattr(eleven_tracing, "_tracer", Tracer([broken]))
+        
+        with span("request"):
+            pass
+        
+        broken.export.assert_called_once()
+
+
+class TestExporters:
+    """Test cases for trace exporters."""
+    
+    def test_json_lines_exporter(self, tmp_path):
+        """Test that each span is written as one JSON line."""
+        path = tmp_path / "trace.jsonl"
+        set_tracer(Tracer([JSONLinesExporter(path)]))
+        try:
+            with span("outer", text_length=5):
+                with span("inner"):
+                    pass
+        finally:
+            set_tracer(None)
+        
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [r["name"] for r in records] == ["inner", "outer"]
+        assert records[0]["parent_id"] == records[1]["span_id"]
+        assert records[1]["attributes"] == {"text_length": 5}
+        assert records[1]["duration_ms"] >= 0
+    
+    def test_opentelemetry_exporter(self):
+        """Test that traces are re-emitted with the same parent/child structure."""
+        pytest.importorskip("opentelemetry.sdk")
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+        
+        memory = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(memory))
+        tracer = Tracer([eleven_tracing.OpenTelemetryExporter(provider)])
+        set_tracer(tracer)
+        try:
+            with span("outer"):
+                with span("inner", bytes=3):
+                    pass
+        finally:
+            set_tracer(None)
+        
+        finished = {s.name: s for s in memory.get_finished_spans()}
+        assert finished["inner"].parent.span_id == finished["outer"].context.span_id
+        assert finished["inner"].attributes["bytes"] == 3
+
+
+class TestBackendTracing:
+    """Test cases for spans emitted by eleven_backend."""
+    
+    @patch('eleven_backend.get_client')
+    def test_synthesize_phases(self, mock_get_client, exporter):
+        """Test that synthesize() records request and drain phases with attributes."""
+        mock_client = Mock()
+        mock_client.text_to_speech.convert.return_value = iter([b"audio", b"-data"])
+        mock_get_client.return_value = mock_client
+        
+        synthesize("Hello", "voice1", model_id="eleven_flash_v2_5")
+        
+        spans = {s.name: s for s in exporter.traces[0]}
+        assert set(spans) == {"synthesize", "request", "drain_stream"}
+        assert spans["synthesize"].attributes["voice_id"] == "voice1"
+        assert spans["synthesize"].attributes["model_id"] == "eleven_flash_v2_5"
+        assert spans["synthesize"].attributes["text_length"] == 5
+        assert spans["synthesize"].attributes["bytes"] == 10
+        assert spans["drain_stream"].attributes["bytes"] == 10
+        assert spans["drain_stream"].parent_id == spans["synthesize"].span_id
+    
+    @patch.dict(os.environ, {'ELEVENLABS_API_KEY': 'test-key-123'})
+    @patch('eleven_backend.ElevenLabs')
+    def test_get_client_phases(self, mock_elevenlabs, exporter):
+        """Test that key resolution and client construction are separate spans."""
+        from eleven_backend import get_client
+        
+        get_client()
+        
+        spans = {s.name: s for s in exporter.traces[0]}
+        assert set(spans) == {"get_client", "resolve_key", "construct_client"}
+        assert spans["resolve_key"].attributes["source"] == "environment"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,190 @@
+"""
+Unit tests for the usage accounting module.
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+import json
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eleven_usage import UsageLedger, BudgetExceededError, key_fingerprint
+from eleven_backend import synthesize, synthesize_batch
+from eleven_cli import main as cli_main
+
+
+def make_client(character_count, character_limit, resets_at=None):
+    client = Mock()
+    client.user.subscription.get.return_value = Mock(
+        character_count=character_count,
+        character_limit=character_limit,
+        next_character_count_reset_unix=resets_at
+    )
+    return client
+
+
+class TestUsageLedger:
+    """Test cases for the UsageLedger class."""
+    
+    def test_record_and_persist(self, tmp_path):
+        """Test that totals are bucketed and survive a reload."""
+        path = tmp_path / "usage.json"
+        ledger = UsageLedger(path=path)
+        ledger.record(10, "voice1", "model1", key_id="k1")
+        ledger.record(5, "voice2", "model1", key_id="k1")
+        
+        totals = UsageLedger(path=path).totals()
+        
+        assert totals["total_characters"] == 15
+        assert totals["calls"] == 2
+        assert totals["by_voice"] == {"voice1": 10, "voice2": 5}
+        assert totals["by_model"] == {"model1": 15}
+        assert totals["by_key"] == {"k1": 15}
+    
+    def test_ledgers_sharing_a_file_merge(self, tmp_path):
+        """Test that ledgers in different processes add to, not overwrite, each other's totals."""
+        path = tmp_path / "usage.json"
+        app_ledger = UsageLedger(path=path, budget=2000)
+        cli_ledger = UsageLedger(path=path)
+        
+        app_ledger.record(1000, "voice1", "model1")
+        cli_ledger.record(10, "voice2", "model1")
+        
+        assert UsageLedger(path=path).totals()["total_characters"] == 1010
+        assert app_ledger.totals()["by_voice"] == {"voice1": 1000, "voice2": 10}
+        assert app_ledger.remaining() == 990
+    
+    def test_key_fingerprint_hides_key(self):
+        """Test that key fingerprints are stable and do not leak the key."""
+        fingerprint = key_fingerprint("sk_secret_key")
+        
+        assert fingerprint == key_fingerprint("sk_secret_key")
+        assert "secret" not in fingerprint
+        assert key_fingerprint(None) == "unknown"
+    
+    def test_remaining_uses_subscription_and_budget(self, tmp_path):
+        """Test that remaining takes the tighter of budget and subscription."""
+        ledger = UsageLedger(path=tmp_path / "usage.json", budget=1000)
+        ledger.reconcile(make_client(character_count=9950, character_limit=10000))
+        ledger.record(20, "voice1", "model1")
+        
+        assert ledger.remaining() == 30
+    
+    def test_check_budget_rejects(self, tmp_path):
+        """Test that an oversized batch is rejected before running."""
+        ledger = UsageLedger(path=tmp_path / "usage.json", budget=10)
+        
+        with pytest.raises(BudgetExceededError, match="needs 12 characters"):
+            ledger.check_budget(["hello", "world!!"])
+    
+    def test_plan_batch_defers_tail(self, tmp_path):
+        """Test that plan_batch admits texts in order until the budget runs out."""
+        ledger = UsageLedger(path=tmp_path / "usage.json", budget=10)
+        
+        accepted, deferred = ledger.plan_batch(["abcd", "efgh", "ijkl", "m"])
+        
+        assert accepted == [0, 1]
+        assert deferred == [2, 3]
+    
+    def test_budget_restarts_with_billing_cycle(self, tmp_path):
+        """Test that the budget counts only characters since the subscription's last reset."""
+        path = tmp_path / "usage.json"
+        ledger = UsageLedger(path=path, budget=100)
+        with patch('eleven_usage.time.time', return_value=1000.0):
+            ledger.reconcile(make_client(character_count=0, character_limit=10 ** 6, resets_at=2000))
+            ledger.record(100, "voice1", "model1")
+            assert ledger.remaining() == 0
+        
+        with patch('eleven_usage.time.time', return_value=2001.0):
+            assert ledger.remaining() == 100
+            ledger.record(30, "voice1", "model1")
+            assert ledger.remaining() == 70
+        
+        totals = UsageLedger(path=path).totals()
+        assert totals["total_characters"] == 130
+        assert totals["period_characters"] == 30
+        assert totals["period_started"] == 2000
+    
+    def test_reset_starts_new_period(self, tmp_path):
+        """Test that reset() restores the budget and keeps lifetime totals."""
+        ledger = UsageLedger(path=tmp_path / "usage.json", budget=10)
+        ledger.record(10, "voice1", "model1")
+        
+        ledger.reset()
+        
+        assert ledger.remaining() == 10
+        assert ledger.totals()["total_characters"] == 10
+    
+    def test_ledger_without_period_counts_toward_budget(self, tmp_path):
+        """Test that a ledger file written before budget periods keeps its usage."""
+        path = tmp_path / "usage.json"
+        path.write_text('{"total_characters": 40, "calls": 1, "by_voice": {}, "by_model": {}, "by_key": {}, "subscription": null}')
+        
+        assert UsageLedger(path=path, budget=100).remaining() == 60
+    
+    def test_cli_reset(self, isolated_usage_ledger, capsys):
+        """Test that the CLI shows usage and starts a new period."""
+        isolated_usage_ledger.record(5, "voice1", "model1")
+        
+        assert cli_main(["usage", "reset"]) == 0
+        assert cli_main(["usage", "show"]) == 0
+        
+        shown = json.loads(capsys.readouterr().out.split("\n", 1)[1])
+        assert shown["total_characters"] == 5
+        assert shown["period_characters"] == 0
+    
+    def test_maybe_reconcile_tolerates_failure(self, tmp_path):
+        """Test that a failed reconciliation falls back to local totals."""
+        ledger = UsageLedger(path=tmp_path / "usage.json", budget=100)
+        factory = Mock(side_effect=Exception("network down"))
+        
+        ledger.maybe_reconcile(factory)
+        
+        assert ledger.remaining() == 100
+
+
+class TestBackendAccounting:
+    """Test cases for usage accounting in the backend."""
+    
+    @patch('eleven_backend.get_client')
+    def test_synthesize_records_usage(self, mock_get_client, isolated_usage_ledger):
+        """Test that a successful synthesize call is recorded."""
+        mock_client = Mock()
+        mock_client.text_to_speech.convert.return_value = [b"audio"]
+        mock_get_client.return_value = mock_client
+        
+        synthesize("Hello", "voice1", model_id="eleven_flash_v2_5")
+        
+        totals = isolated_usage_ledger.totals()
+        assert totals["by_voice"] == {"voice1": 5}
+        assert totals["by_model"] == {"eleven_flash_v2_5": 5}
+    
+    @patch('eleven_backend.get_client')
+    def test_synthesize_batch_rejects_before_calling(self, mock_get_client, isolated_usage_ledger):
+        """Test that an over-budget batch makes no API calls."""
+        mock_client = make_client(character_count=0, character_limit=8)
+        mock_get_client.return_value = mock_client
+        
+        with pytest.raises(BudgetExceededError):
+            synthesize_batch(["Hello", "World"], "voice1")
+        
+        mock_client.text_to_speech.convert.assert_not_called()
+    
+    @patch('eleven_backend.get_client')
+    def test_synthesize_batch_defers(self, mock_get_client, isolated_usage_ledger):
+        """Test that defer_over_budget runs what fits and returns the rest."""
+        mock_client = make_client(character_count=0, character_limit=8)
+        mock_client.text_to_speech.convert.return_value = [b"audio"]
+        mock_get_client.return_value = mock_client
+        
+        results, deferred = synthesize_batch(["Hello", "World"], "voice1", defer_over_budget=True)
+        
+        assert results == [(b"audio", "audio/mpeg")]
+        assert deferred == ["World"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])